@@ -0,0 +1,146 @@
+# -*— coding:utf-8 -*-
+
+"""
+Binance 增量订单薄本地模拟服务
+提供 /api/v3/depth 快照接口及 /stream 组合数据流(支持 SUBSCRIBE / UNSUBSCRIBE)，按100ms推送 depthUpdate 增量数据，
+可按概率跳过更新id以模拟数据缺失，用于测试 Binance diff 模式的订单薄同步及重新同步。
+
+运行:
+    python benchmarks/binance_depth_server.py [--port 9443] [--gap-rate 0.01]
+配置:
+    "binance": {"wss": "ws://127.0.0.1:9443", "rest": "http://127.0.0.1:9443", "orderbook_mode": "diff", ...}
+
+Date:   2026/10/18
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from aiohttp import web
+
+
+class DepthBook:
+    """ 单个交易对的模拟订单薄
+    """
+
+    def __init__(self, symbol, levels=500, mid=100.0, tick=0.01):
+        self.symbol = symbol
+        self.levels = levels
+        self.mid = mid
+        self.tick = tick
+        self.update_id = 1000
+        self.asks = {round(mid + i * tick, 2): round(random.uniform(0.1, 10), 4) for i in range(1, levels + 1)}
+        self.bids = {round(mid - i * tick, 2): round(random.uniform(0.1, 10), 4) for i in range(1, levels + 1)}
+
+    def snapshot(self, limit):
+        asks = sorted(self.asks.items())[:limit]
+        bids = sorted(self.bids.items(), reverse=True)[:limit]
+        return {
+            "lastUpdateId": self.update_id,
+            "asks": [["%.8f" % p, "%.8f" % q] for p, q in asks],
+            "bids": [["%.8f" % p, "%.8f" % q] for p, q in bids]
+        }
+
+    def step(self, changes=5, gap=False):
+        """ 随机修改若干档，生成一条 depthUpdate 数据
+        @param gap 是否跳过一段更新id
+        """
+        asks, bids = [], []
+        for _ in range(changes):
+            offset = random.randint(1, self.levels) * self.tick
+            if random.random() < 0.5:
+                side, out, price = self.asks, asks, round(self.mid + offset, 2)
+            else:
+                side, out, price = self.bids, bids, round(self.mid - offset, 2)
+            quantity = 0 if random.random() < 0.2 else round(random.uniform(0.1, 10), 4)
+            if quantity:
+                side[price] = quantity
+            else:
+                side.pop(price, None)
+            out.append(["%.8f" % price, "%.8f" % quantity])
+        if gap:
+            self.update_id += random.randint(2, 10)
+        first_id = self.update_id + 1
+        self.update_id += len(asks) + len(bids)
+        return {
+            "e": "depthUpdate",
+            "E": int(time.time() * 1000),
+            "s": self.symbol,
+            "U": first_id,
+            "u": self.update_id,
+            "b": bids,
+            "a": asks
+        }
+
+
+class DepthServer:
+
+    def __init__(self, gap_rate=0.0, interval=0.1):
+        self._gap_rate = gap_rate
+        self._interval = interval
+        self._books = {}  # {"BTCUSDT": DepthBook}
+        self._clients = {}  # {ws: set(streams)}
+
+    def book(self, symbol):
+        symbol = symbol.upper()
+        if symbol not in self._books:
+            self._books[symbol] = DepthBook(symbol)
+        return self._books[symbol]
+
+    async def handle_depth(self, request):
+        book = self.book(request.query["symbol"])
+        return web.json_response(book.snapshot(int(request.query.get("limit", 1000))))
+
+    async def handle_stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streams = self._clients[ws] = set()
+        try:
+            async for msg in ws:
+                data = json.loads(msg.data)
+                if data.get("method") == "SUBSCRIBE":
+                    streams.update(data["params"])
+                elif data.get("method") == "UNSUBSCRIBE":
+                    streams.difference_update(data["params"])
+                await ws.send_json({"result": None, "id": data.get("id")})
+        finally:
+            self._clients.pop(ws, None)
+        return ws
+
+    async def push(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            streams = set(s for ss in self._clients.values() for s in ss if s.endswith("@depth@100ms"))
+            events = {}
+            for stream in streams:
+                book = self.book(stream.split("@")[0])
+                events[stream] = book.step(gap=random.random() < self._gap_rate)
+            for ws, ss in list(self._clients.items()):
+                for stream in ss:
+                    if stream in events and not ws.closed:
+                        await ws.send_str(json.dumps({"stream": stream, "data": events[stream]}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--gap-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = DepthServer(args.gap_rate)
+    app = web.Application()
+    app.router.add_get("/api/v3/depth", server.handle_depth)
+    app.router.add_get("/stream", server.handle_stream)
+
+    async def start_push(app):
+        app["push"] = asyncio.get_event_loop().create_task(server.push())
+
+    app.on_startup.append(start_push)
+    web.run_app(app, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
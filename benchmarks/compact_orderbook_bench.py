@@ -0,0 +1,80 @@
+# -*— coding:utf-8 -*-
+
+"""
+紧凑订单薄基准测试
+对比 原始字典存储({"asks": {price: quantity}}) / 有序订单薄(utils.orderbook) / 紧凑订单薄(utils.compact_orderbook)
+在不同深度下的单本订单薄内存占用，以及 "仅更新一档" 和 "更新一档+读取前20档" 的吞吐量(次/秒)。
+
+运行:
+    python benchmarks/compact_orderbook_bench.py [levels ...]
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.orderbook import Orderbook
+from utils.compact_orderbook import CompactOrderbook
+from orderbook_bench import make_updates, seed_levels, LENGTH, UPDATES
+
+
+def dict_memory(book):
+    size = sys.getsizeof(book)
+    for side in book.values():
+        size += sys.getsizeof(side)
+        for price, quantity in side.items():
+            size += sys.getsizeof(price) + sys.getsizeof(quantity)
+    return size
+
+
+def build_dict(levels):
+    asks, bids = seed_levels(levels)
+    return {"asks": dict(asks), "bids": dict(bids)}
+
+
+def build_book(book, levels):
+    asks, bids = seed_levels(levels)
+    for price, quantity in asks:
+        book.asks.update(price, quantity, ["%.2f" % price, "%.8f" % quantity])
+    for price, quantity in bids:
+        book.bids.update(price, quantity, ["%.2f" % price, "%.8f" % quantity])
+    return book
+
+
+def run_book(book, updates, read=True):
+    for side, price, quantity in updates:
+        getattr(book, side).update(price, quantity, ["%.2f" % price, "%.8f" % quantity])
+        if read:
+            book.asks.raws(LENGTH)
+            book.bids.raws(LENGTH)
+
+
+def throughput(book, updates, read):
+    begin = time.perf_counter()
+    run_book(book, updates, read)
+    return len(updates) / (time.perf_counter() - begin)
+
+
+def main():
+    levels_list = [int(x) for x in sys.argv[1:]] or [100, 400, 1000]
+    print("%8s %10s %10s %11s %14s %14s %14s %14s" % (
+        "levels", "dict(KB)", "sorted(KB)", "compact(KB)",
+        "sorted(upd)", "compact(upd)", "sorted(upd+20)", "compact(upd+20)"))
+    for levels in levels_list:
+        updates = make_updates(levels, UPDATES)
+        m1 = dict_memory(build_dict(levels))
+        m2 = build_book(Orderbook(), levels).memory_usage()
+        m3 = build_book(CompactOrderbook("0.01", 8), levels).memory_usage()
+        r = [throughput(build_book(book(), levels), updates, read)
+             for read in (False, True) for book in (Orderbook, lambda: CompactOrderbook("0.01", 8))]
+        print("%8d %10.1f %10.1f %11.1f %14.0f %14.0f %14.0f %14.0f" % (
+            levels, m1 / 1024, m2 / 1024, m3 / 1024, r[0], r[1], r[2], r[3]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*— coding:utf-8 -*-
+
+"""
+OKEx 二进制数据帧解码基准测试
+对比 旧流程(每帧新建decompressobj、解码为str、json.loads、价格数量float后再"%.8f"格式化) 与
+新流程(utils.decode 一次性解压、字节层面判断心跳、可选orjson解析、原始字符串直接透传) 的单帧耗时。
+
+运行:
+    python benchmarks/decode_bench.py [okex-*.frames.gz ...]  # 不指定录制文件时使用生成的模拟数据帧
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import json
+import zlib
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils import decode
+from utils.recorder import read_frames, FRAME_BINARY
+
+
+def deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def make_frames(count=20000, seed=1):
+    """ 生成模拟的 spot/depth update、spot/trade 数据帧及心跳返回
+    """
+    rnd = random.Random(seed)
+    frames = []
+    for i in range(count):
+        r = rnd.random()
+        if r < 0.05:
+            frames.append(deflate(b"pong"))
+            continue
+        if r < 0.7:
+            levels = lambda: [["%.1f" % rnd.uniform(3000, 4000), "%.8f" % rnd.uniform(0, 5), "0",
+                               str(rnd.randint(1, 9))] for _ in range(rnd.randint(1, 10))]
+            msg = {"table": "spot/depth", "action": "update", "data": [{
+                "instrument_id": "BTC-USDT", "asks": levels(), "bids": levels(),
+                "timestamp": "2019-05-06T07:19:39.348Z", "checksum": -2036653089}]}
+        else:
+            msg = {"table": "spot/trade", "data": [{
+                "instrument_id": "BTC-USDT", "price": "%.1f" % rnd.uniform(3000, 4000),
+                "side": "buy", "size": "%.8f" % rnd.uniform(0, 5), "timestamp": "2019-05-06T07:19:39.348Z",
+                "trade_id": str(i)}]}
+        frames.append(deflate(json.dumps(msg).encode()))
+    return frames
+
+
+def load_frames(filenames):
+    frames = []
+    for filename in filenames:
+        for _, kind, payload in read_frames(filename):
+            if kind == FRAME_BINARY:
+                frames.append(payload)
+    return frames
+
+
+def old_pipeline(raw):
+    decompress = zlib.decompressobj(-zlib.MAX_WBITS)
+    msg = decompress.decompress(raw)
+    msg += decompress.flush()
+    msg = msg.decode()
+    if msg == "pong":
+        return
+    msg = json.loads(msg)
+    for d in msg["data"]:
+        if msg["table"] == "spot/trade":
+            ["%.8f" % float(d["price"]), "%.8f" % float(d["size"])]
+        else:
+            for level in d["asks"] + d["bids"]:
+                ["%.8f" % float(level[0]), "%.8f" % float(level[1])]
+
+
+def new_pipeline(raw):
+    msg = decode.decode_deflate_frame(raw)
+    if msg is None:
+        return
+    for d in msg["data"]:
+        if msg["table"] == "spot/trade":
+            [d["price"], d["size"]]
+        else:
+            for level in d["asks"] + d["bids"]:
+                level[:2]
+
+
+def bench(func, frames):
+    begin = time.perf_counter()
+    for raw in frames:
+        func(raw)
+    return time.perf_counter() - begin
+
+
+def main():
+    frames = load_frames(sys.argv[1:]) if sys.argv[1:] else make_frames()
+    print("frames: %d, json backend: %s" % (len(frames), decode.JSON_BACKEND))
+    t1 = min(bench(old_pipeline, frames) for _ in range(3))
+    t2 = min(bench(new_pipeline, frames) for _ in range(3))
+    print("before: %.2f us/frame" % (t1 / len(frames) * 1e6))
+    print("after:  %.2f us/frame (%.1fx)" % (t2 / len(frames) * 1e6, t1 / t2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*— coding:utf-8 -*-
+
+"""
+增量订单薄事件基准测试
+模拟订单薄随机更新，对比每次推送 完整订单薄事件 与 增量订单薄事件(utils.delta) 的JSON消息大小及客户端解码、重建耗时。
+
+运行:
+    python benchmarks/delta_bench.py [档数] [更新次数]
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils.orderbook import Orderbook
+from utils.delta import DeltaEncoder, DeltaBook
+
+
+def make_books(length, count, seed=1):
+    """ 生成连续的订单薄快照，每次更新随机修改靠近盘口的1~3个档位
+    """
+    rnd = random.Random(seed)
+    ob = Orderbook()
+    for i in range(1, length * 2):
+        ob.asks.update(10000 + i, 1.0, ["%.1f" % (10000 + i), "1.000"])
+        ob.bids.update(10000 - i, 1.0, ["%.1f" % (10000 - i), "1.000"])
+    books = []
+    for _ in range(count):
+        for _ in range(rnd.randint(1, 3)):
+            side, sign = (ob.asks, 1) if rnd.random() < 0.5 else (ob.bids, -1)
+            price = 10000 + sign * rnd.randint(1, length)
+            quantity = rnd.choice([0, rnd.randint(1, 50) / 10])
+            side.update(price, quantity, ["%.1f" % price, "%.3f" % quantity])
+        books.append({"platform": "okex", "symbol": "BTC/USDT", "asks": ob.asks.raws(length),
+                      "bids": ob.bids.raws(length), "timestamp": 0})
+    return books
+
+
+def run(length, count):
+    books = make_books(length, count)
+    full = [json.dumps(book) for book in books]
+    encoder = DeltaEncoder()
+    deltas = [json.dumps(encoder.encode(book).data) for book in books]
+
+    start = time.perf_counter()
+    for msg in full:
+        json.loads(msg)
+    full_decode = time.perf_counter() - start
+
+    client = DeltaBook()
+    start = time.perf_counter()
+    for msg in deltas:
+        client.apply(json.loads(msg))
+    delta_decode = time.perf_counter() - start
+    assert client.asks() == books[-1]["asks"] and client.bids() == books[-1]["bids"]
+
+    full_bytes = sum(len(m) for m in full)
+    delta_bytes = sum(len(m) for m in deltas)
+    print("levels: %d updates: %d keyframes: %d" % (length, count, encoder.keyframes))
+    print("  full : %8.1f bytes/msg  decode %.2f us/msg" % (full_bytes / count, full_decode / count * 1e6))
+    print("  delta: %8.1f bytes/msg  decode+apply %.2f us/msg  (%.1fx smaller)" % (
+        delta_bytes / count, delta_decode / count * 1e6, full_bytes / delta_bytes))
+
+
+if __name__ == "__main__":
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    run(length, count)
@@ -0,0 +1,590 @@
+# -*— coding:utf-8 -*-
+
+"""
+交易所行情模拟服务(端到端压测 / 长时间稳定性测试)
+在本地提供与行情服务所消费的协议一致的websocket接口，生成模拟订单薄、成交及K线，并按阶段逐步提高推送速率，
+同时作为本地事件接收端(utils.sink)接收行情服务发布的事件，统计每个阶段的吞吐量、成交丢失率及端到端延迟，找出 src/main.py 的处理上限。
+    OKEx v3     /ws/v3              spot|futures/depth(partial + update，带checksum)、spot/trade、spot/candle60s，raw deflate压缩的二进制帧
+    Binance     /stream             组合数据流(SUBSCRIBE / UNSUBSCRIBE)，{symbol}@depth20、@depth@100ms、@trade、@kline_1m；
+                /api/v3/depth       diff 模式订单薄快照
+    Deribit     /ws/api/v1/         order_book_event 通知(每次推送完整订单薄)
+推送速率为每个已订阅数据流(交易对 x 频道)每秒的消息数，K线固定每秒1条；第n个阶段的速率为 rate * ramp^n。
+端到端延迟 = 接收端收到事件的时间 - 事件中的交易所时间(模拟服务生成消息的时间)，只统计成交及订单薄事件；
+Binance depth20 数据不含交易所时间，其订单薄延迟只包含行情服务内部的处理时间。
+出现以下情况之一时认为行情服务已跟不上，输出该阶段为饱和点并结束:
+    成交事件 p99 延迟超过 --max-latency 毫秒 / 成交丢失率超过 --max-drop / 实际推送速率低于目标速率的90%(发送被对端阻塞)
+
+运行:
+    python benchmarks/exchange_simulator.py --symbols 50 --print-config > /tmp/sim.json  # 生成指向本服务的行情服务配置(含 sink)
+    python benchmarks/exchange_simulator.py --rate 10 --ramp 2 --stage 30                 # 启动模拟服务，等待行情服务连接后开始计时
+    python src/main.py /tmp/sim.json
+
+模拟服务本身为单进程，各阶段报告中的 send/s 即其实际推送能力；如模拟服务先达到上限，可按平台分别启动多个模拟服务(不同端口)。
+
+Date:   2026/10/18
+"""
+
+import abc
+import sys
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+
+from aiohttp import web, WSMsgType
+
+from binance_depth_server import DepthBook
+
+TICK = 0.01  # 推送循环周期(秒)
+MAX_CATCH_UP = 0.1  # 发送被阻塞后单个周期最多补发的时长(秒)，超出部分不再补发，实际推送速率随之下降
+LATENCY_SAMPLES = 200000  # 每个阶段最多保留的延迟样本数
+
+
+def deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def iso_time(ts):
+    """ 毫秒时间戳转换为OKEx时间格式 2019-05-06T07:19:39.348Z
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts // 1000)) + ".%03dZ" % (ts % 1000)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+class SimBook:
+    """ 单个交易对的模拟订单薄，价格为以 mid 为中心、tick 为间隔的固定网格，买卖价格不会交叉
+    """
+
+    def __init__(self, rnd, levels=50, mid=100.0, tick=0.01):
+        self._rnd = rnd
+        self.levels = levels
+        self.mid = mid
+        self.tick = tick
+        self.asks = {}  # {price: [price_str, size_str]}
+        self.bids = {}
+        for i in range(1, levels + 1):
+            self._set(self.asks, mid + i * tick)
+            self._set(self.bids, mid - i * tick)
+
+    def _set(self, side, price):
+        price = round(price, 2)
+        side[price] = ["%.2f" % price, "%.4f" % self._rnd.uniform(0.1, 10)]
+        return side[price]
+
+    def top(self, length):
+        asks = [self.asks[p] for p in sorted(self.asks)[:length]]
+        bids = [self.bids[p] for p in sorted(self.bids, reverse=True)[:length]]
+        return asks, bids
+
+    def step(self, changes=3):
+        """ 随机修改若干档(20%概率删除，网格上已删除的价格可能被重新加入)
+        @return (asks, bids) 发生变化的档位，删除的档位数量为 "0"
+        """
+        asks, bids = [], []
+        for _ in range(changes):
+            offset = self._rnd.randint(1, self.levels) * self.tick
+            if self._rnd.random() < 0.5:
+                side, out, price = self.asks, asks, round(self.mid + offset, 2)
+            else:
+                side, out, price = self.bids, bids, round(self.mid - offset, 2)
+            if price in side and len(side) > self.levels // 2 and self._rnd.random() < 0.2:
+                out.append([side.pop(price)[0], "0"])
+            else:
+                out.append(list(self._set(side, price)))
+        return asks, bids
+
+    def checksum(self):
+        """ OKEx v3 depth 校验和
+        """
+        asks, bids = self.top(25)
+        items = []
+        for i in range(max(len(asks), len(bids))):
+            if i < len(bids):
+                items.extend(bids[i])
+            if i < len(asks):
+                items.extend(asks[i])
+        crc = zlib.crc32(":".join(items).encode())
+        return crc - 0x100000000 if crc > 0x7fffffff else crc
+
+
+class Market:
+    """ 各交易对的模拟行情数据，同一交易对被多个客户端订阅时只生成一次
+    """
+
+    def __init__(self, seed=1):
+        self._rnd = random.Random(seed)
+        self.books = {}  # {symbol: SimBook}
+        self.depth_books = {}  # Binance diff 模式订单薄 {"BTCUSDT": DepthBook}
+        self.trade_ids = {}  # {symbol: trade_id}
+        self.candles = {}  # {symbol: [start_ts, open, high, low, close, volume]}
+        self.trades = 0  # 已生成的成交数
+
+    def book(self, symbol):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = SimBook(self._rnd)
+        return book
+
+    def depth_book(self, symbol):
+        symbol = symbol.upper()
+        book = self.depth_books.get(symbol)
+        if book is None:
+            book = self.depth_books[symbol] = DepthBook(symbol)
+        return book
+
+    def trade(self, symbol, ts):
+        """ 生成一笔成交
+        @return (trade_id, side, price, size)
+        """
+        book = self.book(symbol)
+        buy = self._rnd.random() < 0.5
+        asks, bids = book.top(1)
+        price = float((asks if buy else bids)[0][0])
+        size = self._rnd.uniform(0.001, 2)
+        self.trade_ids[symbol] = trade_id = self.trade_ids.get(symbol, 0) + 1
+        self.trades += 1
+        candle = self.candles.get(symbol)
+        start = ts // 60000 * 60000
+        if candle is None or candle[0] != start:
+            candle = self.candles[symbol] = [start, price, price, price, price, 0.0]
+        candle[2] = max(candle[2], price)
+        candle[3] = min(candle[3], price)
+        candle[4] = price
+        candle[5] += size
+        return trade_id, "buy" if buy else "sell", "%.2f" % price, "%.4f" % size
+
+    def candle(self, symbol, ts):
+        candle = self.candles.get(symbol)
+        if candle is None or candle[0] != ts // 60000 * 60000:
+            self.trade(symbol, ts)
+            candle = self.candles[symbol]
+        return candle
+
+
+class Protocol(abc.ABC):
+    """ 单个交易所协议，subscriptions 为各客户端已订阅的数据流
+    """
+
+    path = None
+
+    def __init__(self, market):
+        self.market = market
+        self.subscriptions = {}  # {ws: set(stream)}
+        self.sent = 0  # 已推送的消息数
+
+    def streams(self):
+        """ 所有客户端已订阅的数据流 {stream: [ws, ...]}
+        """
+        streams = {}
+        for ws, ss in self.subscriptions.items():
+            for s in ss:
+                streams.setdefault(s, []).append(ws)
+        return streams
+
+    def rate_of(self, stream, rate):
+        """ 数据流的推送速率(条/秒)
+        """
+        return rate
+
+    @abc.abstractmethod
+    def generate(self, stream, ts):
+        """ 生成数据流的一条消息
+        @return 消息(bytes 为二进制帧，str 为文本帧)，None为不推送
+        """
+
+    @abc.abstractmethod
+    async def on_message(self, ws, data):
+        """ 处理客户端发送的文本消息
+        """
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self.subscriptions[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self.on_message(ws, msg.data)
+        finally:
+            self.subscriptions.pop(ws, None)
+        return ws
+
+    @staticmethod
+    async def send(ws, payload):
+        if isinstance(payload, bytes):
+            await ws.send_bytes(payload)
+        else:
+            await ws.send_str(payload)
+
+
+class OKExProtocol(Protocol):
+    """ OKEx v3，数据流为订阅频道 spot/depth:BTC-USDT 等
+    """
+
+    path = "/ws/v3"
+
+    def rate_of(self, stream, rate):
+        return 1 if "/candle" in stream else rate
+
+    async def on_message(self, ws, data):
+        if data == "ping":
+            await ws.send_bytes(deflate(b"pong"))
+            return
+        msg = json.loads(data)
+        args = msg.get("args", [])
+        if msg.get("op") == "subscribe":
+            for ch in args:
+                partial = self._partial(ch) if ch.split(":")[0].endswith("/depth") else None
+                self.subscriptions[ws].add(ch)  # 先生成全量数据并加入订阅，之后的增量数据一定在全量数据之后
+                await ws.send_bytes(deflate(json.dumps({"event": "subscribe", "channel": ch}).encode()))
+                if partial:
+                    await ws.send_bytes(partial)
+        elif msg.get("op") == "unsubscribe":
+            self.subscriptions[ws].difference_update(args)
+            for ch in args:
+                await ws.send_bytes(deflate(json.dumps({"event": "unsubscribe", "channel": ch}).encode()))
+
+    def _partial(self, ch):
+        table, instrument_id = ch.split(":")
+        book = self.market.book(instrument_id)
+        asks, bids = book.top(200)
+        data = {
+            "instrument_id": instrument_id,
+            "asks": [[p, s, "0", "1"] for p, s in asks],
+            "bids": [[p, s, "0", "1"] for p, s in bids],
+            "timestamp": iso_time(int(time.time() * 1000)),
+            "checksum": book.checksum()
+        }
+        return deflate(json.dumps({"table": table, "action": "partial", "data": [data]}).encode())
+
+    def generate(self, stream, ts):
+        table, instrument_id = stream.split(":")
+        kind = table.split("/")[1]
+        if kind == "depth":
+            book = self.market.book(instrument_id)
+            asks, bids = book.step()
+            data = {
+                "instrument_id": instrument_id,
+                "asks": [[p, s, "0", "1"] for p, s in asks],
+                "bids": [[p, s, "0", "1"] for p, s in bids],
+                "timestamp": iso_time(ts),
+                "checksum": book.checksum()
+            }
+            msg = {"table": table, "action": "update", "data": [data]}
+        elif kind == "trade":
+            trade_id, side, price, size = self.market.trade(instrument_id, ts)
+            data = {"instrument_id": instrument_id, "price": price, "side": side, "size": size,
+                    "timestamp": iso_time(ts), "trade_id": str(trade_id)}
+            msg = {"table": table, "data": [data]}
+        elif kind.startswith("candle"):
+            candle = self.market.candle(instrument_id, ts)
+            data = {"instrument_id": instrument_id,
+                    "candle": [iso_time(candle[0])] + ["%.2f" % v for v in candle[1:5]] + ["%.4f" % candle[5]]}
+            msg = {"table": table, "data": [data]}
+        else:
+            return None
+        return deflate(json.dumps(msg).encode())
+
+
+class BinanceProtocol(Protocol):
+    """ Binance 组合数据流，数据流名称如 btcusdt@depth20
+    """
+
+    path = "/stream"
+
+    def rate_of(self, stream, rate):
+        if stream.startswith("!"):  # 全市场ticker不模拟
+            return 0
+        if "@kline" in stream:
+            return 1
+        if "@depth@" in stream or stream.endswith("@depth"):  # 增量订单薄最快100ms一条
+            return min(rate, 10)
+        return rate
+
+    async def on_message(self, ws, data):
+        msg = json.loads(data)
+        if msg.get("method") == "SUBSCRIBE":
+            self.subscriptions[ws].update(msg["params"])
+        elif msg.get("method") == "UNSUBSCRIBE":
+            self.subscriptions[ws].difference_update(msg["params"])
+        await ws.send_str(json.dumps({"result": None, "id": msg.get("id")}))
+
+    async def handle_depth(self, request):
+        book = self.market.depth_book(request.query["symbol"])
+        return web.json_response(book.snapshot(int(request.query.get("limit", 1000))))
+
+    def generate(self, stream, ts):
+        symbol, kind = stream.split("@", 1)
+        if kind.startswith("depth20"):
+            asks, bids = self.market.book(symbol).top(20)
+            self.market.book(symbol).step()
+            data = {"lastUpdateId": ts, "bids": bids, "asks": asks}
+        elif kind.startswith("depth"):
+            data = self.market.depth_book(symbol).step()
+        elif kind == "trade":
+            trade_id, side, price, size = self.market.trade(symbol, ts)
+            data = {"e": "trade", "E": ts, "s": symbol.upper(), "t": trade_id, "p": price, "q": size, "T": ts,
+                    "m": side == "sell"}
+        elif kind.startswith("kline"):
+            candle = self.market.candle(symbol, ts)
+            data = {"e": "kline", "E": ts, "s": symbol.upper(), "k": {
+                "t": candle[0], "T": candle[0] + 59999, "i": "1m", "o": "%.2f" % candle[1], "h": "%.2f" % candle[2],
+                "l": "%.2f" % candle[3], "c": "%.2f" % candle[4], "v": "%.4f" % candle[5],
+                "q": "%.4f" % (candle[5] * candle[4]), "x": False}}
+        else:
+            return None
+        return json.dumps({"stream": stream, "data": data})
+
+
+class DeribitProtocol(Protocol):
+    """ Deribit v1，数据流为合约名称
+    """
+
+    path = "/ws/api/v1/"
+
+    async def on_message(self, ws, data):
+        msg = json.loads(data)
+        action = msg.get("action")
+        if action == "/api/v1/private/subscribe":
+            self.subscriptions[ws].update(msg.get("arguments", {}).get("instrument", []))
+        elif action == "/api/v1/private/unsubscribe":  # v1 取消全部订阅
+            self.subscriptions[ws].clear()
+        result = "pong" if action == "/api/v1/public/ping" else "ok"
+        await ws.send_str(json.dumps({"id": msg.get("id"), "success": True, "result": result}))
+
+    def generate(self, stream, ts):
+        book = self.market.book(stream)
+        book.step()
+        asks, bids = book.top(20)
+        result = {
+            "instrument": stream,
+            "tstamp": ts,
+            "bids": [{"price": float(p), "quantity": float(s), "amount": float(s)} for p, s in bids],
+            "asks": [{"price": float(p), "quantity": float(s), "amount": float(s)} for p, s in asks]
+        }
+        return json.dumps({"notifications": [{"success": True, "message": "order_book_event", "result": result}]})
+
+
+class Sink:
+    """ 本地事件接收端，接收 utils.sink 写入的 JSON 行
+    """
+
+    def __init__(self):
+        self.events = 0  # 已接收的事件数
+        self.bytes = 0
+        self.trades = 0  # 已接收的成交事件数
+        self.names = {}  # 各类事件数 {name: count}
+        self.latencies = {}  # 延迟样本(毫秒) {"trade" / "orderbook": [ms, ...]}
+        self._samples = {}  # 延迟样本总数(用于蓄水池抽样) {kind: count}
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.bytes += len(line)
+                self.on_event(json.loads(line), int(time.time() * 1000))
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def on_event(self, msg, now):
+        name = msg["name"]
+        items = msg["data"] if isinstance(msg["data"], list) else [msg["data"]]
+        self.names[name] = self.names.get(name, 0) + len(items)
+        self.events += len(items)
+        if name.startswith("EVENT_TRADE"):
+            kind = "trade"
+            self.trades += len(items)
+        elif name.startswith("EVENT_ORDERBOOK"):
+            kind = "orderbook"
+        else:
+            return
+        for data in items:
+            ts = data.get("timestamp")
+            if isinstance(ts, int):
+                self._sample(kind, now - ts)
+
+    def _sample(self, kind, value):
+        samples = self.latencies.setdefault(kind, [])
+        self._samples[kind] = count = self._samples.get(kind, 0) + 1
+        if len(samples) < LATENCY_SAMPLES:
+            samples.append(value)
+        else:
+            i = random.randrange(count)
+            if i < LATENCY_SAMPLES:
+                samples[i] = value
+
+    def reset_latencies(self):
+        latencies, self.latencies, self._samples = self.latencies, {}, {}
+        return latencies
+
+
+class Simulator:
+    """ 按阶段提高推送速率，输出每个阶段的统计
+    """
+
+    def __init__(self, protocols, sink, rate, ramp, stage, stages, max_latency, max_drop):
+        self._protocols = protocols
+        self._sink = sink
+        self._rate = rate
+        self._ramp = ramp
+        self._stage = stage
+        self._stages = stages
+        self._max_latency = max_latency
+        self._max_drop = max_drop
+        self._credits = {}  # 各数据流累计未推送的消息数 {(protocol, stream): credit}
+
+    def _target(self, rate):
+        """ 当前订阅下每秒的目标消息数
+        """
+        return sum(p.rate_of(stream, rate) * len(clients) for p in self._protocols
+                   for stream, clients in p.streams().items())
+
+    async def _emit(self, rate, dt):
+        """ 按速率推送一个周期的消息
+        """
+        ts = int(time.time() * 1000)
+        for protocol in self._protocols:
+            for stream, clients in protocol.streams().items():
+                key = (protocol.path, stream)
+                credit = self._credits.get(key, 0) + protocol.rate_of(stream, rate) * dt
+                count = int(credit)
+                self._credits[key] = credit - count
+                for _ in range(count):
+                    payload = protocol.generate(stream, ts)
+                    if payload is None:
+                        break
+                    for ws in clients:
+                        if not ws.closed:
+                            await protocol.send(ws, payload)
+                            protocol.sent += 1
+
+    async def run(self):
+        while not any(p.subscriptions for p in self._protocols):
+            await asyncio.sleep(0.5)
+        print("client connected, waiting for subscriptions ...")
+        await asyncio.sleep(5)
+        print("%5s %9s %7s %9s %9s %9s %8s %9s %8s %8s %8s %8s" % (
+            "stage", "rate", "streams", "target/s", "send/s", "events/s", "trades", "loss", "p50", "p99", "max",
+            "ob_p99"))
+        for n in range(self._stages):
+            rate = self._rate * self._ramp ** n
+            sent = sum(p.sent for p in self._protocols)
+            trades, events = self.market_trades(), self._sink.events
+            sink_trades = self._sink.trades
+            self._sink.reset_latencies()
+            target = self._target(rate)
+            loop = asyncio.get_event_loop()
+            start = last = loop.time()
+            while loop.time() - start < self._stage:
+                await asyncio.sleep(TICK)
+                now = loop.time()
+                await self._emit(rate, min(now - last, MAX_CATCH_UP))
+                last = now
+            elapsed = loop.time() - start
+            await asyncio.sleep(0.5)  # 等待在途事件到达接收端
+            latencies = self._sink.reset_latencies()
+            trade_lat = sorted(latencies.get("trade", []))
+            ob_lat = sorted(latencies.get("orderbook", []))
+            sent_trades = self.market_trades() - trades
+            recv_trades = self._sink.trades - sink_trades
+            loss = 1 - recv_trades / sent_trades if sent_trades else 0
+            send_rate = (sum(p.sent for p in self._protocols) - sent) / elapsed
+            streams = sum(len(p.streams()) for p in self._protocols)
+            print("%5d %9.1f %7d %9.0f %9.0f %9.0f %8d %8.2f%% %8d %8d %8d %8d" % (
+                n, rate, streams, target, send_rate, (self._sink.events - events) / elapsed, sent_trades,
+                loss * 100, percentile(trade_lat, 50), percentile(trade_lat, 99), trade_lat[-1] if trade_lat else 0,
+                percentile(ob_lat, 99)))
+            sys.stdout.flush()
+            reasons = []
+            if trade_lat and percentile(trade_lat, 99) > self._max_latency:
+                reasons.append("trade p99 latency %dms > %dms" % (percentile(trade_lat, 99), self._max_latency))
+            if self._sink.connections and loss > self._max_drop:
+                reasons.append("trade loss %.2f%% > %.2f%%" % (loss * 100, self._max_drop * 100))
+            if target and send_rate < target * 0.9:
+                reasons.append("send rate %.0f/s < 90%% of target %.0f/s" % (send_rate, target))
+            if reasons:
+                print("saturated at stage %d (rate %.1f msg/s per stream): %s" % (n, rate, "; ".join(reasons)))
+                break
+        else:
+            print("not saturated after %d stages" % self._stages)
+        if self._sink.names:
+            print("events received:", json.dumps(self._sink.names, sort_keys=True))
+        print("simulation finished, press Ctrl+C to exit.")
+
+    def market_trades(self):
+        return self._protocols[0].market.trades
+
+
+def make_config(args):
+    """ 生成指向模拟服务的行情服务配置
+    """
+    wss = "ws://127.0.0.1:%d" % args.port
+    symbols = ["S%03d/USDT" % i for i in range(args.symbols)]
+    sink = {"host": "127.0.0.1", "port": args.sink_port}
+    platforms = {
+        "okex": {"wss": wss, "symbols": symbols, "channels": ["orderbook", "trade", "kline"], "sink": sink},
+        "binance": {"wss": wss, "rest": "http://127.0.0.1:%d" % args.port, "symbols": symbols,
+                    "channels": ["orderbook", "trade", "kline"], "sink": sink},
+        "deribit": {"wss": wss + DeribitProtocol.path, "symbols": ["S%03d-PERPETUAL" % i for i in range(args.symbols)],
+                    "access_key": "sim", "secret_key": "sim", "conflation_interval": 0, "sink": sink}
+    }
+    names = args.platforms.split(",")
+    return {
+        "LOG": {"console": True, "level": "INFO"},
+        "PLATFORMS": {name: options for name, options in platforms.items() if name in names}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--sink-port", type=int, default=9900)
+    parser.add_argument("--rate", type=float, default=10, help="initial messages/s per subscribed stream")
+    parser.add_argument("--ramp", type=float, default=2, help="rate multiplier per stage")
+    parser.add_argument("--stage", type=float, default=30, help="stage duration in seconds")
+    parser.add_argument("--stages", type=int, default=10)
+    parser.add_argument("--max-latency", type=float, default=100, help="trade p99 latency threshold (ms)")
+    parser.add_argument("--max-drop", type=float, default=0.001, help="trade loss ratio threshold")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--symbols", type=int, default=50, help="symbols per platform in --print-config")
+    parser.add_argument("--platforms", default="okex,binance,deribit", help="platforms in --print-config")
+    parser.add_argument("--print-config", action="store_true")
+    args = parser.parse_args()
+
+    if args.print_config:
+        print(json.dumps(make_config(args), indent=4))
+        return
+
+    market = Market(args.seed)
+    okex, binance, deribit = OKExProtocol(market), BinanceProtocol(market), DeribitProtocol(market)
+    sink = Sink()
+    app = web.Application()
+    for protocol in (okex, binance, deribit):
+        app.router.add_get(protocol.path, protocol.handle)
+    app.router.add_get("/api/v3/depth", binance.handle_depth)
+    simulator = Simulator([okex, binance, deribit], sink, args.rate, args.ramp, args.stage, args.stages,
+                          args.max_latency, args.max_drop)
+
+    async def start(app):
+        app["sink"] = await asyncio.start_server(sink.handle, "127.0.0.1", args.sink_port, limit=2 ** 24)
+        app["simulator"] = asyncio.get_event_loop().create_task(simulator.run())
+
+    app.on_startup.append(start)
+    web.run_app(app, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -*— coding:utf-8 -*-
+
+"""
+订单薄微基准测试
+对比 字典+每次推送全量排序 与 有序订单薄(utils.orderbook.Orderbook) 在不同深度下 "更新一档+读取前N档" 的耗时。
+
+运行:
+    python benchmarks/orderbook_bench.py [levels ...]
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils.orderbook import Orderbook
+
+
+LENGTH = 20  # 读取档数
+UPDATES = 20000  # 每轮更新次数
+
+
+def make_updates(levels, count, seed=1):
+    """ 生成在 levels 档范围内随机增删的更新序列 [(side, price, quantity), ...]
+    """
+    rnd = random.Random(seed)
+    updates = []
+    for _ in range(count):
+        side = rnd.choice(("asks", "bids"))
+        offset = rnd.randint(1, levels)
+        price = round(100 + offset * 0.01 if side == "asks" else 100 - offset * 0.01, 2)
+        quantity = 0 if rnd.random() < 0.3 else round(rnd.uniform(0.1, 10), 4)
+        updates.append((side, price, quantity))
+    return updates
+
+
+def seed_levels(levels):
+    asks = [(round(100 + i * 0.01, 2), 1.0) for i in range(1, levels + 1)]
+    bids = [(round(100 - i * 0.01, 2), 1.0) for i in range(1, levels + 1)]
+    return asks, bids
+
+
+def run_dict_sort(levels, updates):
+    asks, bids = seed_levels(levels)
+    book = {"asks": dict(asks), "bids": dict(bids)}
+    for side, price, quantity in updates:
+        if quantity == 0:
+            book[side].pop(price, None)
+        else:
+            book[side][price] = quantity
+        ask_keys = sorted(list(book["asks"].keys()))
+        bid_keys = sorted(list(book["bids"].keys()), reverse=True)
+        [(k, book["asks"][k]) for k in ask_keys[:LENGTH]]
+        [(k, book["bids"][k]) for k in bid_keys[:LENGTH]]
+
+
+def run_sorted_book(levels, updates):
+    asks, bids = seed_levels(levels)
+    ob = Orderbook()
+    for price, quantity in asks:
+        ob.asks.update(price, quantity)
+    for price, quantity in bids:
+        ob.bids.update(price, quantity)
+    for side, price, quantity in updates:
+        getattr(ob, side).update(price, quantity)
+        ob.asks.top(LENGTH)
+        ob.bids.top(LENGTH)
+
+
+def main():
+    levels_list = [int(x) for x in sys.argv[1:]] or [100, 400, 1000, 2000]
+    print("%8s %16s %16s %8s" % ("levels", "dict+sort(us)", "sorted(us)", "speedup"))
+    for levels in levels_list:
+        updates = make_updates(levels, UPDATES)
+        t1 = min(timeit.repeat(lambda: run_dict_sort(levels, updates), number=1, repeat=3))
+        t2 = min(timeit.repeat(lambda: run_sorted_book(levels, updates), number=1, repeat=3))
+        print("%8d %16.2f %16.2f %7.1fx" % (levels, t1 / UPDATES * 1e6, t2 / UPDATES * 1e6, t1 / t2))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,30 +14,52 @@ from quant.config import config
 from quant.const import OKEX, OKEX_FUTURE, BINANCE, DERIBIT
 
 
-def initialize():
-    """ 初始化
+def get_market_class(platform):
+    """ 获取交易平台对应的行情类，不支持的平台返回None
+    @param platform 交易平台
     """
+    if platform == OKEX:
+        from platforms.okex import OKEx as Market
+    elif platform == OKEX_FUTURE:
+        from platforms.okex_ftu import OKExFuture as Market
+    elif platform == BINANCE:
+        from platforms.binance import Binance as Market
+    elif platform == DERIBIT:
+        from platforms.deribit import Deribit as Market
+    else:
+        from quant.utils import logger
+        logger.error("platform error! platform:", platform)
+        return None
+    return Market
+
 
+def initialize(config_file=None):
+    """ 初始化
+    @param config_file 配置文件，指定时启用配置热加载(utils.reload)
+    @return 已创建的行情对象 {platform: market}
+    """
+    from utils.consolidated import create_consolidator
+    create_consolidator(getattr(config, "CONSOLIDATED", None))  # 跨交易所合并订单薄，需在创建行情对象之前创建
+    markets = {}
     for platform in config.platforms:
-        if platform == OKEX:
-            from platforms.okex import OKEx as Market
-        elif platform == OKEX_FUTURE:
-            from platforms.okex_ftu import OKExFuture as Market
-        elif platform == BINANCE:
-            from platforms.binance import Binance as Market
-        elif platform == DERIBIT:
-            from platforms.deribit import Deribit as Market
-        else:
-            from quant.utils import logger
-            logger.error("platform error! platform:", platform)
+        Market = get_market_class(platform)
+        if not Market:
             continue
-        Market()
+        markets[platform] = Market()
+    if config_file:
+        from utils.reload import ConfigReloader
+        ConfigReloader(config_file, markets)
+    return markets
 
 
 def main():
     config_file = sys.argv[1]  # 配置文件 config.json
+    if "--supervisor" in sys.argv[2:]:  # 多进程模式，每个平台/分片运行在独立进程中
+        from supervisor import Supervisor
+        Supervisor(config_file).start()
+        return
     quant.initialize(config_file)
-    initialize()
+    initialize(config_file)
     quant.start()
 
 
@@ -8,8 +8,14 @@ Author: HuangTao
 Date:   2018/07/04
 """
 
+import atexit
+import random
+import asyncio
+import fnmatch
+
+import aiohttp
+
 from quant import const
-from quant.utils import tools
 from quant.utils import logger
 from quant.config import config
 from quant.const import BINANCE
@@ -17,26 +23,276 @@ from quant.utils.websocket import Websocket
 from quant.order import ORDER_ACTION_BUY, ORDER_ACTION_SELL
 from quant.event import EventTrade, EventKline, EventOrderbook
 
+from utils.event import EventTicker, EventKlinePartial
+from utils.orderbook import Orderbook
+from utils.conflation import Conflator
+from utils.recorder import create_recorder, receive_frames
+from utils.market_log import MarketLogger
+from utils.publisher import create_publisher
+from utils.metrics import MarketMetrics
+from utils.kline import create_kline_aggregator, kline_event
+from utils.ingest import create_ingest_queue, merge_levels
+from utils.depth_tiers import create_depth_tiers
+from utils.consolidated import venue_of
+from utils.reconnect import create_connection_health, sort_by_priority
+
+
+QUOTE_ASSETS = ("USDT", "FDUSD", "USDC", "BUSD", "TUSD", "BTC", "ETH", "BNB", "EUR", "TRY", "BRL")  # 计价币种，exchangeInfo 中没有的交易对按此拆分名称
+
+
+class BinanceConnection(Websocket):
+    """ Binance 单个websocket连接
+    连接建立后通过 SUBSCRIBE 方法订阅分配到本连接的数据流，收到的消息交给 Binance.process 处理，配置 ingest 时每个连接使用独立的接收队列。
+    """
+
+    SUBSCRIBE_BATCH = 200  # 单条 SUBSCRIBE 消息最多包含的数据流数量
+    SUBSCRIBE_DELAY = 0.25  # 连续发送 SUBSCRIBE 消息的间隔(秒)，交易所限制每个连接每秒最多5条消息
+
+    def __init__(self, market, index, url, streams, ingest=None, recorder=None):
+        """ 初始化
+        @param market Binance 行情对象
+        @param index 连接序号
+        @param url 连接地址
+        @param streams 分配到本连接的数据流列表
+        @param ingest 接收队列 IngestQueue，None为在读取协程中直接处理
+        @param recorder 原始数据帧录制器，None为不录制
+        """
+        self._market = market
+        self._index = index
+        self._streams = list(streams)
+        self._ingest = ingest
+        self._recorder = recorder
+        self.health = None  # 连接状态 ConnectionHealth，由 Binance 创建
+        self._request_id = 0
+        super(BinanceConnection, self).__init__(url)
+        self.initialize()
+
+    @property
+    def streams(self):
+        return self._streams
+
+    @property
+    def connected(self):
+        return self.ws is not None and not self.ws.closed
+
+    async def connected_callback(self):
+        """ 建立连接之后，订阅本连接的全部数据流
+        """
+        await self._send("SUBSCRIBE", self._streams)
+        logger.info("subscribe success. connection:", self._index, "streams:", len(self._streams), caller=self)
+
+    async def subscribe(self, streams):
+        """ 在当前连接上增加订阅，未连接时在连接建立后订阅
+        @param streams 数据流列表
+        """
+        streams = [s for s in streams if s not in self._streams]
+        self._streams.extend(streams)
+        if streams and self.connected:
+            await self._send("SUBSCRIBE", streams)
+
+    async def unsubscribe(self, streams):
+        """ 在当前连接上取消订阅
+        @param streams 数据流列表
+        """
+        streams = [s for s in streams if s in self._streams]
+        for stream in streams:
+            self._streams.remove(stream)
+        if streams and self.connected:
+            await self._send("UNSUBSCRIBE", streams)
+
+    async def _send(self, method, streams):
+        for i in range(0, len(streams), self.SUBSCRIBE_BATCH):
+            if i:
+                await asyncio.sleep(self.SUBSCRIBE_DELAY)
+            self._request_id += 1
+            msg = {
+                "method": method,
+                "params": streams[i:i + self.SUBSCRIBE_BATCH],
+                "id": self._request_id
+            }
+            await self.ws.send_json(msg)
+
+    async def _reconnect(self):
+        """ 连接断开后不立即重连(覆盖框架 Websocket._reconnect)，由重连调度器按退避时间及优先级安排重连
+        """
+        self._market.connection_lost(self)
+
+    async def receive(self):
+        """ 接收数据帧(覆盖框架 Websocket.receive)，在JSON解析前记录接收时间，配置录制时在解析前录制收到的原始文本帧
+        """
+        await receive_frames(self, self._recorder, self._market._metrics)
 
-class Binance(Websocket):
+    async def process(self, msg):
+        if self.health.waiting:
+            self.health.received()
+        await self._market.process(msg, self._ingest)
+
+
+class Binance:
     """ Binance 行情数据
+    数据流按 max_streams 分配到多个websocket连接上，每个连接独立接收及处理，单个连接阻塞不影响其它连接；
+    全市场ticker数据流使用单独的连接，不与按交易对订阅的数据流共用。
     """
 
     def __init__(self):
         self._platform = BINANCE
-        self._url = config.platforms.get(self._platform).get("wss", "wss://stream.binance.com:9443")
-        self._symbols = list(set(config.platforms.get(self._platform).get("symbols")))
-        self._channels = config.platforms.get(self._platform).get("channels")
+        self._config = config.platforms.get(self._platform)
+        self._url = self._config.get("wss", "wss://stream.binance.com:9443")
+        self._priority_symbols = self._config.get("priority_symbols", [])  # 优先订阅、所在连接优先重连的交易对
+        self._symbols = sort_by_priority(set(self._config.get("symbols")), self._priority_symbols)
+        self._channels = self._config.get("channels")
+
+        self._max_streams = self._config.get("max_streams", 200)  # 单个连接最多订阅的数据流数量
+        self._rest_url = self._config.get("rest", "https://api.binance.com")
+        self._orderbook_mode = self._config.get("orderbook_mode", "depth20")  # 订单薄模式 depth20 快照 / diff 增量维护本地订单薄
+        self._orderbook_length = self._config.get("orderbook_length", 20)  # diff 模式订单薄推送长度，0为全部
+        self._snapshot_limit = self._config.get("snapshot_limit", 1000)  # diff 模式订单薄快照档数
+        self._ticker_streams = self._config.get("ticker_streams", ["!miniTicker@arr", "!bookTicker"])  # 全市场ticker数据流
+        self._ticker_filter = self._config.get("ticker_symbols")  # ticker交易对过滤，支持通配符，如 ["BTC/USDT", "*/BTC"]
 
         self._c_to_s = {}  # {"channel": "symbol"}
+        self._connections = []  # websocket连接 [BinanceConnection, ...]
+        self._ticker_connection = None  # 全市场ticker数据流的连接
         self._tickers = {}  # 最新行情 {"symbol": price_info}
+        self._exchange_symbols = {}  # exchangeInfo 中的交易对名称 {"BTCUSDT": "BTC/USDT"}
+        self._ticker_symbols = self._make_ticker_symbols()  # 交易对名称转换缓存 {"BTCUSDT": "BTC/USDT"}，被过滤的为None
+        self._ticker_recv_ts = {}  # ticker最新数据的接收时间 {"symbol": recv_ts}
+        self._orderbooks = {}  # 最新订单薄 {"symbol": orderbook}
+        self._orderbook_recv_ts = {}  # depth20 模式最新订单薄的接收时间 {"symbol": recv_ts}
+        self._depth_books = {}  # diff 模式本地订单薄 {"symbol": Orderbook}
+        self._depth_update_ids = {}  # diff 模式最后一次更新id {"symbol": update_id}
+        self._depth_buffers = {}  # diff 模式等待快照时缓存的增量数据 {"symbol": [data, ...]}
+        self._depth_resyncs = {}  # diff 模式重新同步次数 {"symbol": count}
+        self._depth_attempts = {}  # diff 模式连续同步失败次数 {"symbol": count}
+        self._depth_syncing = set()  # diff 模式正在同步(获取快照或等待重试)的交易对
+        resync = self._config.get("resync", {})  # diff 模式同步失败后的重试退避
+        self._resync_base_delay = resync.get("base_delay", 1)
+        self._resync_max_delay = resync.get("max_delay", 60)
+        self._stale = {}  # 连接断开后过期的订单薄 {"symbol": ConnectionHealth}
+        self._session = None  # 获取订单薄快照及交易对信息的HTTP会话，所有交易对共用
+        interval = self._config.get("conflation_interval", 0)  # 订单薄合并推送周期(毫秒)
+        self._conflator = Conflator(self.publish_orderbook, interval)
+        self._recorder = create_recorder(self._platform, self._config)  # 原始数据帧录制
+        self._market_log = MarketLogger(self._config.get("market_log"))  # 行情日志
+        self._publisher = create_publisher(self._config)  # 行情事件发布
+        self._ticker_conflator = Conflator(self.publish_ticker, self._config.get("ticker_interval", 1000))  # ticker合并推送，只推送发生变化的交易对
+        self._metrics = MarketMetrics(self._platform, self._config.get("metrics_interval", 0))  # 延迟统计
+        self._tiers = create_depth_tiers(self._platform, self._config, self.orderbook_snapshot, self._publisher,
+                                         self._metrics)  # 多档位订单薄推送
+        self._consolidated = venue_of(self._platform, self.orderbook_snapshot)  # 跨交易所合并订单薄
+        self._kline_aggregator = create_kline_aggregator(self._platform, self._config, self.publish_kline)  # 多周期K线合成
 
-        self._make_url()
-        super(Binance, self).__init__(self._url)
-        self.initialize()
+        streams = self._make_streams()
+        tickers = [s for s in streams if s in self._ticker_streams]
+        streams = [s for s in streams if s not in self._ticker_streams]
+        for i in range(0, len(streams), self._max_streams):
+            self._add_connection(streams[i:i + self._max_streams])
+        if tickers:
+            self._ticker_connection = self._add_connection(tickers)
+            asyncio.get_event_loop().create_task(self.load_exchange_symbols())
+        if self._orderbook_mode == "diff" or tickers:
+            atexit.register(self.close)
+
+    def _add_connection(self, streams):
+        """ 新建一个websocket连接
+        @param streams 分配到该连接的数据流列表
+        """
+        index = len(self._connections)
+        ingest = create_ingest_queue(self._platform, self._config, "connection-%d" % index, self.process_queued,
+                                     {"orderbook": "latest"})
+        conn = BinanceConnection(self, index, self._url + "/stream", streams, ingest, self._recorder)
+        conn.health = create_connection_health(self._platform, self._config, "connection-%d" % index, conn,
+                                               self._publisher)
+        self._connections.append(conn)
+        return conn
+
+    async def subscribe(self, streams):
+        """ 增加订阅，优先分配到未满的连接上，所有连接已满时新建连接；全市场ticker数据流订阅在单独的连接上
+        @param streams 数据流列表
+        """
+        subscribed = set(s for conn in self._connections for s in conn.streams)
+        streams = [s for s in streams if s not in subscribed]
+        tickers = [s for s in streams if s in self._ticker_streams]
+        if tickers:
+            streams = [s for s in streams if s not in self._ticker_streams]
+            if self._ticker_connection:
+                await self._ticker_connection.subscribe(tickers)
+            else:
+                self._ticker_connection = self._add_connection(tickers)
+                asyncio.get_event_loop().create_task(self.load_exchange_symbols())
+        for conn in self._connections:
+            if not streams:
+                return
+            if conn is self._ticker_connection:
+                continue
+            free = self._max_streams - len(conn.streams)
+            if free > 0:
+                await conn.subscribe(streams[:free])
+                streams = streams[free:]
+        for i in range(0, len(streams), self._max_streams):
+            self._add_connection(streams[i:i + self._max_streams])
+
+    async def unsubscribe(self, streams):
+        """ 取消订阅
+        @param streams 数据流列表
+        """
+        for conn in self._connections:
+            await conn.unsubscribe([s for s in streams if s in conn.streams])
 
-    def _make_url(self):
-        """ 拼接请求url
+    async def reload(self, platform_config):
+        """ 热加载交易对及行情类型，在现有连接上 SUBSCRIBE 新增的数据流、UNSUBSCRIBE 移除的数据流，未受影响交易对的订单薄保持不变
+        @param platform_config 新的平台行情配置
+        """
+        old = set(s for conn in self._connections for s in conn.streams)
+        self._symbols = sort_by_priority(set(platform_config.get("symbols")), self._priority_symbols)
+        self._channels = platform_config.get("channels")
+        self._ticker_filter = platform_config.get("ticker_symbols")
+        self._ticker_symbols = self._make_ticker_symbols()
+        for symbol in [s for s in self._tickers if not self._ticker_allowed(s)]:  # 不再符合过滤条件的交易对
+            self._tickers.pop(symbol)
+            self._ticker_recv_ts.pop(symbol, None)
+            self._ticker_conflator.discard(symbol)
+        new = self._make_streams()
+        subscribe = [s for s in new if s not in old]
+        unsubscribe = list(old - set(new))
+        for stream in unsubscribe:
+            symbol = self._c_to_s.pop(stream, None)
+            if symbol and "@depth" in stream:  # 不再订阅订单薄的交易对丢弃本地订单薄
+                self._orderbooks.pop(symbol, None)
+                self._orderbook_recv_ts.pop(symbol, None)
+                self._depth_books.pop(symbol, None)
+                self._depth_update_ids.pop(symbol, None)
+                self._depth_buffers.pop(symbol, None)
+                self._conflator.discard(symbol)
+                health = self._stale.pop(symbol, None)
+                if health:
+                    health.discard(symbol)
+                if self._tiers:
+                    self._tiers.discard(symbol)
+                if self._consolidated:
+                    self._consolidated.discard(symbol)
+        await self.unsubscribe(unsubscribe)
+        await self.subscribe(subscribe)
+        if "ticker" in self._channels:
+            await self.load_exchange_symbols()
+        if not self._depth_syncing:  # 没有正在同步的交易对时释放HTTP会话，下次请求时重新创建
+            await self.close_session()
+        logger.info("reload success. subscribe:", len(subscribe), "unsubscribe:", len(unsubscribe),
+                    "connections:", len(self._connections), caller=self)
+
+    def connection_lost(self, conn):
+        """ 连接断开，该连接上的订单薄保留并标记为过期，按连接上是否有优先交易对安排重连
+        diff 模式重连后更新id连续时直接继续使用本地订单薄，不连续时自动重新同步
+        @param conn 断开的连接
+        """
+        symbols = [self._c_to_s[s] for s in conn.streams if "@depth" in s and s in self._c_to_s]
+        for symbol in symbols:
+            self._stale[symbol] = conn.health
+        priority = 1 if any(s in self._priority_symbols for s in symbols) else 0
+        conn.health.disconnected(symbols, priority)
+
+    def _make_streams(self):
+        """ 生成需要订阅的数据流列表
         """
         cc = []
         for ch in self._channels:
@@ -44,26 +300,62 @@ class Binance(Websocket):
                 for symbol in self._symbols:
                     c = self._symbol_to_channel(symbol, "kline_1m")
                     cc.append(c)
-            elif ch == "orderbook":  # 订阅订单薄 深度为5
+            elif ch == "orderbook":  # 订阅订单薄 深度为20 / 增量
+                channel_type = "depth@100ms" if self._orderbook_mode == "diff" else "depth20"
                 for symbol in self._symbols:
-                    c = self._symbol_to_channel(symbol, "depth20")
+                    c = self._symbol_to_channel(symbol, channel_type)
                     cc.append(c)
             elif ch == "trade":  # 订阅实时交易
                 for symbol in self._symbols:
                     c = self._symbol_to_channel(symbol, "trade")
                     cc.append(c)
+            elif ch == "ticker":  # 订阅全市场ticker
+                cc.extend(self._ticker_streams)
             else:
                 logger.error("channel error! channel:", ch, caller=self)
-        self._url += "/stream?streams=" + "/".join(cc)
+        return cc
 
-    async def process(self, msg):
-        """ 处理websocket上接收到的消息
+    async def process(self, msg, ingest=None):
+        """ 处理websocket上接收到的消息，接收时间已由 BinanceConnection.receive 在解析前记录
+        @param ingest 消息所属连接的接收队列，None为直接处理
         """
         # logger.debug("msg:", msg, caller=self)
         if not isinstance(msg, dict):
             return
+        if "id" in msg and ("result" in msg or "error" in msg):  # SUBSCRIBE / UNSUBSCRIBE 返回
+            if msg.get("error") or msg.get("result") is not None:
+                logger.warn("subscribe response:", msg, caller=self)
+            return
+        if ingest:
+            stream = msg.get("stream") or ""
+            kind = stream.split("@", 1)[-1]
+            if stream in self._ticker_streams:
+                channel = "ticker"
+            elif kind.startswith("depth"):
+                channel = "orderbook"
+            elif kind.startswith("kline"):
+                channel = "kline"
+            else:
+                channel = kind
+            merge = self._merge_depth if channel == "orderbook" else None
+            await ingest.put(channel, self._c_to_s.get(stream), (msg, self._metrics.recv_ts), merge)
+            return
+        await self.deal_message(msg)
+
+    async def process_queued(self, item):
+        """ 处理接收队列中的消息
+        @param item (msg, recv_ts)
+        """
+        msg, self._metrics.recv_ts = item
+        await self.deal_message(msg)
 
+    async def deal_message(self, msg):
+        """ 处理数据流消息
+        """
         channel = msg.get("stream")
+        if channel in self._ticker_streams:
+            self.deal_ticker(channel, msg.get("data"))
+            return
         if channel not in self._c_to_s:
             logger.warn("unkown channel, msg:", msg, caller=self)
             return
@@ -85,8 +377,12 @@ class Binance(Websocket):
                 "timestamp": data.get("k").get("t"),  # 时间戳
                 "kline_type": const.MARKET_TYPE_KLINE
             }
-            EventKline(**kline).publish()
-            logger.info("symbol:", symbol, "kline:", kline, caller=self)
+            self._publisher.publish(EventKline(**kline))
+            self._metrics.published("kline", symbol, data.get("E"))
+            self._market_log.log("kline", symbol, kline, caller=self)
+            if self._kline_aggregator:
+                self._kline_aggregator.on_kline(symbol, kline["open"], kline["high"], kline["low"], kline["close"],
+                                                kline["volume"], kline["timestamp"])
         elif channel.endswith("depth20"):  # 订单薄
             bids = []
             asks = []
@@ -99,10 +395,19 @@ class Binance(Websocket):
                 "symbol": symbol,
                 "asks": asks,
                 "bids": bids,
-                "timestamp": tools.get_cur_timestamp_ms()
+                "timestamp": int(self._metrics.recv_ts * 1000)  # 快照数据不包含交易所时间，使用接收时间
             }
-            EventOrderbook(**orderbook).publish()
-            logger.info("symbol:", symbol, "orderbook:", orderbook, caller=self)
+            self._orderbooks[symbol] = orderbook
+            self._orderbook_recv_ts[symbol] = self._metrics.recv_ts
+            self._conflator.update(symbol)
+            if self._tiers:
+                self._tiers.update(symbol)
+            if self._consolidated:
+                self._consolidated.update(symbol)
+            if symbol in self._stale:
+                self._stale.pop(symbol).book_received(symbol)
+        elif e == "depthUpdate":  # 增量订单薄
+            self.deal_depth_update(symbol, data)
         elif e == "trade":  # 实时成交信息
             trade = {
                 "platform": self._platform,
@@ -112,11 +417,316 @@ class Binance(Websocket):
                 "quantity": data.get("q"),
                 "timestamp": data.get("T")
             }
-            EventTrade(**trade).publish()
-            logger.info("symbol:", symbol, "trade:", trade, caller=self)
+            self._publisher.publish(EventTrade(**trade))
+            self._metrics.published("trade", symbol, data.get("E"))
+            self._market_log.log("trade", symbol, trade, caller=self)
+            if self._kline_aggregator:
+                self._kline_aggregator.on_trade(symbol, trade["price"], trade["quantity"], trade["timestamp"])
         else:
             logger.error("event error! msg:", msg, caller=self)
 
+    def deal_depth_update(self, symbol, data):
+        """ 处理增量订单薄数据
+        未同步快照时先缓存增量数据并拉取快照；更新id不连续时丢弃本地订单薄重新同步。
+        https://github.com/binance-exchange/binance-official-api-docs/blob/master/web-socket-streams.md#how-to-manage-a-local-order-book-correctly
+        """
+        ob = self._depth_books.get(symbol)
+        if ob is None:
+            buffer = self._depth_buffers.get(symbol)
+            if buffer is None:
+                self._depth_buffers[symbol] = [data]
+                if symbol not in self._depth_syncing:
+                    asyncio.get_event_loop().create_task(self.sync_depth(symbol))
+            else:
+                buffer.append(data)
+            return
+        last_id = self._depth_update_ids[symbol]
+        if data["u"] <= last_id:
+            return
+        if data["U"] > last_id + 1:
+            logger.warn("depth update gap! symbol:", symbol, "last:", last_id, "U:", data["U"], caller=self)
+            self._depth_resyncs[symbol] = self._depth_resyncs.get(symbol, 0) + 1
+            self._depth_books.pop(symbol)
+            self._depth_buffers[symbol] = [data]
+            if symbol not in self._depth_syncing:
+                asyncio.get_event_loop().create_task(self.sync_depth(symbol))
+            return
+        self._apply_depth(ob, data.get("a"), data.get("b"))
+        ob.timestamp = data.get("E")
+        ob.recv_ts = self._metrics.recv_ts
+        self._depth_update_ids[symbol] = data["u"]
+        self._conflator.update(symbol)
+        if self._tiers:
+            self._tiers.update(symbol)
+        if self._consolidated:
+            self._consolidated.update(symbol)
+        if symbol in self._stale:
+            self._stale.pop(symbol).book_received(symbol)
+
+    @staticmethod
+    def _merge_depth(old, new):
+        """ 合并接收队列中同一交易对等待处理的订单薄消息，depth20 快照直接替换，增量数据更新id连续时合并为一条
+        @param old 等待处理的消息 (msg, recv_ts)
+        @param new 新收到的消息 (msg, recv_ts)
+        @return 合并后的消息，更新id不连续时返回None
+        """
+        last = old[0]["data"]
+        data = new[0]["data"]
+        if "U" not in data:
+            return new
+        if data["U"] != last["u"] + 1:
+            return None
+        last["a"] = merge_levels(last.get("a"), data.get("a"))
+        last["b"] = merge_levels(last.get("b"), data.get("b"))
+        last["u"] = data["u"]
+        last["E"] = data.get("E")
+        return old
+
+    async def sync_depth(self, symbol):
+        """ 拉取订单薄快照，并应用快照之后缓存的增量数据
+        快照获取失败或早于缓存的增量数据时按退避时间(指数增长并随机抖动)等待后重试，等待期间继续缓存增量数据，取消订阅后停止重试
+        @param symbol 交易对
+        """
+        self._depth_syncing.add(symbol)
+        try:
+            while symbol in self._depth_buffers:
+                try:
+                    snapshot = await self._get_depth_snapshot(symbol)
+                except Exception as e:
+                    logger.error("get depth snapshot error! symbol:", symbol, "error:", e, caller=self)
+                    snapshot = None
+                if symbol not in self._depth_buffers:  # 获取快照期间已取消订阅
+                    return
+                if snapshot and self._apply_depth_snapshot(symbol, snapshot):
+                    self._depth_attempts.pop(symbol, None)
+                    return
+                attempts = self._depth_attempts.get(symbol, 0)
+                self._depth_attempts[symbol] = attempts + 1
+                delay = min(self._resync_max_delay, self._resync_base_delay * 2 ** attempts)
+                delay = random.uniform(delay / 2, delay)
+                logger.warn("depth resync scheduled. symbol:", symbol, "attempts:", attempts + 1,
+                            "delay: %.2fs" % delay, caller=self)
+                await asyncio.sleep(delay)
+        finally:
+            self._depth_syncing.discard(symbol)
+
+    def _apply_depth_snapshot(self, symbol, snapshot):
+        """ 以快照初始化本地订单薄并应用缓存的增量数据
+        @param symbol 交易对
+        @param snapshot REST订单薄快照
+        @return 是否同步成功，快照早于缓存的增量数据时返回False并保留缓存
+        """
+        buffer = self._depth_buffers[symbol]
+        last_id = snapshot["lastUpdateId"]
+        ob = Orderbook()
+        self._apply_depth(ob, snapshot.get("asks"), snapshot.get("bids"))
+        for data in buffer:
+            if data["u"] <= last_id:
+                continue
+            if data["U"] > last_id + 1:  # 快照早于缓存的增量数据
+                logger.warn("depth snapshot too old! symbol:", symbol, "lastUpdateId:", snapshot["lastUpdateId"],
+                            "U:", data["U"], caller=self)
+                return False
+            self._apply_depth(ob, data.get("a"), data.get("b"))
+            ob.timestamp = data.get("E")
+            last_id = data["u"]
+        del self._depth_buffers[symbol]
+        ob.recv_ts = self._metrics.recv_ts
+        self._depth_books[symbol] = ob
+        self._depth_update_ids[symbol] = last_id
+        logger.info("depth synced. symbol:", symbol, "lastUpdateId:", last_id, caller=self)
+        self._conflator.update(symbol)
+        if self._tiers:
+            self._tiers.update(symbol)
+        if self._consolidated:
+            self._consolidated.update(symbol)
+        if symbol in self._stale:
+            self._stale.pop(symbol).book_received(symbol)
+        return True
+
+    async def _get_depth_snapshot(self, symbol):
+        """ 通过REST接口获取订单薄快照
+        @param symbol 交易对
+        """
+        if not self._session or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        url = self._rest_url + "/api/v3/depth"
+        params = {"symbol": symbol.replace("/", ""), "limit": self._snapshot_limit}
+        async with self._session.get(url, params=params, proxy=config.proxy) as response:
+            if response.status != 200:
+                logger.error("get depth snapshot failed! symbol:", symbol, "status:", response.status,
+                             "body:", await response.text(), caller=self)
+                return None
+            return await response.json()
+
+    async def load_exchange_symbols(self):
+        """ 通过REST接口 exchangeInfo 获取全部交易对的 币种/计价币种，用于转换ticker数据中的交易对名称
+        获取失败时继续使用配置的交易对，其它交易对按计价币种拆分名称
+        """
+        try:
+            info = await self._get_exchange_info()
+        except Exception as e:
+            logger.error("get exchange info error! error:", e, caller=self)
+            return
+        if not info:
+            return
+        self._exchange_symbols = {item["symbol"]: item["baseAsset"] + "/" + item["quoteAsset"]
+                                  for item in info.get("symbols", [])}
+        self._ticker_symbols = self._make_ticker_symbols()
+        logger.info("exchange symbols loaded. count:", len(self._exchange_symbols), caller=self)
+
+    async def _get_exchange_info(self):
+        """ 通过REST接口获取交易规则及交易对信息
+        """
+        if not self._session or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        url = self._rest_url + "/api/v3/exchangeInfo"
+        async with self._session.get(url, proxy=config.proxy) as response:
+            if response.status != 200:
+                logger.error("get exchange info failed! status:", response.status, "body:", await response.text(),
+                             caller=self)
+                return None
+            return await response.json()
+
+    async def close_session(self):
+        """ 关闭HTTP会话
+        """
+        session, self._session = self._session, None
+        if session and not session.closed:
+            await session.close()
+
+    def close(self):
+        """ 进程退出时关闭HTTP会话
+        """
+        if not self._session or self._session.closed:
+            return
+        loop = asyncio.get_event_loop()
+        if loop.is_running():
+            loop.create_task(self.close_session())
+        elif not loop.is_closed():
+            loop.run_until_complete(self.close_session())
+
+    def _apply_depth(self, ob, asks, bids):
+        """ 更新本地订单薄，每档数据保存交易所推送的原始字符串 [price, quantity]
+        """
+        for ask in asks or []:
+            ob.asks.update(float(ask[0]), float(ask[1]), ask[:2])
+        for bid in bids or []:
+            ob.bids.update(float(bid[0]), float(bid[1]), bid[:2])
+
+    def deal_ticker(self, channel, data):
+        """ 处理全市场ticker数据
+        !miniTicker@arr 每秒推送一次24小时统计发生变化的交易对列表，!bookTicker 实时推送各交易对的买一卖一
+        """
+        if channel == "!bookTicker":
+            data = [data]
+        for item in data:
+            symbol = self._to_symbol(item["s"])
+            if symbol is None:
+                continue
+            ticker = self._tickers.get(symbol)
+            if ticker is None:
+                ticker = self._tickers[symbol] = {"platform": self._platform, "symbol": symbol, "timestamp": 0}
+            if "b" in item:  # bookTicker
+                ticker["bid"] = item["b"]
+                ticker["bid_quantity"] = item["B"]
+                ticker["ask"] = item["a"]
+                ticker["ask_quantity"] = item["A"]
+                ticker["timestamp"] = int(self._metrics.recv_ts * 1000)
+            else:  # 24hrMiniTicker
+                ticker["last"] = item["c"]
+                ticker["open"] = item["o"]
+                ticker["high"] = item["h"]
+                ticker["low"] = item["l"]
+                ticker["volume"] = item["v"]
+                ticker["quote_volume"] = item["q"]
+                ticker["timestamp"] = item["E"]
+            self._ticker_recv_ts[symbol] = self._metrics.recv_ts
+            self._ticker_conflator.update(symbol)
+
+    def publish_ticker(self, symbol):
+        """ 推送ticker数据
+        @param symbol 交易对
+        """
+        ticker = dict(self._tickers[symbol])
+        self._publisher.publish(EventTicker(**ticker))
+        self._market_log.log("ticker", symbol, ticker, caller=self)
+        self._metrics.published("ticker", symbol, ticker["timestamp"], self._ticker_recv_ts.get(symbol))
+
+    def _make_ticker_symbols(self):
+        """ 交易对名称转换缓存初始值，包含配置的交易对及 exchangeInfo 中的交易对，不符合 ticker_symbols 过滤条件的为None
+        """
+        symbols = dict(self._exchange_symbols)
+        symbols.update((s.replace("/", ""), s) for s in self._symbols)
+        return {name: symbol if self._ticker_allowed(symbol) else None for name, symbol in symbols.items()}
+
+    def _to_symbol(self, name):
+        """ 交易所交易对名称(如 BTCUSDT)转换为 BTC/USDT，不符合 ticker_symbols 过滤条件时返回None
+        配置及 exchangeInfo 中都没有的交易对按已知的计价币种拆分名称
+        """
+        symbol = self._ticker_symbols.get(name)
+        if symbol is None and name not in self._ticker_symbols:
+            symbol = name
+            for quote in QUOTE_ASSETS:
+                if name.endswith(quote) and len(name) > len(quote):
+                    symbol = name[:-len(quote)] + "/" + quote
+                    break
+            if not self._ticker_allowed(symbol):
+                symbol = None
+            self._ticker_symbols[name] = symbol
+        return symbol
+
+    def _ticker_allowed(self, symbol):
+        """ 交易对是否符合 ticker_symbols 过滤条件，未配置时全部符合
+        """
+        return not self._ticker_filter or any(fnmatch.fnmatchcase(symbol, p) for p in self._ticker_filter)
+
+    def publish_kline(self, kline, closed):
+        """ 推送合成的多周期K线
+        @param kline K线数据
+        @param closed K线是否已结束，未结束K线以 EventKlinePartial 推送，已结束K线按周期以 EventKline / EventKlineInterval 推送
+        """
+        if not closed:
+            self._publisher.publish(EventKlinePartial(**kline))
+            return
+        self._publisher.publish(kline_event(kline))
+        self._market_log.log(kline["kline_type"], kline["symbol"], kline, caller=self)
+
+    def publish_orderbook(self, symbol):
+        """ 推送orderbook数据
+        @param symbol 交易对
+        """
+        snapshot = self.orderbook_snapshot(symbol, self._orderbook_length or None)
+        if not snapshot:
+            return
+        orderbook, exchange_ts, recv_ts = snapshot
+        self._publisher.publish(EventOrderbook(**orderbook))
+        self._metrics.published("orderbook", symbol, exchange_ts, recv_ts)
+        self._market_log.log("orderbook", symbol, orderbook, caller=self)
+
+    def orderbook_snapshot(self, symbol, length):
+        """ 获取订单薄前length档数据，depth20 模式最多20档
+        @param symbol 交易对
+        @param length 档数，None为 diff 模式本地订单薄全部档位
+        @return (orderbook, exchange_ts, recv_ts)，订单薄不可用时返回None
+        """
+        ob = self._depth_books.get(symbol)
+        if ob is not None:
+            orderbook = {
+                "platform": self._platform,
+                "symbol": symbol,
+                "asks": ob.asks.raws(length),
+                "bids": ob.bids.raws(length),
+                "timestamp": ob.timestamp
+            }
+            return orderbook, ob.timestamp, ob.recv_ts
+        orderbook = self._orderbooks.get(symbol)
+        if not orderbook:
+            return None
+        if self._orderbook_mode == "depth20" and length and length < 20:
+            orderbook = dict(orderbook, asks=orderbook["asks"][:length], bids=orderbook["bids"][:length])
+        return orderbook, None, self._orderbook_recv_ts.get(symbol)
+
     def _symbol_to_channel(self, symbol, channel_type="ticker"):
         """ symbol转换到channel
         @param symbol symbol名字
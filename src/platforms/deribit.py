@@ -19,6 +19,15 @@ from quant.const import DERIBIT
 from quant.event import EventOrderbook
 from quant.utils.websocket import Websocket
 
+from utils.conflation import Conflator
+from utils.recorder import create_recorder, receive_frames
+from utils.market_log import MarketLogger
+from utils.publisher import create_publisher
+from utils.metrics import MarketMetrics, registry
+from utils.depth_tiers import create_depth_tiers
+from utils.consolidated import venue_of
+from utils.reconnect import create_connection_health, sort_by_priority
+
 
 class Deribit(Websocket):
     """ deribit外盘行情
@@ -27,10 +36,24 @@ class Deribit(Websocket):
     def __init__(self):
         self._platform = DERIBIT
         self._url = config.platforms.get(self._platform).get("wss")
-        self._symbols = list(set(config.platforms.get(self._platform).get("symbols")))
+        self._priority_symbols = config.platforms.get(self._platform).get("priority_symbols", [])  # 优先订阅的合约
+        self._symbols = sort_by_priority(set(config.platforms.get(self._platform).get("symbols")), self._priority_symbols)
         self._access_key = config.platforms.get(self._platform).get("access_key")
         self._secret_key = config.platforms.get(self._platform).get("secret_key")
-        self._last_msg_ts = tools.get_cur_timestamp() # 上次接收到消息的时间戳
+        self._length = config.platforms.get(self._platform).get("orderbook_length", 10) or None  # 订单薄数据推送长度，0为全部
+        self._orderbooks = {}  # 最新订单薄 {"symbol": (result, recv_ts)}
+        interval = config.platforms.get(self._platform).get("conflation_interval", 0)  # 订单薄合并推送周期(毫秒)，0为每次变化立即推送
+        self._conflator = Conflator(self.publish_orderbook, interval)
+        self._recorder = create_recorder(self._platform, config.platforms.get(self._platform))  # 原始数据帧录制
+        self._market_log = MarketLogger(config.platforms.get(self._platform).get("market_log"))  # 行情日志
+        self._publisher = create_publisher(config.platforms.get(self._platform))  # 行情事件发布
+        self._metrics = MarketMetrics(self._platform, config.platforms.get(self._platform).get("metrics_interval", 0))  # 延迟统计
+        registry.register_gauge(self._platform, "conflation", lambda: self.conflation_stats)  # 订单薄合并推送统计
+        self._tiers = create_depth_tiers(self._platform, config.platforms.get(self._platform), self.orderbook_snapshot,
+                                         self._publisher, self._metrics)  # 多档位订单薄推送
+        self._consolidated = venue_of(self._platform, self.orderbook_snapshot)  # 跨交易所合并订单薄
+        self._health = create_connection_health(self._platform, config.platforms.get(self._platform), self._platform,
+                                                self, self._publisher)  # 连接状态及重连调度
 
         super(Deribit, self).__init__(self._url)
         self.heartbeat_msg = {"action": "/api/v1/public/ping"}
@@ -39,12 +62,25 @@ class Deribit(Websocket):
     async def connected_callback(self):
         """ 建立连接之后，订阅事件
         """
-        nonce = tools.get_cur_timestamp_ms()
-        uri = "/api/v1/private/subscribe"
+        await self._subscribe(self._symbols)
+        logger.info("subscribe orderbook success.", caller=self)
+
+    async def _subscribe(self, instruments):
+        """ 订阅合约的订单薄
+        @param instruments 合约列表
+        """
         params = {
-            "instrument": self._symbols,
+            "instrument": instruments,
             "event": ["order_book"]
         }
+        await self._send("/api/v1/private/subscribe", params)
+
+    async def _send(self, uri, params):
+        """ 发送私有接口请求
+        @param uri 接口路径
+        @param params 请求参数
+        """
+        nonce = tools.get_cur_timestamp_ms()
         sign = self.deribit_signature(nonce, uri, params, self._access_key, self._secret_key)
         data = {
             "id": "huangtao",
@@ -53,42 +89,116 @@ class Deribit(Websocket):
             "sig": sign
         }
         await self.ws.send_json(data)
-        logger.info("subscribe orderbook success.", caller=self)
+
+    async def reload(self, platform_config):
+        """ 热加载合约列表，在当前连接上订阅新增的合约，未受影响合约的订单薄保持不变
+        v1 接口的 unsubscribe 会取消全部订阅，有合约被移除时先取消全部订阅再订阅新的合约列表
+        @param platform_config 新的平台行情配置
+        """
+        symbols = sort_by_priority(set(platform_config.get("symbols")), self._priority_symbols)
+        removed = [s for s in self._symbols if s not in symbols]
+        added = [s for s in symbols if s not in self._symbols]
+        self._symbols = symbols
+        for symbol in removed:
+            self._orderbooks.pop(symbol, None)
+            self._conflator.discard(symbol)
+            self._health.discard(symbol)
+            if self._tiers:
+                self._tiers.discard(symbol)
+            if self._consolidated:
+                self._consolidated.discard(symbol)
+        if self.ws and not self.ws.closed:
+            if removed:
+                await self._send("/api/v1/private/unsubscribe", {})
+                await self._subscribe(self._symbols)
+            elif added:
+                await self._subscribe(added)
+        logger.info("reload success. added:", added, "removed:", removed, caller=self)
+
+    async def _reconnect(self):
+        """ 连接断开后不立即重连(覆盖框架 Websocket._reconnect)，订单薄保留并标记为过期，由重连调度器按退避时间及优先级安排重连
+        """
+        self._health.disconnected(list(self._orderbooks.keys()), 1 if self._priority_symbols else 0)
+
+    async def receive(self):
+        """ 配置录制时在解析前录制收到的原始文本帧(覆盖框架 Websocket.receive)
+        """
+        if not self._recorder:
+            return await super(Deribit, self).receive()
+        await receive_frames(self, self._recorder)
 
     async def process(self, msg):
         """ 处理websocket上接收到的消息
         """
         # logger.debug("msg:", msg, caller=self)
-        if tools.get_cur_timestamp() <= self._last_msg_ts:
-            return
+        self._metrics.received()
+        if self._health.waiting:
+            self._health.received()
         if not isinstance(msg, dict):
             return
         notifications = msg.get("notifications")
         if not notifications:
             return
-        message = notifications[0].get("message")
-        if message != "order_book_event":
+        for notification in notifications:
+            if notification.get("message") != "order_book_event":
+                continue
+            result = notification.get("result")
+            symbol = result.get("instrument")
+            if symbol not in self._symbols:  # 已移除的合约
+                continue
+            self._orderbooks[symbol] = (result, self._metrics.recv_ts)
+            self._conflator.update(symbol)
+            if self._tiers:
+                self._tiers.update(symbol)
+            if self._consolidated:
+                self._consolidated.update(symbol)
+            if self._health.active:
+                self._health.book_received(symbol)
+
+    def publish_orderbook(self, symbol):
+        """ 推送orderbook数据，合并周期内只推送最新的订单薄
+        @param symbol 交易对
+        """
+        snapshot = self.orderbook_snapshot(symbol, self._length)
+        if not snapshot:
             return
+        orderbook, exchange_ts, recv_ts = snapshot
+        self._publisher.publish(EventOrderbook(**orderbook))
+        self._metrics.published("orderbook", symbol, exchange_ts, recv_ts)
+        self._market_log.log("orderbook", symbol, orderbook, caller=self)
 
-        symbol = notifications[0].get("result").get("instrument")
+    def orderbook_snapshot(self, symbol, length):
+        """ 获取最新订单薄前length档数据
+        @param symbol 交易对
+        @param length 档数
+        @return (orderbook, exchange_ts, recv_ts)，订单薄不可用时返回None
+        """
+        if symbol not in self._orderbooks:
+            return None
+        result, recv_ts = self._orderbooks[symbol]
         bids = []
-        for item in notifications[0].get("result").get("bids")[:10]:
+        for item in result.get("bids")[:length]:
             b = [item.get("price"), item.get("quantity")]
             bids.append(b)
         asks = []
-        for item in notifications[0].get("result").get("asks")[:10]:
+        for item in result.get("asks")[:length]:
             a = [item.get("price"), item.get("quantity")]
             asks.append(a)
-        self._last_msg_ts = tools.get_cur_timestamp()
+        exchange_ts = result.get("tstamp")
         orderbook = {
             "platform": self._platform,
             "symbol": symbol,
             "asks": asks,
             "bids": bids,
-            "timestamp": self._last_msg_ts
+            "timestamp": exchange_ts or int(recv_ts * 1000)
         }
-        EventOrderbook(**orderbook).publish()
-        logger.info("symbol:", symbol, "orderbook:", orderbook, caller=self)
+        return orderbook, exchange_ts, recv_ts
+
+    @property
+    def conflation_stats(self):
+        """ 订单薄合并推送统计 {"published": 推送次数, "conflated": 被合并(未单独推送)的更新次数}
+        """
+        return {"published": self._conflator.published, "conflated": self._conflator.conflated}
 
     def deribit_signature(self, nonce, uri, params, access_key, access_secret):
         """ 生成signature
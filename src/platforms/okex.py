@@ -8,10 +8,6 @@ Author: HuangTao
 Date:   2018/05/21
 """
 
-import zlib
-import json
-import copy
-
 from quant import const
 from quant.utils import tools
 from quant.utils import logger
@@ -21,45 +17,82 @@ from quant.utils.websocket import Websocket
 from quant.event import EventOrderbook, EventTrade, EventKline
 from quant.order import ORDER_ACTION_BUY, ORDER_ACTION_SELL
 
+from utils.event import EventKlinePartial
+from utils.orderbook import Orderbook
+from utils.compact_orderbook import CompactOrderbook
+from utils.decode import decode_deflate_frame
+from utils.conflation import Conflator
+from utils.recorder import create_recorder
+from utils.market_log import MarketLogger
+from utils.publisher import create_publisher
+from utils.metrics import MarketMetrics, registry
+from utils.ingest import create_ingest_queue, merge_levels
+from utils.depth_tiers import create_depth_tiers
+from utils.consolidated import venue_of
+from utils.reconnect import create_connection_health, sort_by_priority
+from utils.kline import create_kline_aggregator, kline_event
 
-class OKEx(Websocket):
-    """ OKEx 现货行情
+
+class OKExBase(Websocket):
+    """ OKEx v3 websocket 行情公共部分(现货及交割合约共用)
+    订单薄全量/增量数据维护、校验和校验及重新订阅、档位清理、热加载及推送；子类提供数据表及频道名称。
     """
 
-    def __init__(self):
-        self._platform = OKEX
+    CHECKSUM_LEVELS = 25  # 校验和使用的档数，清理远离盘口的档位时始终保留
+    DEPTH_TABLE = None  # 订单薄数据表，如 spot/depth
+    CHANNEL_TEMPLATES = {}  # 各行情类型的订阅频道 {"orderbook": "spot/depth:{s}"}，{s} 为交易所合约名称
+    TABLE_CHANNELS = {}  # 数据表对应的频道
+    QUANTITY_TYPE = float  # 数量类型
+
+    def __init__(self, platform):
+        """ 初始化
+        @param platform 交易平台
+        """
+        self._platform = platform
 
         self._wss = config.platforms.get(self._platform).get("wss", "wss://real.okex.com:10442")
-        self._symbols = list(set(config.platforms.get(self._platform).get("symbols")))
+        self._priority_symbols = config.platforms.get(self._platform).get("priority_symbols", [])  # 优先订阅的交易对
+        self._symbols = sort_by_priority(set(config.platforms.get(self._platform).get("symbols")), self._priority_symbols)
         self._channels = config.platforms.get(self._platform).get("channels")
 
-        self._orderbooks = {}  # 订单薄数据 {"symbol": {"bids": {"price": quantity, ...}, "asks": {...}}}
-        self._length = 20  # 订单薄数据推送长度
+        self._orderbooks = {}  # 订单薄数据 {"symbol": Orderbook}
+        self._length = config.platforms.get(self._platform).get("orderbook_length", 20) or None  # 订单薄数据推送长度，0为全部
+        interval = config.platforms.get(self._platform).get("conflation_interval", 0)  # 订单薄合并推送周期(毫秒)
+        self._conflator = Conflator(self.publish_orderbook, interval)
+        self._checksum_errors = {}  # 订单薄校验和错误次数 {"symbol": count}
+        self._orderbook_store = config.platforms.get(self._platform).get("orderbook_store", "sorted")  # 订单薄存储 sorted / compact
+        self._tick_sizes = config.platforms.get(self._platform).get("tick_sizes", {})  # compact 存储各交易对最小价格变动单位
+        self._size_decimals = config.platforms.get(self._platform).get("size_decimals", {})  # compact 存储各交易对数量小数位数
+        self._check_compact_config(self._symbols)
+        self._max_levels = config.platforms.get(self._platform).get("orderbook_max_levels")  # 订单薄每边最多保留档数
+        self._band = config.platforms.get(self._platform).get("orderbook_band")  # 订单薄保留的价格范围(相对中间价的比例)
+        if self._max_levels and self._max_levels < self.CHECKSUM_LEVELS:
+            logger.warn("orderbook_max_levels less than checksum levels, use", self.CHECKSUM_LEVELS, caller=self)
+            self._max_levels = self.CHECKSUM_LEVELS
+        self._evicted = {}  # 各交易对被清理的档位数 {"symbol": count}
+        self._recorder = create_recorder(self._platform, config.platforms.get(self._platform))  # 原始数据帧录制
+        self._market_log = MarketLogger(config.platforms.get(self._platform).get("market_log"))  # 行情日志
+        self._publisher = create_publisher(config.platforms.get(self._platform))  # 行情事件发布
+        self._metrics = MarketMetrics(self._platform, config.platforms.get(self._platform).get("metrics_interval", 0))  # 延迟统计
+        registry.register_gauge(self._platform, "orderbooks", self.orderbook_sizes)  # 各交易对订单薄档数
+        registry.register_gauge(self._platform, "checksum_errors", lambda: dict(self._checksum_errors))  # 各交易对校验和错误次数
+        self._tiers = create_depth_tiers(self._platform, config.platforms.get(self._platform), self.orderbook_snapshot,
+                                         self._publisher, self._metrics)  # 多档位订单薄推送
+        self._consolidated = venue_of(self._platform, self.orderbook_snapshot)  # 跨交易所合并订单薄
+        self._ingest = create_ingest_queue(self._platform, config.platforms.get(self._platform), self._platform,
+                                           self.process_queued, {"orderbook": "latest"})  # 接收队列
+        self._health = create_connection_health(self._platform, config.platforms.get(self._platform), self._platform,
+                                                self, self._publisher)  # 连接状态及重连调度
 
         url = self._wss + "/ws/v3"
-        super(OKEx, self).__init__(url)
+        super(OKExBase, self).__init__(url)
         self.heartbeat_msg = "ping"
         self.initialize()
 
     async def connected_callback(self):
         """ 建立连接之后，订阅事件 ticker
         """
-        ches = []
-        for ch in self._channels:
-            if ch == "orderbook":  # 订阅orderbook行情
-                for symbol in self._symbols:
-                    ch = "spot/depth:{s}".format(s=symbol.replace("/", '-'))
-                    ches.append(ch)
-            elif ch == "trade":
-                for symbol in self._symbols:
-                    ch = "spot/trade:{s}".format(s=symbol.replace("/", '-'))
-                    ches.append(ch)
-            elif ch == "kline":
-                for symbol in self._symbols:
-                    ch = "spot/candle60s:{s}".format(s=symbol.replace("/", '-'))
-                    ches.append(ch)
-            else:
-                logger.error("channel error! channel:", ch, caller=self)
+        ches = self._make_channels()
         if ches:
             msg = {
                 "op": "subscribe",
@@ -68,21 +101,101 @@ class OKEx(Websocket):
             await self.ws.send_json(msg)
             logger.info("subscribe orderbook success.", caller=self)
 
+    def _make_channels(self):
+        """ 根据当前的交易对及行情类型生成订阅频道列表
+        """
+        ches = []
+        for ch in self._channels:
+            template = self.CHANNEL_TEMPLATES.get(ch)
+            if not template:
+                logger.error("channel error! channel:", ch, caller=self)
+                continue
+            for symbol in self._symbols:
+                ches.append(template.format(s=self._instrument_id(symbol)))
+        return ches
+
+    def _instrument_id(self, symbol):
+        """ 交易对对应的交易所合约名称
+        @param symbol 交易对
+        """
+        return symbol
+
+    def _to_symbol(self, instrument_id):
+        """ 交易所合约名称对应的交易对
+        @param instrument_id 交易所合约名称
+        """
+        return instrument_id
+
+    async def reload(self, platform_config):
+        """ 热加载交易对及行情类型，在当前连接上订阅新增的频道、取消订阅移除的频道，未受影响交易对的订单薄保持不变
+        @param platform_config 新的平台行情配置
+        """
+        self._check_compact_config(platform_config.get("symbols"))
+        old_symbols = self._symbols
+        old = set(self._make_channels())
+        self._symbols = sort_by_priority(set(platform_config.get("symbols")), self._priority_symbols)
+        self._channels = platform_config.get("channels")
+        new = self._make_channels()
+        subscribe = [ch for ch in new if ch not in old]
+        unsubscribe = list(old - set(new))
+        for symbol in old_symbols:
+            if self._depth_channel(symbol) in unsubscribe:  # 不再订阅订单薄的交易对丢弃本地订单薄
+                self._orderbooks.pop(symbol, None)
+                self._conflator.discard(symbol)
+                self._health.discard(symbol)
+                if self._tiers:
+                    self._tiers.discard(symbol)
+                if self._consolidated:
+                    self._consolidated.discard(symbol)
+        if self.ws and not self.ws.closed:
+            if unsubscribe:
+                await self.ws.send_json({"op": "unsubscribe", "args": unsubscribe})
+            if subscribe:
+                await self.ws.send_json({"op": "subscribe", "args": subscribe})
+        logger.info("reload success. subscribe:", subscribe, "unsubscribe:", unsubscribe, caller=self)
+
+    async def _reconnect(self):
+        """ 连接断开后不立即重连(覆盖框架 Websocket._reconnect)，订单薄保留并标记为过期，由重连调度器按退避时间及优先级安排重连，
+        重连后各交易对的全量数据重建订单薄
+        """
+        self._health.disconnected(list(self._orderbooks.keys()), 1 if self._priority_symbols else 0)
+
     async def process_binary(self, raw):
         """ 处理websocket上接收到的消息
         @param raw 原始的压缩数据
         """
-        decompress = zlib.decompressobj(-zlib.MAX_WBITS)
-        msg = decompress.decompress(raw)
-        msg += decompress.flush()
-        msg = msg.decode()
-        if msg == "pong":  # 心跳返回
+        self._metrics.received()
+        if self._health.waiting:
+            self._health.received()
+        if self._recorder:
+            self._recorder.write(raw)
+        msg = decode_deflate_frame(raw)
+        if msg is None:  # 心跳返回
             return
-        msg = json.loads(msg)
+        self._metrics.parsed()
         # logger.debug("msg:", msg, caller=self)
+        if self._ingest:
+            table = msg.get("table")
+            data = msg.get("data")
+            key = data[0].get("instrument_id") if data and len(data) == 1 else None
+            channel = self.TABLE_CHANNELS.get(table, table)
+            merge = self._merge_depth if channel == "orderbook" else None
+            await self._ingest.put(channel, key, (msg, self._metrics.recv_ts), merge)
+            return
+        await self.deal_message(msg)
+
+    async def process_queued(self, item):
+        """ 处理接收队列中的消息
+        @param item (msg, recv_ts)
+        """
+        msg, self._metrics.recv_ts = item
+        await self.deal_message(msg)
 
+    async def deal_message(self, msg):
+        """ 处理解码后的消息
+        """
         table = msg.get("table")
-        if table == "spot/depth":  # 订单薄
+        if table == self.DEPTH_TABLE:  # 订单薄
             if msg.get("action") == "partial":  # 首次返回全量数据
                 for d in msg["data"]:
                     await self.deal_orderbook_partial(d)
@@ -91,114 +204,261 @@ class OKEx(Websocket):
                     await self.deal_orderbook_update(d)
             else:
                 logger.warn("unhandle msg:", msg, caller=self)
-        elif table == "spot/trade":
-            for d in msg["data"]:
-                await self.deal_trade_update(d)
-        elif table == "spot/candle60s":
-            for d in msg["data"]:
-                await self.deal_kline_update(d)
         else:
             logger.warn("unhandle msg:", msg, caller=self)
 
     async def deal_orderbook_partial(self, data):
         """ 处理全量数据
         """
-        symbol = data.get("instrument_id").replace("-", "/")
+        symbol = self._to_symbol(data.get("instrument_id"))
         if symbol not in self._symbols:
             return
         asks = data.get("asks")
         bids = data.get("bids")
-        self._orderbooks[symbol] = {"asks": {}, "bids": {}, "timestamp": 0}
+        to_quantity = self.QUANTITY_TYPE
+        ob = self._create_orderbook(symbol, asks, bids)
         for ask in asks:
             price = float(ask[0])
-            quantity = float(ask[1])
-            self._orderbooks[symbol]["asks"][price] = quantity
+            quantity = to_quantity(ask[1])
+            ob.asks.update(price, quantity, ask[:2])
         for bid in bids:
             price = float(bid[0])
-            quantity = float(bid[1])
-            self._orderbooks[symbol]["bids"][price] = quantity
-        timestamp = tools.utctime_str_to_mts(data.get("timestamp"))
-        self._orderbooks[symbol]["timestamp"] = timestamp
+            quantity = to_quantity(bid[1])
+            ob.bids.update(price, quantity, bid[:2])
+        ob.timestamp = tools.utctime_str_to_mts(data.get("timestamp"))
+        ob.recv_ts = self._metrics.recv_ts
+        self._orderbooks[symbol] = ob
+        if self._max_levels or self._band:
+            self._trim(symbol, ob)
+        if not await self.check_orderbook(symbol, data.get("checksum")):
+            return
+        if self._health.active:
+            self._health.book_received(symbol)
+        self._conflator.update(symbol)
+        if self._tiers:
+            self._tiers.update(symbol)
+        if self._consolidated:
+            self._consolidated.update(symbol)
 
     async def deal_orderbook_update(self, data):
         """ 处理orderbook增量数据
         """
-        symbol = data.get("instrument_id").replace("-", "/")
+        symbol = self._to_symbol(data.get("instrument_id"))
         asks = data.get("asks")
         bids = data.get("bids")
         timestamp = tools.utctime_str_to_mts(data.get("timestamp"))
 
-        if symbol not in self._orderbooks:
+        ob = self._orderbooks.get(symbol)
+        if ob is None:
             return
-        self._orderbooks[symbol]["timestamp"] = timestamp
+        ob.timestamp = timestamp
+        ob.recv_ts = self._metrics.recv_ts
 
+        length = self._length
+        visible = length is None  # 是否有变化的价格在推送档数范围内，都在范围之外时推送的前N档不变
+        to_quantity = self.QUANTITY_TYPE
         for ask in asks:
             price = float(ask[0])
-            quantity = float(ask[1])
-            if quantity == 0 and price in self._orderbooks[symbol]["asks"]:
-                self._orderbooks[symbol]["asks"].pop(price)
-            else:
-                self._orderbooks[symbol]["asks"][price] = quantity
+            quantity = to_quantity(ask[1])
+            visible = visible or ob.asks.within(price, length)
+            ob.asks.update(price, quantity, ask[:2])
 
         for bid in bids:
             price = float(bid[0])
-            quantity = float(bid[1])
-            if quantity == 0 and price in self._orderbooks[symbol]["bids"]:
-                self._orderbooks[symbol]["bids"].pop(price)
-            else:
-                self._orderbooks[symbol]["bids"][price] = quantity
+            quantity = to_quantity(bid[1])
+            visible = visible or ob.bids.within(price, length)
+            ob.bids.update(price, quantity, bid[:2])
 
-        await self.publish_orderbook()
+        if self._max_levels or self._band:
+            self._trim(symbol, ob)
+        if not await self.check_orderbook(symbol, data.get("checksum")):
+            return
+        if visible:
+            self._conflator.update(symbol)
+        if self._tiers:
+            self._tiers.update(symbol)
+        if self._consolidated:
+            self._consolidated.update(symbol)
+
+    @staticmethod
+    def _merge_depth(old, new):
+        """ 合并接收队列中同一交易对等待处理的订单薄消息，全量数据直接替换，增量数据合并到等待处理的全量/增量数据中
+        @param old 等待处理的消息 (msg, recv_ts)
+        @param new 新收到的消息 (msg, recv_ts)
+        """
+        msg = new[0]
+        if msg.get("action") != "update":
+            return new
+        last = old[0]["data"][0]
+        data = msg["data"][0]
+        last["asks"] = merge_levels(last.get("asks"), data.get("asks"))
+        last["bids"] = merge_levels(last.get("bids"), data.get("bids"))
+        last["timestamp"] = data.get("timestamp")
+        last["checksum"] = data.get("checksum")
+        return old
+
+    def _check_compact_config(self, symbols):
+        """ compact 存储按配置的精度保存价格及数量，不能从行情数据推断(之后的数据可能精度更高)，缺少配置时直接报错
+        @param symbols 交易对列表
+        """
+        if self._orderbook_store != "compact":
+            return
+        missing = [s for s in symbols if not self._tick_sizes.get(s) or self._size_decimals.get(s) is None]
+        if missing:
+            raise ValueError("orderbook_store compact requires tick_sizes and size_decimals! missing: %s" % missing)
+
+    def _create_orderbook(self, symbol, asks, bids):
+        """ 创建订单薄，compact 存储使用配置的最小价格变动单位及数量小数位数
+        """
+        if self._orderbook_store != "compact":
+            return Orderbook()
+        return CompactOrderbook(self._tick_sizes[symbol], self._size_decimals[symbol])
 
-    async def publish_orderbook(self, *args, **kwargs):
+    async def check_orderbook(self, symbol, checksum):
+        """ 校验订单薄，校验失败时单独重新订阅该交易对的订单薄
+        @param symbol 交易对
+        @param checksum 交易所推送的校验和
+        @return 校验是否通过
+        """
+        if checksum is None or not self._orderbooks[symbol].supports_checksum:
+            return True
+        local = self._orderbooks[symbol].checksum()
+        if local == checksum:
+            return True
+        self._checksum_errors[symbol] = self._checksum_errors.get(symbol, 0) + 1
+        logger.warn("checksum error! symbol:", symbol, "checksum:", checksum, "local:", local,
+                    "errors:", self._checksum_errors[symbol], caller=self)
+        await self.resubscribe_orderbook(symbol)
+        return False
+
+    async def resubscribe_orderbook(self, symbol):
+        """ 丢弃本地订单薄，在当前连接上重新订阅该交易对的订单薄，之后推送的partial数据将重建订单薄；连接已断开时只丢弃订单薄
+        @param symbol 交易对
+        """
+        self._orderbooks.pop(symbol, None)
+        self._conflator.discard(symbol)
+        self._health.discard(symbol)
+        if self._tiers:
+            self._tiers.discard(symbol)
+        if self._consolidated:
+            self._consolidated.discard(symbol)
+        if not self.ws or self.ws.closed:  # 连接已断开，重连后重新订阅全部频道时重建订单薄
+            logger.warn("connection closed, orderbook will be rebuilt after reconnect. symbol:", symbol, caller=self)
+            return
+        ch = self._depth_channel(symbol)
+        await self.ws.send_json({"op": "unsubscribe", "args": [ch]})
+        await self.ws.send_json({"op": "subscribe", "args": [ch]})
+        logger.info("resubscribe orderbook success. symbol:", symbol, caller=self)
+
+    @property
+    def checksum_errors(self):
+        """ 各交易对订单薄校验和错误次数 {"symbol": count}
+        """
+        return self._checksum_errors
+
+    def _trim(self, symbol, ob):
+        """ 删除超出档数上限或价格范围的档位(交易所不会推送深度范围之外档位的删除)，校验和使用的档位始终保留
+        """
+        evicted = ob.trim(self._max_levels, self._band, self.CHECKSUM_LEVELS)
+        if evicted:
+            self._evicted[symbol] = self._evicted.get(symbol, 0) + evicted
+
+    def orderbook_sizes(self):
+        """ 各交易对本地订单薄档数、累计清理的档数及占用内存(字节) {"symbol": {"asks": n, "bids": n, "evicted": n, "bytes": n}}
+        """
+        return {symbol: {"asks": len(ob.asks), "bids": len(ob.bids), "evicted": self._evicted.get(symbol, 0),
+                         "bytes": ob.memory_usage()}
+                for symbol, ob in self._orderbooks.items()}
+
+    def publish_orderbook(self, symbol):
         """ 推送orderbook数据
+        @param symbol 交易对
         """
-        for symbol, data in self._orderbooks.items():
-            ob = copy.copy(data)
-            if not ob["asks"] or not ob["bids"]:
-                logger.warn("symbol:", symbol, "asks:", ob["asks"], "bids:", ob["bids"], caller=self)
-                continue
+        snapshot = self.orderbook_snapshot(symbol, self._length)
+        if not snapshot:
+            return
+        orderbook, exchange_ts, recv_ts = snapshot
+        self._publisher.publish(EventOrderbook(**orderbook))
+        self._metrics.published("orderbook", symbol, exchange_ts, recv_ts)
+        self._market_log.log("orderbook", symbol, orderbook, caller=self)
 
-            ask_keys = sorted(list(ob["asks"].keys()))
-            bid_keys = sorted(list(ob["bids"].keys()), reverse=True)
-            if ask_keys[0] <= bid_keys[0]:
-                logger.warn("symbol:", symbol, "ask1:", ask_keys[0], "bid1:", bid_keys[0], caller=self)
-                continue
+    def orderbook_snapshot(self, symbol, length):
+        """ 获取订单薄前length档数据
+        @param symbol 交易对
+        @param length 档数
+        @return (orderbook, exchange_ts, recv_ts)，订单薄不可用时返回None
+        """
+        ob = self._orderbooks.get(symbol)
+        if ob is None:
+            return None
+        if not ob.asks or not ob.bids:
+            logger.warn("symbol:", symbol, "asks:", ob.asks.top(), "bids:", ob.bids.top(), caller=self)
+            return None
 
-            # 卖
-            asks = []
-            for k in ask_keys[:self._length]:
-                price = "%.8f" % k
-                quantity = "%.8f" % ob["asks"].get(k)
-                asks.append([price, quantity])
-
-            # 买
-            bids = []
-            for k in bid_keys[:self._length]:
-                price = "%.8f" % k
-                quantity = "%.8f" % ob["bids"].get(k)
-                bids.append([price, quantity])
-
-            # 推送订单薄数据
-            orderbook = {
-                "platform": self._platform,
-                "symbol": symbol,
-                "asks": asks,
-                "bids": bids,
-                "timestamp": ob["timestamp"]
-            }
-            EventOrderbook(**orderbook).publish()
-            logger.info("symbol:", symbol, "orderbook:", orderbook, caller=self)
+        if ob.crossed():
+            logger.warn("symbol:", symbol, "ask1:", ob.asks.best(), "bid1:", ob.bids.best(), caller=self)
+            return None
+
+        asks = ob.asks.raws(length)  # 卖
+        bids = ob.bids.raws(length)  # 买
+
+        # 订单薄数据
+        orderbook = {
+            "platform": self._platform,
+            "symbol": symbol,
+            "asks": asks,
+            "bids": bids,
+            "timestamp": ob.timestamp
+        }
+        return orderbook, ob.timestamp, ob.recv_ts
+
+    def _depth_channel(self, symbol):
+        """ 交易对的订单薄频道名
+        @param symbol 交易对
+        """
+        return self.CHANNEL_TEMPLATES["orderbook"].format(s=self._instrument_id(symbol))
+
+
+class OKEx(OKExBase):
+    """ OKEx 现货行情
+    """
+
+    DEPTH_TABLE = "spot/depth"
+    CHANNEL_TEMPLATES = {"orderbook": "spot/depth:{s}", "trade": "spot/trade:{s}", "kline": "spot/candle60s:{s}"}
+    TABLE_CHANNELS = {"spot/depth": "orderbook", "spot/trade": "trade", "spot/candle60s": "kline"}
+
+    def __init__(self):
+        self._kline_aggregator = create_kline_aggregator(OKEX, config.platforms.get(OKEX), self.publish_kline)  # 多周期K线合成
+        super(OKEx, self).__init__(OKEX)
+
+    def _instrument_id(self, symbol):
+        return symbol.replace("/", "-")
+
+    def _to_symbol(self, instrument_id):
+        return instrument_id.replace("-", "/")
+
+    async def deal_message(self, msg):
+        """ 处理解码后的消息，成交及K线数据在此处理，订单薄数据交给 OKExBase
+        """
+        table = msg.get("table")
+        if table == "spot/trade":
+            for d in msg["data"]:
+                await self.deal_trade_update(d)
+        elif table == "spot/candle60s":
+            for d in msg["data"]:
+                await self.deal_kline_update(d)
+        else:
+            await super(OKEx, self).deal_message(msg)
 
     async def deal_trade_update(self, data):
         """ 处理trade数据
         """
-        symbol = data.get("instrument_id").replace("-", "/")
+        symbol = self._to_symbol(data.get("instrument_id"))
         if symbol not in self._symbols:
             return
         action = ORDER_ACTION_BUY if data["side"] == "buy" else ORDER_ACTION_SELL
-        price = "%.8f" % float(data["price"])
-        quantity = "%.8f" % float(data["size"])
+        price = data["price"]
+        quantity = data["size"]
         timestamp = tools.utctime_str_to_mts(data["timestamp"])
 
         # 推送trade数据
@@ -210,21 +470,24 @@ class OKEx(Websocket):
             "quantity": quantity,
             "timestamp": timestamp
         }
-        EventTrade(**trade).publish()
-        logger.info("symbol:", symbol, "trade:", trade, caller=self)
+        self._publisher.publish(EventTrade(**trade))
+        self._metrics.published("trade", symbol, timestamp)
+        self._market_log.log("trade", symbol, trade, caller=self)
+        if self._kline_aggregator:
+            self._kline_aggregator.on_trade(symbol, price, quantity, timestamp)
 
     async def deal_kline_update(self, data):
         """ 处理K线数据 1分钟
         """
-        symbol = data["instrument_id"].replace("-", "/")
+        symbol = self._to_symbol(data["instrument_id"])
         if symbol not in self._symbols:
             return
         timestamp = tools.utctime_str_to_mts(data["candle"][0])
-        _open = "%.8f" % float(data["candle"][1])
-        high = "%.8f" % float(data["candle"][2])
-        low = "%.8f" % float(data["candle"][3])
-        close = "%.8f" % float(data["candle"][4])
-        volume = "%.8f" % float(data["candle"][5])
+        _open = data["candle"][1]
+        high = data["candle"][2]
+        low = data["candle"][3]
+        close = data["candle"][4]
+        volume = data["candle"][5]
 
         # 推送trade数据
         kline = {
@@ -238,5 +501,19 @@ class OKEx(Websocket):
             "timestamp": timestamp,
             "kline_type": const.MARKET_TYPE_KLINE
         }
-        EventKline(**kline).publish()
-        logger.info("symbol:", symbol, "kline:", kline, caller=self)
+        self._publisher.publish(EventKline(**kline))
+        self._metrics.published("kline", symbol, None)
+        self._market_log.log("kline", symbol, kline, caller=self)
+        if self._kline_aggregator:
+            self._kline_aggregator.on_kline(symbol, _open, high, low, close, volume, timestamp)
+
+    def publish_kline(self, kline, closed):
+        """ 推送合成的多周期K线
+        @param kline K线数据
+        @param closed K线是否已结束，未结束K线以 EventKlinePartial 推送，已结束K线按周期以 EventKline / EventKlineInterval 推送
+        """
+        if not closed:
+            self._publisher.publish(EventKlinePartial(**kline))
+            return
+        self._publisher.publish(kline_event(kline))
+        self._market_log.log(kline["kline_type"], kline["symbol"], kline, caller=self)
@@ -0,0 +1,134 @@
+# -*— coding:utf-8 -*-
+
+"""
+录制数据回放基准测试
+将录制的原始数据帧(utils.recorder)不经网络、尽可能快地直接送入各平台的行情处理类，事件发布被替换为空操作，
+统计处理速率(msg/s)及单条消息处理耗时分位数。回放时不使用接收队列(忽略 ingest 配置)，且不合并推送(conflation_interval、
+ticker_interval 置为0)，消息及其触发的推送在计时范围内处理完毕；Binance diff 模式不请求REST快照，以空订单薄作为快照。
+
+运行:
+    python src/replay.py config.json okex /data/market/frames/okex-*.frames.gz
+
+Date:   2026/10/18
+"""
+
+import sys
+import json
+import time
+import asyncio
+import logging
+
+from quant.config import config
+from quant.utils.websocket import Websocket
+from quant.event import Event
+
+from utils.recorder import read_frames, FRAME_BINARY
+
+
+class NullWebsocket:
+    """ 回放时代替真实连接，丢弃所有发送的数据
+    """
+
+    async def send_json(self, *args, **kwargs):
+        pass
+
+    async def send_str(self, *args, **kwargs):
+        pass
+
+
+def percentile(sorted_values, p):
+    """ 计算分位数
+    @param sorted_values 已排序数据
+    @param p 分位 0~100
+    """
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))
+    return sorted_values[index]
+
+
+def stub_depth_snapshot(market):
+    """ 替换 Binance diff 模式的REST快照请求，以空订单薄作为快照，更新id与缓存的第一条增量数据衔接
+    @param market 行情处理对象
+    """
+    async def get_depth_snapshot(symbol):
+        buffer = market._depth_buffers.get(symbol)
+        return {"lastUpdateId": buffer[0]["U"] - 1 if buffer else 0, "asks": [], "bids": []}
+
+    market._get_depth_snapshot = get_depth_snapshot
+
+
+def create_market(platform):
+    """ 创建不建立网络连接、不发布事件的行情处理对象
+    @param platform 交易平台
+    """
+    from main import get_market_class
+
+    Websocket.initialize = lambda self: None
+    Event.publish = lambda self: None
+    platform_config = config.platforms.get(platform, {})
+    platform_config.pop("ingest", None)  # 接收队列中的处理不在计时范围内
+    platform_config.pop("record", None)
+    platform_config["conflation_interval"] = 0  # 合并周期到期后定时器中的推送不在计时范围内
+    platform_config["ticker_interval"] = 0
+    Market = get_market_class(platform)
+    if not Market:
+        return None
+    market = Market()
+    market.ws = NullWebsocket()
+    if hasattr(market, "_get_depth_snapshot"):
+        stub_depth_snapshot(market)
+    return market
+
+
+async def replay(market, filenames):
+    """ 回放录制文件
+    @param market 行情处理对象
+    @param filenames 录制文件列表
+    @return 每条消息处理耗时列表(秒)，总耗时(秒)
+    """
+    latencies = []
+    begin = time.perf_counter()
+    for filename in filenames:
+        for _, kind, payload in read_frames(filename):
+            if kind == FRAME_BINARY:
+                t = time.perf_counter()
+                await market.process_binary(payload)
+            else:
+                t = time.perf_counter()
+                await market.process(json.loads(payload))
+            latencies.append(time.perf_counter() - t)
+            await asyncio.sleep(0)  # 执行处理消息时创建的任务(如 Binance diff 模式的快照同步)
+    return latencies, time.perf_counter() - begin
+
+
+def report(platform, latencies, cost):
+    """ 打印统计结果
+    """
+    latencies.sort()
+    count = len(latencies)
+    print("platform:", platform)
+    print("messages: %d, cost: %.3fs, rate: %.0f msg/s" % (count, cost, count / cost if cost else 0))
+    for p in (50, 90, 99, 99.9):
+        print("p%-5s %10.1f us" % (p, percentile(latencies, p) * 1e6))
+    print("max    %10.1f us" % ((latencies[-1] if latencies else 0) * 1e6))
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("usage: python src/replay.py config.json platform frames.gz [frames.gz ...]")
+        return
+    config_file, platform, filenames = sys.argv[1], sys.argv[2], sys.argv[3:]
+    config.loads(config_file)
+    logging.disable(logging.CRITICAL)
+
+    market = create_market(platform)
+    if not market:
+        return
+    loop = asyncio.get_event_loop()
+    latencies, cost = loop.run_until_complete(replay(market, filenames))
+    report(platform, latencies, cost)
+
+
+if __name__ == "__main__":
+    main()
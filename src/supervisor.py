@@ -0,0 +1,284 @@
+# -*— coding:utf-8 -*-
+
+"""
+多进程行情服务
+每个交易平台(以及按 shards 配置拆分的交易对分片)运行在独立的工作进程中，由主进程统一监控：
+工作进程异常退出或心跳超时后按退避时间自动重启，各工作进程的心跳汇总后定期输出到日志。
+配置文件修改后重新拆分各工作进程的配置并通知工作进程热加载(SIGHUP)，交易对及行情类型的变化在现有连接上生效，
+平台或分片数量的变化需要重启服务。
+
+配置:
+    "SUPERVISOR": {"heartbeat_interval": 5, "heartbeat_timeout": 30, "report_interval": 60}
+    "PLATFORMS": {"okex": {"symbols": [...], "shards": 4, ...}}
+分片时全市场 ticker 频道只在第一个分片(-0)订阅。
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import signal
+import logging
+import tempfile
+import multiprocessing
+
+
+def split_symbols(symbols, shards):
+    """ 将交易对按轮询方式拆分为多个分片
+    @param symbols 交易对列表
+    @param shards 分片数
+    """
+    symbols = sorted(set(symbols))
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[i::shards] for i in range(shards)]
+
+
+def make_worker_configs(config_data):
+    """ 拆分配置文件，每个平台/分片生成一份只包含自身交易对的配置
+    @param config_data 原始配置
+    @return [(worker_name, worker_config), ...]
+    """
+    workers = []
+    for platform, options in config_data.get("PLATFORMS", {}).items():
+        shards = split_symbols(options.get("symbols", []), options.get("shards", 1))
+        for index, symbols in enumerate(shards):
+            name = platform if len(shards) == 1 else "{p}-{i}".format(p=platform, i=index)
+            worker_config = copy.deepcopy(config_data)
+            worker_config.pop("SUPERVISOR", None)
+            worker_config.pop("CONSOLIDATED", None)  # 各平台运行在不同进程中，无法合并订单薄
+            worker_config["PLATFORMS"] = {platform: dict(options, symbols=symbols)}
+            channels = options.get("channels", [])
+            if index > 0 and "ticker" in channels:  # 全市场ticker不受交易对分片影响，只在第一个分片订阅
+                worker_config["PLATFORMS"][platform]["channels"] = [ch for ch in channels if ch != "ticker"]
+            cache_server = options.get("cache_server")
+            if cache_server and len(shards) > 1:  # 每个分片使用独立的查询服务地址
+                cache_server = dict(cache_server)
+                if cache_server.get("path"):
+                    cache_server["path"] = "{p}.{i}".format(p=cache_server["path"], i=index)
+                else:
+                    cache_server["port"] = cache_server["port"] + index
+                worker_config["PLATFORMS"][platform]["cache_server"] = cache_server
+            log = worker_config.get("LOG")
+            if log and log.get("name"):
+                base, ext = os.path.splitext(log["name"])
+                log["name"] = "{b}-{n}{e}".format(b=base, n=name, e=ext)
+            workers.append((name, worker_config))
+    return workers
+
+
+def run_worker(name, config_file, status_queue, heartbeat_interval):
+    """ 工作进程入口
+    @param name 工作进程名称
+    @param config_file 工作进程配置文件
+    @param status_queue 心跳队列
+    @param heartbeat_interval 心跳间隔(秒)
+    """
+    from quant.quant import quant
+    from quant.tasks import LoopRunTask
+    import main
+
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)  # 热加载信号处理函数注册前忽略 SIGHUP
+    quant.initialize(config_file)
+    markets = main.initialize(config_file)
+    start_ts = time.time()
+
+    async def heartbeat(*args, **kwargs):
+        status = {
+            "name": name,
+            "pid": os.getpid(),
+            "ts": time.time(),
+            "uptime": int(time.time() - start_ts),
+            "markets": [m.__class__.__name__ for m in markets.values()]
+        }
+        try:
+            status_queue.put_nowait(status)
+        except queue.Full:
+            pass
+
+    LoopRunTask.register(heartbeat, heartbeat_interval)
+    quant.start()
+
+
+class Worker:
+    """ 工作进程
+    """
+
+    def __init__(self, name, config_file):
+        self.name = name
+        self.config_file = config_file
+        self.process = None
+        self.started_at = 0
+        self.restarts = 0
+        self.next_start = 0  # 下次允许启动的时间
+        self.status = {}  # 最近一次心跳
+
+
+class Supervisor:
+    """ 工作进程监控
+    """
+
+    def __init__(self, config_file):
+        """ 初始化
+        @param config_file 配置文件
+        """
+        with open(config_file) as f:
+            config_data = json.load(f)
+        options = config_data.get("SUPERVISOR") or {}
+        self._heartbeat_interval = options.get("heartbeat_interval", 5)
+        self._heartbeat_timeout = options.get("heartbeat_timeout", 30)
+        self._report_interval = options.get("report_interval", 60)
+        self._max_backoff = options.get("max_backoff", 60)
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._status_queue = self._ctx.Queue(10000)
+        self._config_file = config_file
+        self._config_mtime = os.path.getmtime(config_file)
+        self._config_dir = tempfile.mkdtemp(prefix="market-")
+        self._workers = []
+        for name, worker_config in make_worker_configs(config_data):
+            path = os.path.join(self._config_dir, name + ".json")
+            self._write_config(path, worker_config)
+            self._workers.append(Worker(name, path))
+        self._logger = logging.getLogger("supervisor")
+
+    @staticmethod
+    def _write_config(path, worker_config):
+        """ 写入工作进程配置文件，先写临时文件再替换，避免工作进程读到不完整的文件
+        """
+        with open(path + ".tmp", "w") as f:
+            json.dump(worker_config, f)
+        os.replace(path + ".tmp", path)
+
+    def start(self):
+        """ 启动所有工作进程并持续监控
+        """
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s %(message)s")
+        self._logger.info("start %d workers: %s", len(self._workers), [w.name for w in self._workers])
+        last_report = time.time()
+        try:
+            while True:
+                self._check_config()
+                self._check_workers()
+                self._drain_status()
+                if time.time() - last_report >= self._report_interval:
+                    self.report()
+                    last_report = time.time()
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        for worker in self._workers:
+            if worker.process and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self._workers:
+            if worker.process:
+                worker.process.join(5)
+
+    def _start_worker(self, worker):
+        worker.process = self._ctx.Process(target=run_worker, name=worker.name,
+                                           args=(worker.name, worker.config_file, self._status_queue,
+                                                 self._heartbeat_interval))
+        worker.process.daemon = True
+        worker.process.start()
+        worker.started_at = time.time()
+        worker.status = {}
+        self._logger.info("worker started. name: %s pid: %s", worker.name, worker.process.pid)
+
+    def _check_workers(self):
+        now = time.time()
+        for worker in self._workers:
+            if worker.process is None:
+                self._start_worker(worker)
+                continue
+            if worker.process.is_alive():
+                last_ts = worker.status.get("ts", worker.started_at)
+                if now - last_ts <= self._heartbeat_timeout:
+                    if now - worker.started_at > self._max_backoff:
+                        worker.restarts = 0
+                    continue
+                self._logger.warning("worker heartbeat timeout, terminate. name: %s", worker.name)
+                worker.process.terminate()
+                worker.process.join(5)
+            if not worker.next_start:
+                backoff = min(self._max_backoff, 2 ** worker.restarts)
+                worker.next_start = now + backoff
+                self._logger.warning("worker exited. name: %s exitcode: %s restart in %ss",
+                                     worker.name, worker.process.exitcode, backoff)
+            if now >= worker.next_start:
+                worker.restarts += 1
+                worker.next_start = 0
+                self._start_worker(worker)
+
+    def _check_config(self):
+        """ 配置文件修改后更新各工作进程的配置文件，并通知工作进程热加载
+        """
+        try:
+            mtime = os.path.getmtime(self._config_file)
+            if mtime == self._config_mtime:
+                return
+            self._config_mtime = mtime
+            with open(self._config_file) as f:
+                config_data = json.load(f)
+        except Exception as e:
+            self._logger.error("load config file error! file: %s error: %s", self._config_file, e)
+            return
+        worker_configs = dict(make_worker_configs(config_data))
+        workers = {w.name: w for w in self._workers}
+        if set(worker_configs) != set(workers):
+            self._logger.warning("workers changed, restart to take effect. current: %s new: %s",
+                                 sorted(workers), sorted(worker_configs))
+        for name, worker_config in worker_configs.items():
+            worker = workers.get(name)
+            if not worker:
+                continue
+            self._write_config(worker.config_file, worker_config)
+            if worker.process and worker.process.is_alive():
+                os.kill(worker.process.pid, signal.SIGHUP)
+        self._logger.info("config reloaded. file: %s", self._config_file)
+
+    def _drain_status(self):
+        workers = {w.name: w for w in self._workers}
+        while True:
+            try:
+                status = self._status_queue.get_nowait()
+            except queue.Empty:
+                return
+            worker = workers.get(status.get("name"))
+            if worker and worker.process and status.get("pid") == worker.process.pid:
+                worker.status = status
+
+    def health(self):
+        """ 汇总所有工作进程状态
+        """
+        now = time.time()
+        result = []
+        for worker in self._workers:
+            alive = bool(worker.process and worker.process.is_alive())
+            result.append({
+                "name": worker.name,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": alive,
+                "restarts": worker.restarts,
+                "heartbeat_age": round(now - worker.status["ts"], 1) if worker.status else None,
+                "uptime": worker.status.get("uptime")
+            })
+        return result
+
+    def report(self):
+        health = self.health()
+        alive = len([h for h in health if h["alive"]])
+        self._logger.info("workers alive: %d/%d detail: %s", alive, len(health), health)
+
+
+def main():
+    config_file = sys.argv[1]  # 配置文件 config.json
+    Supervisor(config_file).start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*— coding:utf-8 -*-
+
+"""
+最新行情缓存
+进程内保存每个平台、每个频道、每个交易对最近一次推送的行情数据(orderbook / trade / kline / ticker ...)，
+可通过本地HTTP服务(TCP端口或Unix socket)查询，策略启动时一次请求即可获取全部最新行情，无需等待下一次推送。
+
+查询接口:
+    GET /snapshot?platform=okex                                 平台下所有频道、所有交易对
+    GET /snapshot?platform=okex&channel=orderbook               平台下某个频道的所有交易对
+    GET /snapshot?platform=okex&channel=orderbook&symbol=BTC/USDT
+    GET /snapshot                                               所有平台
+    GET /metrics?platform=okex                                  延迟统计(utils.metrics)，不指定平台时返回全部
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from quant.utils import logger
+from quant.event import EventOrderbook, EventTrade, EventKline
+
+from utils.event import EventTicker, EventOrderbookTier, EventMarketStatus, EventOrderbookConsolidated, \
+    EventKlinePartial, EventKlineInterval
+from utils.metrics import registry
+
+
+class LastValueCache:
+    """ 最新行情缓存 {platform: {channel: {symbol: data}}}
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def set(self, platform, channel, symbol, data):
+        """ 保存最新行情
+        @param platform 交易平台
+        @param channel 频道 orderbook / trade / kline / kline_5m / ticker ...
+        @param symbol 交易对
+        @param data 行情数据
+        """
+        channels = self._values.get(platform)
+        if channels is None:
+            channels = self._values[platform] = {}
+        symbols = channels.get(channel)
+        if symbols is None:
+            symbols = channels[channel] = {}
+        symbols[symbol] = data
+
+    def update(self, event):
+        """ 根据行情事件更新缓存
+        @param event 行情事件
+        """
+        data = event.data
+        if not isinstance(data, dict):
+            return
+        self.set(data.get("platform"), channel_of(event), data.get("symbol"), data)
+
+    def get(self, platform=None, channel=None, symbol=None):
+        """ 查询最新行情，未指定的层级返回全部
+        """
+        if platform is None:
+            return self._values
+        channels = self._values.get(platform, {})
+        if channel is None:
+            return channels
+        symbols = channels.get(channel, {})
+        if symbol is None:
+            return symbols
+        return symbols.get(symbol)
+
+
+def channel_of(event):
+    """ 行情事件对应的频道名称
+    """
+    if isinstance(event, EventOrderbook):
+        return "orderbook"
+    if isinstance(event, EventTrade):
+        return "trade"
+    if isinstance(event, (EventKline, EventKlineInterval)):
+        return event.data.get("kline_type") or "kline"
+    if isinstance(event, EventTicker):
+        return "ticker"
+    if isinstance(event, EventOrderbookTier):
+        return "orderbook%d" % event.data["depth"]
+    if isinstance(event, EventMarketStatus):
+        return "status"
+    if isinstance(event, EventOrderbookConsolidated):
+        return "consolidated"
+    if isinstance(event, EventKlinePartial):
+        return "partial:" + event.data["kline_type"]
+    return event.name
+
+
+last_values = LastValueCache()  # 进程内共享的最新行情缓存
+
+
+class CacheServer:
+    """ 最新行情查询服务
+    """
+
+    def __init__(self, host="127.0.0.1", port=None, path=None):
+        """ 初始化
+        @param host 监听地址
+        @param port 监听端口
+        @param path Unix socket路径，设置后忽略 host/port
+        """
+        self._host = host
+        self._port = port
+        self._path = path
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/snapshot", self.handle_snapshot)
+        app.router.add_get("/metrics", self.handle_metrics)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        if self._path:
+            site = web.UnixSite(self._runner, self._path)
+        else:
+            site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        logger.info("cache server started. address:", self._path or "%s:%s" % (self._host, self._port), caller=self)
+
+    async def handle_snapshot(self, request):
+        query = request.query
+        data = last_values.get(query.get("platform"), query.get("channel"), query.get("symbol"))
+        if data is None:
+            return web.json_response({"error": "not found"}, status=404)
+        return web.json_response(data)
+
+    async def handle_metrics(self, request):
+        return web.json_response(registry.summary(request.query.get("platform")))
+
+
+_servers = {}  # 已启动的查询服务 {address: CacheServer}
+
+
+def start_cache_server(options):
+    """ 启动最新行情查询服务，同一进程内相同地址只启动一次
+    @param options {"host": "127.0.0.1", "port": 9001} 或 {"path": "/tmp/market.sock"}，为空时不启动
+    """
+    if not options:
+        return None
+    address = options.get("path") or (options.get("host", "127.0.0.1"), options.get("port"))
+    if address in _servers:
+        return _servers[address]
+    server = _servers[address] = CacheServer(options.get("host", "127.0.0.1"), options.get("port"),
+                                             options.get("path"))
+    asyncio.get_event_loop().create_task(server.start())
+    return server
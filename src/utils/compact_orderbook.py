@@ -0,0 +1,217 @@
+# -*— coding:utf-8 -*-
+
+"""
+紧凑订单薄
+价格按交易对的最小价格变动单位(tick size)换算为整数档位，与数量一起保存在连续的类型化数组中(array)，
+相比以float为键的字典，每档内存占用小且不会因浮点误差产生几乎相同的重复价位。
+与 utils.orderbook.Orderbook 提供相同的 update / top / raws / best / crossed / trim 操作，但不保存交易所原始字符串，
+推送时按价格及数量精度重新格式化，因此不支持依赖原始字符串的校验和。
+
+Date:   2026/10/18
+"""
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+def decimals_of(value):
+    """ 数字字符串的小数位数
+    @param value 数字字符串，如 "0.0100" 返回 4
+    """
+    value = str(value)
+    if "e" in value or "E" in value:
+        return max(0, -int(value.lower().split("e")[1]))
+    if "." not in value:
+        return 0
+    return len(value.split(".")[1])
+
+
+class CompactOrderbookSide:
+    """ 紧凑订单薄单边(买或卖)
+    整数价格档位按升序保存在 array('q') 中，数量按相同下标保存在 array('d') 中。
+    """
+
+    __slots__ = ("_book", "_reverse", "_ticks", "_sizes")
+
+    def __init__(self, book, reverse=False):
+        """ 初始化
+        @param book 所属订单薄，提供价格/数量精度
+        @param reverse 是否按价格从高到低读取，买盘为True，卖盘为False
+        """
+        self._book = book
+        self._reverse = reverse
+        self._ticks = array("q")
+        self._sizes = array("d")
+
+    def __len__(self):
+        return len(self._ticks)
+
+    def __bool__(self):
+        return len(self._ticks) > 0
+
+    def clear(self):
+        self._ticks = array("q")
+        self._sizes = array("d")
+
+    def update(self, price, quantity, raw=None):
+        """ 更新一档价格，数量为0时删除该档
+        @param price 价格
+        @param quantity 数量
+        @param raw 不使用，与 OrderbookSide 接口保持一致
+        """
+        ticks = self._ticks
+        tick = self._book.to_tick(price)
+        index = bisect_left(ticks, tick)
+        found = index < len(ticks) and ticks[index] == tick
+        if quantity == 0:
+            if found:
+                del ticks[index]
+                del self._sizes[index]
+        elif found:
+            self._sizes[index] = quantity
+        else:
+            ticks.insert(index, tick)
+            self._sizes.insert(index, quantity)
+
+    def remove(self, price):
+        self.update(price, 0)
+
+    def trim(self, length=None, limit=None, keep=0):
+        """ 删除远离盘口的档位
+        @param length 最多保留的档数，None为不限制
+        @param limit 价格界限，卖盘删除高于limit的档位，买盘删除低于limit的档位，None为不限制
+        @param keep 按读取顺序至少保留的档数，价格界限不删除前keep档
+        @return 删除的档数
+        """
+        ticks = self._ticks
+        count = len(ticks)
+        cut = count if length is None else min(length, count)  # 按读取顺序保留前cut档
+        if limit is not None:
+            tick = self._book.to_tick(limit)
+            inside = count - bisect_left(ticks, tick) if self._reverse else bisect_right(ticks, tick)
+            cut = min(cut, max(inside, keep))
+        if cut >= count:
+            return 0
+        if self._reverse:
+            del ticks[:count - cut]
+            del self._sizes[:count - cut]
+        else:
+            del ticks[cut:]
+            del self._sizes[cut:]
+        return count - cut
+
+    def _indexes(self, length=None):
+        count = len(self._ticks)
+        length = count if length is None else min(length, count)
+        if self._reverse:
+            return range(count - 1, count - 1 - length, -1)
+        return range(length)
+
+    def best(self):
+        """ 最优价格，无数据时返回None
+        """
+        if not self._ticks:
+            return None
+        return self._book.to_price(self._ticks[-1] if self._reverse else self._ticks[0])
+
+    def within(self, price, length):
+        """ 价格是否在前length档范围内(不差于第length档的价格，档数不足length时都在范围内)，该价格的变化会改变前length档
+        @param price 价格
+        @param length 档数
+        """
+        ticks = self._ticks
+        if len(ticks) < length:
+            return True
+        tick = self._book.to_tick(price)
+        if self._reverse:
+            return tick >= ticks[-length]
+        return tick <= ticks[length - 1]
+
+    def top(self, length=None):
+        """ 按读取顺序返回前length档 [(price, quantity), ...]
+        @param length 档数，None为全部
+        """
+        to_price = self._book.to_price
+        ticks, sizes = self._ticks, self._sizes
+        return [(to_price(ticks[i]), sizes[i]) for i in self._indexes(length)]
+
+    def raws(self, length=None):
+        """ 按读取顺序返回前length档格式化后的字符串 [[price_str, quantity_str], ...]
+        @param length 档数，None为全部
+        """
+        price_str, size_format = self._book.price_str, self._book.size_format
+        ticks, sizes = self._ticks, self._sizes
+        return [[price_str(ticks[i]), size_format % sizes[i]] for i in self._indexes(length)]
+
+    def memory_usage(self):
+        """ 本边占用内存(字节)
+        """
+        return sys.getsizeof(self._ticks) + sys.getsizeof(self._sizes)
+
+
+class CompactOrderbook:
+    """ 单个交易对的紧凑订单薄
+    """
+
+    supports_checksum = False
+
+    def __init__(self, tick_size="0.00000001", size_decimals=8):
+        """ 初始化
+        @param tick_size 最小价格变动单位，建议传入字符串以便确定价格精度，如 "0.1"
+        @param size_decimals 数量小数位数
+        """
+        self.tick_size = float(tick_size)
+        self.price_format = "%.{n}f".format(n=decimals_of(tick_size))
+        self.size_format = "%.{n}f".format(n=size_decimals)
+        self._price_strs = {}  # 价格档位格式化缓存 {tick: price_str}，盘口附近的价位会被反复推送
+        self.asks = CompactOrderbookSide(self)
+        self.bids = CompactOrderbookSide(self, reverse=True)
+        self.timestamp = 0
+        self.recv_ts = 0  # 最近一次更新对应消息的本地接收时间(秒)
+
+    def to_tick(self, price):
+        return int(round(price / self.tick_size))
+
+    def to_price(self, tick):
+        return tick * self.tick_size
+
+    def price_str(self, tick):
+        """ 价格档位格式化为字符串
+        """
+        text = self._price_strs.get(tick)
+        if text is None:
+            if len(self._price_strs) >= 4096:
+                self._price_strs.clear()
+            text = self._price_strs[tick] = self.price_format % (tick * self.tick_size)
+        return text
+
+    def clear(self):
+        self.asks.clear()
+        self.bids.clear()
+        self.timestamp = 0
+
+    def crossed(self):
+        """ 买一价是否大于等于卖一价
+        """
+        if not self.asks or not self.bids:
+            return False
+        return self.asks._ticks[0] <= self.bids._ticks[-1]
+
+    def trim(self, max_levels=None, band=None, keep=0):
+        """ 删除远离盘口的档位，参数同 Orderbook.trim
+        @return 删除的档数
+        """
+        ask_limit = bid_limit = None
+        if band and self.asks and self.bids:
+            mid = (self.asks.best() + self.bids.best()) / 2
+            ask_limit, bid_limit = mid * (1 + band), mid * (1 - band)
+        return self.asks.trim(max_levels, ask_limit, keep) + self.bids.trim(max_levels, bid_limit, keep)
+
+    def checksum(self, length=25):
+        return None
+
+    def memory_usage(self):
+        """ 订单薄占用内存(字节)
+        """
+        return sys.getsizeof(self) + self.asks.memory_usage() + self.bids.memory_usage()
@@ -0,0 +1,63 @@
+# -*— coding:utf-8 -*-
+
+"""
+按symbol合并推送
+只有发生变化的symbol才会被推送；设置合并周期后，每个symbol在一个周期内最多推送一次，且推送的始终是最新状态。
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+
+class Conflator:
+    """ 按symbol合并推送
+    """
+
+    def __init__(self, callback, interval=0):
+        """ 初始化
+        @param callback 推送回调函数 callback(symbol)，需为普通函数
+        @param interval 合并周期(毫秒)，0为每次变化立即推送
+        """
+        self._callback = callback
+        self._interval = (interval or 0) / 1000
+        self._last_ts = {}  # 上次推送时间 {"symbol": loop_time}
+        self._pending = {}  # 等待推送的symbol {"symbol": TimerHandle}
+        self.published = 0  # 推送次数
+        self.conflated = 0  # 被合并(未单独推送)的更新次数
+
+    @property
+    def interval(self):
+        return int(self._interval * 1000)
+
+    def update(self, symbol):
+        """ 标记symbol已变化
+        @param symbol 交易对
+        """
+        if symbol in self._pending:
+            self.conflated += 1
+            return
+        if not self._interval:
+            self._fire(symbol)
+            return
+        loop = asyncio.get_event_loop()
+        wait = self._last_ts.get(symbol, 0) + self._interval - loop.time()
+        if wait <= 0:
+            self._fire(symbol)
+        else:
+            self._pending[symbol] = loop.call_later(wait, self._fire, symbol)
+
+    def discard(self, symbol):
+        """ 取消symbol等待中的推送
+        @param symbol 交易对
+        """
+        handle = self._pending.pop(symbol, None)
+        if handle:
+            handle.cancel()
+
+    def _fire(self, symbol):
+        self._pending.pop(symbol, None)
+        if self._interval:
+            self._last_ts[symbol] = asyncio.get_event_loop().time()
+        self.published += 1
+        self._callback(symbol)
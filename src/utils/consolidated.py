@@ -0,0 +1,264 @@
+# -*— coding:utf-8 -*-
+
+"""
+跨交易所合并订单薄
+同一进程内多个平台交易同一交易对(如 Binance 与 OKEx 的 BTC/USDT)时，将各平台已维护的订单薄按统一的交易对名称合并为一个前N档订单薄，
+每个价格档位标注各平台的数量，并给出跨平台的最优买卖价；下游策略无需再分别订阅、各自合并。
+某个平台的订单薄变化时只重新读取该平台的前N档(前N档未变化时直接忽略)，合并结果的前N档与上次推送相同时不推送。
+
+配置(与 PLATFORMS 同级，只在单进程模式下生效，多进程模式下各平台运行在不同进程中无法合并):
+    "CONSOLIDATED": {
+        "depth": 10,                                        合并订单薄档数
+        "interval_ms": 0,                                   合并推送周期(毫秒)，0为每次变化立即推送
+        "platforms": ["binance", "okex"],                   参与合并的平台，不配置为所有平台
+        "symbols": ["BTC/USDT"],                            合并的交易对(统一名称)，不配置为至少 min_venues 个平台都有订单薄的交易对
+        "min_venues": 2,                                    至少有几个平台的订单薄时才推送
+        "aliases": {"okex_future": {"BTC-USD-190628": "BTC/USD"}}  交易对名称映射，未配置的交易对转为大写并将 - _ 替换为 /
+    }
+同时支持 batch / cache_server 等发布相关配置，含义与平台配置相同。
+
+推送 EVENT_ORDERBOOK_CONSOLIDATED 事件(exchange OrderbookConsolidated，routing_key consolidated.{symbol})，data:
+    asks / bids     [[price, quantity, {"binance": quantity, "okex": quantity}], ...]    quantity 为各平台数量之和
+    bbo             {"bid_price", "bid_quantity", "bid_platforms", "ask_price", "ask_quantity", "ask_platforms", "crossed"}
+    platforms       参与合并的各平台订单薄时间 {"binance": timestamp, ...}
+    timestamp       各平台订单薄时间的最大值
+
+Date:   2026/10/18
+"""
+
+from quant.utils import logger
+
+from utils.event import EventOrderbookConsolidated
+from utils.conflation import Conflator
+from utils.publisher import create_publisher
+from utils.metrics import registry
+
+PLATFORM = "consolidated"
+
+
+def normalize_symbol(symbol):
+    """ 默认的统一交易对名称，如 btc-usdt / BTC_USDT -> BTC/USDT
+    """
+    return symbol.upper().replace("-", "/").replace("_", "/")
+
+
+def _format_quantity(quantity):
+    return ("%.12f" % quantity).rstrip("0").rstrip(".")
+
+
+def _merge_side(books, side, depth, reverse):
+    """ 合并各平台同一方向的档位
+    @param books 各平台订单薄 {platform: {"asks": [...], "bids": [...], "timestamp": ts}}
+    @param side asks / bids
+    @param depth 档数
+    @param reverse 是否按价格从高到低排列(买方向)
+    @return [[price, quantity, {platform: quantity}], ...]
+    """
+    levels = {}  # {float_price: [price, total, {platform: quantity}]}
+    for platform, book in books.items():
+        for price, quantity in book[side]:
+            key = float(price)
+            level = levels.get(key)
+            if level is None:
+                levels[key] = [price, float(quantity), {platform: quantity}]
+            else:
+                level[1] += float(quantity)
+                level[2][platform] = quantity
+    result = []
+    for key in sorted(levels, reverse=reverse)[:depth]:
+        price, total, venues = levels[key]
+        quantity = venues[next(iter(venues))] if len(venues) == 1 else _format_quantity(total)
+        result.append([price, quantity, venues])
+    return result
+
+
+class _Venue:
+    """ 单个平台在合并订单薄中的接入对象，平台行情类在订单薄变化/失效时调用
+    """
+
+    def __init__(self, consolidator, platform):
+        self._consolidator = consolidator
+        self._platform = platform
+
+    def update(self, symbol):
+        """ 标记交易对订单薄已变化
+        """
+        self._consolidator.update(self._platform, symbol)
+
+    def discard(self, symbol):
+        """ 交易对订单薄已失效(如取消订阅、校验失败)，从合并订单薄中移除
+        """
+        self._consolidator.discard(self._platform, symbol)
+
+
+class Consolidator:
+    """ 跨交易所合并订单薄
+    """
+
+    def __init__(self, options):
+        """ 初始化
+        @param options 合并配置，见模块说明
+        """
+        self._depth = options.get("depth", 10)
+        self._platforms = options.get("platforms")
+        self._symbols = set(options["symbols"]) if options.get("symbols") else None
+        self._min_venues = options.get("min_venues", 2)
+        self._aliases = options.get("aliases", {})
+        self._publisher = create_publisher(options)
+        self._conflator = Conflator(self.publish, options.get("interval_ms", 0))
+        self._snapshots = {}  # 各平台获取订单薄前N档的函数 {platform: snapshot}
+        self._names = {}  # 统一交易对名称缓存 {(platform, symbol): name}，不参与合并的为None
+        self._books = {}  # 各平台最近一次读取的前N档 {name: {platform: {"asks", "bids", "timestamp"}}}
+        self._dirty = {}  # 订单薄已变化、等待重新读取的平台 {name: {platform: symbol}}
+        self._last = {}  # 上次推送的前N档 {name: (asks, bids)}
+        self.updates = 0  # 收到的订单薄变化次数
+        self.unchanged = 0  # 平台前N档未变化而忽略的次数
+        self.suppressed = 0  # 合并结果前N档未变化而未推送的次数
+        self.published = 0  # 推送次数
+        registry.register_gauge(PLATFORM, "consolidator", self.stats)
+
+    def register(self, platform, snapshot):
+        """ 注册平台
+        @param platform 交易平台
+        @param snapshot 获取订单薄前N档的函数 snapshot(symbol, depth)，返回 (orderbook, exchange_ts, recv_ts)，订单薄不可用时返回None
+        @return 平台接入对象，平台不参与合并时返回None
+        """
+        if self._platforms and platform not in self._platforms:
+            return None
+        self._snapshots[platform] = snapshot
+        logger.info("platform registered. platform:", platform, "depth:", self._depth, caller=self)
+        return _Venue(self, platform)
+
+    def _name_of(self, platform, symbol):
+        key = (platform, symbol)
+        if key in self._names:
+            return self._names[key]
+        name = self._aliases.get(platform, {}).get(symbol) or normalize_symbol(symbol)
+        if self._symbols is not None and name not in self._symbols:
+            name = None
+        self._names[key] = name
+        return name
+
+    def update(self, platform, symbol):
+        """ 平台交易对订单薄已变化，实际读取推迟到推送时进行，合并周期内只读取一次
+        """
+        name = self._name_of(platform, symbol)
+        if name is None:
+            return
+        self.updates += 1
+        self._dirty.setdefault(name, {})[platform] = symbol
+        self._conflator.update(name)
+
+    def discard(self, platform, symbol):
+        """ 平台交易对订单薄已失效，从合并订单薄中移除
+        """
+        name = self._name_of(platform, symbol)
+        if name is None:
+            return
+        self._dirty.get(name, {}).pop(platform, None)
+        books = self._books.get(name)
+        if books and books.pop(platform, None) is not None:
+            self._last.pop(name, None)
+            self._conflator.update(name)
+
+    def _refresh(self, name):
+        """ 重新读取已变化平台的前N档
+        @return 是否有平台的前N档发生变化
+        """
+        dirty = self._dirty.pop(name, None)
+        if not dirty:
+            return False
+        books = self._books.setdefault(name, {})
+        changed = False
+        for platform, symbol in dirty.items():
+            snapshot = self._snapshots[platform](symbol, self._depth)
+            if not snapshot:
+                changed = books.pop(platform, None) is not None or changed
+                continue
+            orderbook = snapshot[0]
+            book = books.get(platform)
+            if book and book["asks"] == orderbook["asks"] and book["bids"] == orderbook["bids"]:
+                self.unchanged += 1
+                continue
+            books[platform] = {"asks": orderbook["asks"], "bids": orderbook["bids"],
+                               "timestamp": orderbook.get("timestamp")}
+            changed = True
+        return changed
+
+    def publish(self, name):
+        """ 合并并推送交易对的订单薄，前N档未变化时不推送
+        @param name 统一交易对名称
+        """
+        if not self._refresh(name) and name in self._last:
+            return
+        books = self._books.get(name) or {}
+        if len(books) < self._min_venues:
+            self._last.pop(name, None)
+            return
+        asks = _merge_side(books, "asks", self._depth, False)
+        bids = _merge_side(books, "bids", self._depth, True)
+        if self._last.get(name) == (asks, bids):
+            self.suppressed += 1
+            return
+        self._last[name] = (asks, bids)
+        timestamps = {platform: book["timestamp"] for platform, book in books.items()}
+        orderbook = {
+            "platform": PLATFORM,
+            "symbol": name,
+            "asks": asks,
+            "bids": bids,
+            "bbo": self._bbo(asks, bids),
+            "platforms": timestamps,
+            "timestamp": max([ts for ts in timestamps.values() if ts] or [None])
+        }
+        self._publisher.publish(EventOrderbookConsolidated(**orderbook))
+        self.published += 1
+
+    @staticmethod
+    def _bbo(asks, bids):
+        """ 跨平台最优买卖价，crossed 为 True 表示某平台的买一价不低于另一平台的卖一价
+        """
+        bbo = {}
+        for prefix, levels in (("bid_", bids), ("ask_", asks)):
+            price, quantity, venues = levels[0] if levels else (None, None, {})
+            bbo[prefix + "price"] = price
+            bbo[prefix + "quantity"] = quantity
+            bbo[prefix + "platforms"] = list(venues)
+        bbo["crossed"] = bool(asks and bids) and float(bids[0][0]) >= float(asks[0][0])
+        return bbo
+
+    def stats(self):
+        """ 合并统计
+        """
+        return {
+            "symbols": len(self._last),
+            "updates": self.updates,
+            "unchanged": self.unchanged,
+            "suppressed": self.suppressed,
+            "published": self.published
+        }
+
+
+_consolidator = None  # 进程内唯一的合并订单薄，未配置时为None
+
+
+def create_consolidator(options):
+    """ 根据配置创建进程内的合并订单薄，需在创建各平台行情对象之前调用；未配置时返回None
+    @param options 合并配置 CONSOLIDATED
+    """
+    global _consolidator
+    if not options:
+        return None
+    _consolidator = Consolidator(options)
+    return _consolidator
+
+
+def venue_of(platform, snapshot):
+    """ 平台行情类注册到合并订单薄
+    @param platform 交易平台
+    @param snapshot 获取订单薄前N档的函数 snapshot(symbol, depth)
+    @return 平台接入对象，未配置合并订单薄或平台不参与合并时返回None
+    """
+    if _consolidator is None:
+        return None
+    return _consolidator.register(platform, snapshot)
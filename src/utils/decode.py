@@ -0,0 +1,36 @@
+# -*— coding:utf-8 -*-
+
+"""
+websocket数据帧解码
+安装 orjson 时使用 orjson 解析JSON，否则使用标准库 json；压缩帧一次性解压，心跳返回在字节层面直接判断，不做字符串解码。
+
+Date:   2026/10/18
+"""
+
+import zlib
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PONG = b"pong"
+
+if orjson:
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+else:
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+
+def decode_deflate_frame(raw):
+    """ 解压并解析JSON数据帧
+    @param raw 压缩数据
+    @return 解析后的数据，心跳返回 pong 时返回None
+    """
+    data = zlib.decompress(raw, -zlib.MAX_WBITS)
+    if data == PONG:
+        return None
+    return loads(data)
@@ -0,0 +1,167 @@
+# -*— coding:utf-8 -*-
+
+"""
+增量订单薄事件
+发布端(DeltaEncoder): 将完整订单薄事件转换为只包含变化档位的 EventOrderbookDelta，每个交易对的事件带连续序号，
+每 keyframe_updates 条或 keyframe_interval 秒发送一次完整订单薄(关键帧)，变化档位数不少于完整订单薄档位数时也直接发送关键帧。
+客户端(DeltaBook): 按序号应用增量事件重建订单薄，序号不连续时标记为未同步并等待下一个关键帧。
+
+Date:   2026/10/18
+"""
+
+import time
+
+from utils.event import EventOrderbookDelta
+
+REMOVED = "0"  # 增量事件中删除档位的数量
+
+
+def _diff(last, levels):
+    """ 计算档位变化，新增/修改的档位与被删除的档位分开返回，不通过数量值判断是否删除
+    @param last 上一次发布的档位 {price: quantity}
+    @param levels 本次发布的档位 [[price, quantity], ...]
+    @return (新增/修改的档位 [[price, quantity], ...], 被删除的价格 [price, ...])
+    """
+    changes = []
+    for level in levels:
+        if last.get(level[0]) != level[1]:
+            changes.append([level[0], level[1]])
+    removed = []
+    if len(last) + len(changes) > len(levels):  # 有档位被删除
+        prices = set(level[0] for level in levels)
+        removed = [price for price in last if price not in prices]
+    return changes, removed
+
+
+def _apply(last, changes, removed):
+    """ 更新上一次发布的档位，返回增量事件中的档位变化(被删除的档位数量为 REMOVED)
+    """
+    for price, quantity in changes:
+        last[price] = quantity
+    for price in removed:
+        del last[price]
+    changes.extend([price, REMOVED] for price in removed)
+    return changes
+
+
+class DeltaEncoder:
+    """ 增量订单薄编码(发布端)
+    """
+
+    def __init__(self, keyframe_updates=100, keyframe_interval=10):
+        """ 初始化
+        @param keyframe_updates 每多少条事件发送一次关键帧
+        @param keyframe_interval 关键帧最长间隔(秒)
+        """
+        self._keyframe_updates = keyframe_updates
+        self._keyframe_interval = keyframe_interval
+        self._books = {}  # 上一次发布的订单薄 {(platform, symbol): [asks, bids, seq, keyframe_seq, keyframe_ts]}
+        self.keyframes = 0  # 已发送关键帧数
+        self.deltas = 0  # 已发送增量事件数
+
+    def encode(self, orderbook):
+        """ 将完整订单薄转换为增量订单薄事件
+        @param orderbook 完整订单薄数据 {"platform", "symbol", "asks", "bids", "timestamp"}
+        @return EventOrderbookDelta
+        """
+        key = (orderbook["platform"], orderbook["symbol"])
+        asks = orderbook["asks"]
+        bids = orderbook["bids"]
+        now = time.time()
+        state = self._books.get(key)
+        keyframe = state is None or state[2] - state[3] + 1 >= self._keyframe_updates or \
+            now - state[4] >= self._keyframe_interval
+        if not keyframe:
+            ask_changes, ask_removed = _diff(state[0], asks)
+            bid_changes, bid_removed = _diff(state[1], bids)
+            keyframe = len(ask_changes) + len(ask_removed) + len(bid_changes) + len(bid_removed) >= \
+                len(asks) + len(bids)
+        seq = state[2] + 1 if state else 0
+        if keyframe:
+            self._books[key] = [{l[0]: l[1] for l in asks}, {l[0]: l[1] for l in bids}, seq, seq, now]
+            self.keyframes += 1
+            ask_changes, bid_changes = asks, bids
+        else:
+            ask_changes = _apply(state[0], ask_changes, ask_removed)
+            bid_changes = _apply(state[1], bid_changes, bid_removed)
+            state[2] = seq
+            self.deltas += 1
+        delta = {
+            "platform": orderbook["platform"],
+            "symbol": orderbook["symbol"],
+            "seq": seq,
+            "keyframe": keyframe,
+            "asks": ask_changes,
+            "bids": bid_changes,
+            "timestamp": orderbook["timestamp"]
+        }
+        return EventOrderbookDelta(**delta)
+
+
+class DeltaBook:
+    """ 根据增量订单薄事件重建订单薄(客户端)
+    """
+
+    def __init__(self):
+        self.seq = None  # 最后应用的事件序号
+        self.synced = False  # 是否已同步(收到关键帧且之后序号连续)
+        self.gaps = 0  # 序号不连续次数
+        self.timestamp = None
+        self._asks = {}  # {price: quantity}
+        self._bids = {}
+
+    def apply(self, data):
+        """ 应用一条增量订单薄事件
+        @param data EventOrderbookDelta 的 data
+        @return 是否已应用，未同步时等待关键帧返回False
+        """
+        seq = data["seq"]
+        if data["keyframe"]:
+            self._asks = {l[0]: l[1] for l in data["asks"]}
+            self._bids = {l[0]: l[1] for l in data["bids"]}
+            self.synced = True
+        elif not self.synced:
+            return False
+        elif seq != self.seq + 1:  # 事件缺失，等待下一个关键帧
+            self.gaps += 1
+            self.synced = False
+            self.seq = seq
+            return False
+        else:
+            self._update(self._asks, data["asks"])
+            self._update(self._bids, data["bids"])
+        self.seq = seq
+        self.timestamp = data["timestamp"]
+        return True
+
+    @staticmethod
+    def _update(side, levels):
+        for price, quantity in levels:
+            if float(quantity) == 0:
+                side.pop(price, None)
+            else:
+                side[price] = quantity
+
+    def asks(self, n=None):
+        """ 卖盘，价格从低到高 [[price, quantity], ...]
+        @param n 档数，None为全部
+        """
+        return [[p, self._asks[p]] for p in sorted(self._asks, key=float)[:n]]
+
+    def bids(self, n=None):
+        """ 买盘，价格从高到低 [[price, quantity], ...]
+        @param n 档数，None为全部
+        """
+        return [[p, self._bids[p]] for p in sorted(self._bids, key=float, reverse=True)[:n]]
+
+
+def create_delta_encoder(platform_config):
+    """ 根据平台配置创建增量订单薄编码，未配置 orderbook_delta 时返回None
+    @param platform_config 平台行情配置 {"orderbook_delta": {"keyframe_updates": 100, "keyframe_interval": 10}}
+    """
+    options = platform_config.get("orderbook_delta")
+    if not options:
+        return None
+    if options is True:
+        options = {}
+    return DeltaEncoder(options.get("keyframe_updates", 100), options.get("keyframe_interval", 10))
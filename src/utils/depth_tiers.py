@@ -0,0 +1,95 @@
+# -*— coding:utf-8 -*-
+
+"""
+多档位订单薄推送
+同一个本地订单薄按配置的多个档位(档数 + 推送周期)分别推送，每个档位使用独立的 routing_key(平台.交易对.depth{档数})，
+订阅方只需接收所需的档数及频率。档位配置:
+    [{"depth": 1, "interval_ms": 0}, {"depth": 200, "interval_ms": 1000}]             所有交易对
+    {"BTC/USDT": [{"depth": 1, "interval_ms": 0}], "*": [{"depth": 5, "interval_ms": 100}]}  按交易对配置，"*" 为其它交易对
+
+Date:   2026/10/18
+"""
+
+from quant.utils import logger
+
+from utils.event import EventOrderbookTier
+from utils.conflation import Conflator
+
+
+class DepthTiers:
+    """ 多档位订单薄推送
+    """
+
+    def __init__(self, platform, tiers, snapshot, publisher, metrics=None):
+        """ 初始化
+        @param platform 交易平台
+        @param tiers 档位配置，list 适用于所有交易对，dict 按交易对配置
+        @param snapshot 获取订单薄前N档的函数 snapshot(symbol, depth)，返回 (orderbook, exchange_ts, recv_ts)，订单薄不可用时返回None
+        @param publisher 事件发布器
+        @param metrics 延迟统计 MarketMetrics
+        """
+        self._platform = platform
+        self._tiers = tiers if isinstance(tiers, dict) else {"*": tiers}
+        self._snapshot = snapshot
+        self._publisher = publisher
+        self._metrics = metrics
+        self._conflators = {}  # 各档位的合并推送 {(depth, interval_ms): Conflator}
+        self._symbol_conflators = {}  # 交易对对应的档位 {"symbol": [Conflator, ...]}
+
+    def _get_conflators(self, symbol):
+        conflators = self._symbol_conflators.get(symbol)
+        if conflators is not None:
+            return conflators
+        conflators = []
+        depths = set()
+        for tier in self._tiers.get(symbol, self._tiers.get("*", [])):
+            depth = tier["depth"]
+            if depth in depths:
+                logger.error("duplicate depth tier! symbol:", symbol, "depth:", depth, caller=self)
+                continue
+            depths.add(depth)
+            key = (depth, tier.get("interval_ms", 0))
+            conflator = self._conflators.get(key)
+            if conflator is None:
+                conflator = self._conflators[key] = Conflator(lambda s, d=depth: self.publish(s, d), key[1])
+            conflators.append(conflator)
+        self._symbol_conflators[symbol] = conflators
+        return conflators
+
+    def update(self, symbol):
+        """ 标记交易对订单薄已变化
+        @param symbol 交易对
+        """
+        for conflator in self._get_conflators(symbol):
+            conflator.update(symbol)
+
+    def discard(self, symbol):
+        """ 取消交易对等待中的推送
+        @param symbol 交易对
+        """
+        for conflator in self._get_conflators(symbol):
+            conflator.discard(symbol)
+
+    def publish(self, symbol, depth):
+        """ 推送交易对指定档数的订单薄
+        @param symbol 交易对
+        @param depth 档数
+        """
+        snapshot = self._snapshot(symbol, depth)
+        if not snapshot:
+            return
+        orderbook, exchange_ts, recv_ts = snapshot
+        self._publisher.publish(EventOrderbookTier(depth=depth, **orderbook))
+        if self._metrics:
+            self._metrics.published("orderbook%d" % depth, symbol, exchange_ts, recv_ts)
+
+
+def create_depth_tiers(platform, platform_config, snapshot, publisher, metrics=None):
+    """ 根据平台配置创建多档位订单薄推送，未配置 orderbook_tiers 时返回None
+    @param platform 交易平台
+    @param platform_config 平台行情配置 {"orderbook_tiers": [{"depth": 5, "interval_ms": 0}, ...]}
+    """
+    tiers = platform_config.get("orderbook_tiers")
+    if not tiers:
+        return None
+    return DepthTiers(platform, tiers, snapshot, publisher, metrics)
@@ -0,0 +1,104 @@
+# -*— coding:utf-8 -*-
+
+"""
+框架未提供的行情事件
+
+Date:   2026/10/18
+"""
+
+from quant.event import Event
+
+
+class EventTicker(Event):
+    """ 行情Ticker事件
+    data 为ticker数据字典，包含 platform / symbol / timestamp 及各平台提供的 最新价、24小时统计、买一卖一 等字段。
+    """
+
+    def __init__(self, **ticker):
+        name = "EVENT_TICKER"
+        exchange = "Ticker"
+        routing_key = "{platform}.{symbol}".format(platform=ticker.get("platform"), symbol=ticker.get("symbol"))
+        super(EventTicker, self).__init__(name=name, exchange=exchange, routing_key=routing_key, data=ticker)
+
+
+class EventOrderbookDelta(Event):
+    """ 增量订单薄事件
+    data 为 {"platform", "symbol", "seq", "keyframe", "asks", "bids", "timestamp"}，keyframe 为 True 时 asks/bids 为完整订单薄，
+    否则只包含相对上一条事件发生变化的档位，数量为 "0" 表示删除该档位；客户端可使用 utils.delta.DeltaBook 重建订单薄。
+    """
+
+    def __init__(self, **delta):
+        name = "EVENT_ORDERBOOK_DELTA"
+        exchange = "OrderbookDelta"
+        routing_key = "{platform}.{symbol}".format(platform=delta.get("platform"), symbol=delta.get("symbol"))
+        super(EventOrderbookDelta, self).__init__(name=name, exchange=exchange, routing_key=routing_key, data=delta)
+
+
+class EventOrderbookTier(Event):
+    """ 指定档数的订单薄事件
+    与 EventOrderbook 使用同一个 exchange，routing_key 为 平台.交易对.depth{档数}，data 在订单薄数据基础上增加 depth(档数)。
+    """
+
+    def __init__(self, **orderbook):
+        name = "EVENT_ORDERBOOK"
+        exchange = "Orderbook"
+        routing_key = "{platform}.{symbol}.depth{depth}".format(platform=orderbook.get("platform"),
+                                                                symbol=orderbook.get("symbol"),
+                                                                depth=orderbook.get("depth"))
+        super(EventOrderbookTier, self).__init__(name=name, exchange=exchange, routing_key=routing_key, data=orderbook)
+
+
+class EventMarketStatus(Event):
+    """ 行情状态事件
+    data 为 {"platform", "symbol", "status", "timestamp"}，status 为 stale(连接断开，订单薄已过期) / recovered(重连后订单薄已恢复，
+    附带 stale_ms 过期时长毫秒)。
+    """
+
+    def __init__(self, **status):
+        name = "EVENT_MARKET_STATUS"
+        exchange = "MarketStatus"
+        routing_key = "{platform}.{symbol}".format(platform=status.get("platform"), symbol=status.get("symbol"))
+        super(EventMarketStatus, self).__init__(name=name, exchange=exchange, routing_key=routing_key, data=status)
+
+
+class EventOrderbookConsolidated(Event):
+    """ 跨交易所合并订单薄事件
+    data 为 {"platform": "consolidated", "symbol", "asks", "bids", "bbo", "platforms", "timestamp"}，每个档位为
+    [price, quantity, {platform: quantity}]，详见 utils.consolidated。
+    """
+
+    def __init__(self, **orderbook):
+        name = "EVENT_ORDERBOOK_CONSOLIDATED"
+        exchange = "OrderbookConsolidated"
+        routing_key = "{platform}.{symbol}".format(platform=orderbook.get("platform"), symbol=orderbook.get("symbol"))
+        super(EventOrderbookConsolidated, self).__init__(name=name, exchange=exchange, routing_key=routing_key,
+                                                         data=orderbook)
+
+
+class EventKlinePartial(Event):
+    """ 未结束K线事件
+    与已结束K线(EventKline)使用不同的 exchange，data 与 EventKline 相同，并增加 closed(始终为 False)。
+    """
+
+    def __init__(self, **kline):
+        name = "EVENT_KLINE_PARTIAL"
+        exchange = "KlinePartial"
+        routing_key = "{platform}.{symbol}".format(platform=kline.get("platform"), symbol=kline.get("symbol"))
+        kline["closed"] = False
+        super(EventKlinePartial, self).__init__(name=name, exchange=exchange, routing_key=routing_key, data=kline)
+
+
+class EventKlineInterval(Event):
+    """ 框架 EventKline 不支持的周期(如 30m / 1h / 4h / 1d)的已结束K线事件
+    data 与 EventKline 相同，kline_type 为 kline_{周期}；名称为 EVENT_KLINE_{周期}(如 EVENT_KLINE_1H、EVENT_KLINE_30MIN)，
+    exchange 为 Kline.{周期}(如 Kline.1h、Kline.30min)，与框架 Kline.5min / Kline.15min 的命名方式一致。
+    """
+
+    def __init__(self, **kline):
+        interval = kline.get("kline_type").split("_", 1)[1]
+        if interval.endswith("m"):
+            interval = interval[:-1] + "min"
+        name = "EVENT_KLINE_" + interval.upper()
+        exchange = "Kline." + interval
+        routing_key = "{platform}.{symbol}".format(platform=kline.get("platform"), symbol=kline.get("symbol"))
+        super(EventKlineInterval, self).__init__(name=name, exchange=exchange, routing_key=routing_key, data=kline)
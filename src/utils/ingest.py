@@ -0,0 +1,183 @@
+# -*— coding:utf-8 -*-
+
+"""
+行情数据接收队列
+websocket读取协程只负责解码及入队，订单薄更新、推送等处理由独立的处理协程从有界队列中取出执行，处理耗时不再阻塞socket读取。
+每个频道可配置队列策略:
+    latest  每个交易对只保留最新一条等待处理的消息，快照直接替换，增量数据通过 merge 函数合并(合并后的结果与逐条处理一致)；
+            同一频道中不可合并的消息(如包含多个交易对的消息)入队后，排在它之前的消息不再被合并，保证处理顺序与接收顺序一致
+    block   不丢弃，队列满时读取协程等待处理协程腾出空间(背压)
+    drop    队列满时丢弃新消息并计数
+
+Date:   2026/10/18
+"""
+
+import asyncio
+from collections import deque
+
+from quant.utils import logger
+from quant.tasks import LoopRunTask
+
+from utils.metrics import registry
+
+POLICY_LATEST = "latest"
+POLICY_BLOCK = "block"
+POLICY_DROP = "drop"
+POLICIES = (POLICY_LATEST, POLICY_BLOCK, POLICY_DROP)
+
+
+def merge_levels(old, new):
+    """ 合并两次增量数据中同一方向的档位，同价格以后者为准
+    @param old 先收到的档位 [[price, quantity, ...], ...]
+    @param new 后收到的档位
+    @return 合并后的档位列表
+    """
+    if not old:
+        return new
+    if not new:
+        return old
+    levels = {level[0]: level for level in old}
+    for level in new:
+        levels[level[0]] = level
+    return list(levels.values())
+
+
+class IngestQueue:
+    """ 单个websocket连接的接收队列
+    """
+
+    YIELD_EVERY = 16  # 处理协程每处理多少条消息主动让出一次事件循环，保证读取协程及时读取
+
+    def __init__(self, platform, name, handler, maxsize=10000, policies=None, report_interval=60):
+        """ 初始化
+        @param platform 交易平台
+        @param name 队列名称(如连接序号)，用于日志及统计
+        @param handler 消息处理协程 handler(item)
+        @param maxsize 队列最大长度
+        @param policies 各频道队列策略 {"orderbook": "latest", "trade": "block"}，未配置的频道为 block
+        @param report_interval 队列统计日志输出周期(秒)，0为不输出
+        """
+        self._name = name
+        self._handler = handler
+        self._maxsize = maxsize
+        self._policies = policies or {}
+        for channel, policy in self._policies.items():
+            if policy not in POLICIES:
+                raise ValueError("ingest policy error! channel: %s policy: %s" % (channel, policy))
+        self._queue = deque()  # 等待处理的消息 [[channel, key, item], ...]
+        self._pending = {}  # latest 策略下可被合并的等待处理的消息 {channel: {key: entry}}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._task = None
+        self.max_depth = 0  # 队列最大长度
+        self.processed = 0  # 已处理消息数
+        self.replaced = {}  # latest 策略被合并的消息数 {channel: count}
+        self.dropped = {}  # drop 策略被丢弃的消息数 {channel: count}
+        self.blocked = 0  # 队列满时读取协程等待次数
+        registry.register_gauge(platform, "ingest:" + str(name), self.stats)
+        if report_interval:
+            LoopRunTask.register(self.report, report_interval)
+
+    @property
+    def depth(self):
+        """ 当前队列长度
+        """
+        return len(self._queue)
+
+    async def put(self, channel, key, item, merge=None):
+        """ 消息入队，由读取协程调用
+        @param channel 频道
+        @param key 交易对，None表示消息不能与其它消息合并
+        @param item 消息
+        @param merge latest 策略下合并函数 merge(old, new)，返回合并后的消息，不能合并时返回None；merge为None时直接替换
+        """
+        policy = self._policies.get(channel, POLICY_BLOCK)
+        if policy == POLICY_LATEST and key is not None:
+            entry = self._pending.get(channel, {}).get(key)
+            if entry is not None:
+                merged = merge(entry[2], item) if merge else item
+                if merged is not None:  # 不能合并(如更新id不连续)时作为新消息入队
+                    entry[2] = merged
+                    self.replaced[channel] = self.replaced.get(channel, 0) + 1
+                    return
+        if len(self._queue) >= self._maxsize:
+            if policy == POLICY_DROP:
+                self.dropped[channel] = self.dropped.get(channel, 0) + 1
+                return
+            self.blocked += 1
+            while len(self._queue) >= self._maxsize:
+                self._not_full.clear()
+                await self._not_full.wait()
+        entry = [channel, key, item]
+        self._queue.append(entry)
+        if policy == POLICY_LATEST:
+            if key is not None:
+                self._pending.setdefault(channel, {})[key] = entry
+            else:  # 合并到排在该消息之前的消息会改变处理顺序
+                self._pending.pop(channel, None)
+        if len(self._queue) > self.max_depth:
+            self.max_depth = len(self._queue)
+        self._not_empty.set()
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def _run(self):
+        """ 处理协程
+        """
+        count = 0
+        while True:
+            if not self._queue:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+            entry = self._queue.popleft()
+            channel, key, item = entry
+            pending = self._pending.get(channel)
+            if key is not None and pending and pending.get(key) is entry:
+                del pending[key]
+            if len(self._queue) < self._maxsize:
+                self._not_full.set()
+            try:
+                await self._handler(item)
+            except Exception as e:
+                logger.error("process message error! channel:", channel, "key:", key, "error:", e, caller=self)
+            self.processed += 1
+            count += 1
+            if count >= self.YIELD_EVERY:
+                count = 0
+                await asyncio.sleep(0)
+
+    def stats(self):
+        """ 队列统计
+        """
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "replaced": dict(self.replaced),
+            "dropped": dict(self.dropped),
+            "blocked": self.blocked
+        }
+
+    async def report(self, *args, **kwargs):
+        """ 输出队列统计
+        """
+        logger.info("ingest queue:", self._name, self.stats(), caller=self)
+
+
+def create_ingest_queue(platform, platform_config, name, handler, policies=None):
+    """ 根据平台配置创建接收队列，未配置 ingest 时返回None，消息在读取协程中直接处理
+    @param platform 交易平台
+    @param platform_config 平台行情配置 {"ingest": {"maxsize": 10000, "policies": {"orderbook": "latest"}}}
+    @param name 队列名称
+    @param handler 消息处理协程
+    @param policies 平台默认的各频道队列策略，配置中的 policies 优先
+    """
+    options = platform_config.get("ingest")
+    if not options:
+        return None
+    policies = dict(policies or {})
+    policies.update(options.get("policies", {}))
+    return IngestQueue(platform, name, handler, options.get("maxsize", 10000), policies,
+                       options.get("report_interval", 60))
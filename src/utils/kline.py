@@ -0,0 +1,244 @@
+# -*— coding:utf-8 -*-
+
+"""
+多周期K线合成
+由成交数据或1分钟K线增量合成 5m / 15m / 30m / 1h / 4h / 1d 等周期的K线，每条数据对每个周期的处理为O(1)；
+K线结束后(收到下一周期的数据，或超过结束时间 close_delay 毫秒)回调推送，可选每秒推送一次未结束K线的最新状态；
+K线结束后迟到的同周期数据被丢弃，每个周期只推送一次已结束K线。
+
+Date:   2026/10/18
+"""
+
+from quant import const
+from quant.utils import tools
+from quant.tasks import LoopRunTask
+from quant.event import EventKline
+
+from utils.event import EventKlineInterval
+
+INTERVALS = {
+    "1m": 60 * 1000,
+    "3m": 3 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "2h": 2 * 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000,
+    "6h": 6 * 60 * 60 * 1000,
+    "12h": 12 * 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000
+}
+
+KLINE_TYPES = {
+    "1m": const.MARKET_TYPE_KLINE,
+    "5m": const.MARKET_TYPE_KLINE_5M,
+    "15m": const.MARKET_TYPE_KLINE_15M
+}
+
+
+def kline_type_of(interval):
+    """ 周期对应的K线类型
+    @param interval 周期，如 5m / 1h
+    """
+    return KLINE_TYPES.get(interval, "kline_" + interval)
+
+
+def kline_event(kline):
+    """ 已结束K线对应的事件，1m / 5m / 15m 使用框架 EventKline，其它周期使用 EventKlineInterval
+    @param kline K线数据
+    """
+    if kline["kline_type"] in KLINE_TYPES.values():
+        return EventKline(**kline)
+    return EventKlineInterval(**kline)
+
+
+class _Bar:
+    """ 一根正在合成的K线
+    open/high/low/close 保存原始价格字符串，high/low 比较及成交量累加使用浮点数；
+    由1分钟K线合成时，已结束分钟的数据累计在 high/low/volume 中，当前分钟的最新状态单独保存，
+    同一分钟的K线多次推送时只替换当前分钟的数据。
+    """
+
+    __slots__ = ("start", "open", "high", "low", "close", "high_f", "low_f", "volume",
+                 "minute", "m_high", "m_low", "m_high_f", "m_low_f", "m_volume", "changed")
+
+    def __init__(self, start):
+        self.start = start
+        self.open = None
+        self.high = self.low = self.close = None
+        self.high_f = self.low_f = None
+        self.volume = 0.0
+        self.minute = None
+        self.m_high = self.m_low = None
+        self.m_high_f = self.m_low_f = None
+        self.m_volume = 0.0
+        self.changed = False
+
+    def add_trade(self, price, price_f, quantity_f):
+        if self.open is None:
+            self.open = self.high = self.low = price
+            self.high_f = self.low_f = price_f
+        elif price_f > self.high_f:
+            self.high, self.high_f = price, price_f
+        elif price_f < self.low_f:
+            self.low, self.low_f = price, price_f
+        self.close = price
+        self.volume += quantity_f
+        self.changed = True
+
+    def add_minute(self, minute, _open, high, low, close, volume):
+        if minute != self.minute:
+            self._fold_minute()
+            self.minute = minute
+            if self.open is None:
+                self.open = _open
+        self.m_high, self.m_high_f = high, float(high)
+        self.m_low, self.m_low_f = low, float(low)
+        self.m_volume = float(volume)
+        self.close = close
+        self.changed = True
+
+    def _fold_minute(self):
+        if self.minute is None:
+            return
+        if self.high_f is None or self.m_high_f > self.high_f:
+            self.high, self.high_f = self.m_high, self.m_high_f
+        if self.low_f is None or self.m_low_f < self.low_f:
+            self.low, self.low_f = self.m_low, self.m_low_f
+        self.volume += self.m_volume
+        self.m_volume = 0.0
+        self.minute = None
+
+    def snapshot(self):
+        """ 当前状态 (open, high, low, close, volume)
+        """
+        high, low, volume = self.high, self.low, self.volume
+        if self.minute is not None:
+            if self.high_f is None or self.m_high_f > self.high_f:
+                high = self.m_high
+            if self.low_f is None or self.m_low_f < self.low_f:
+                low = self.m_low
+            volume += self.m_volume
+        return self.open, high, low, self.close, volume
+
+
+class KlineAggregator:
+    """ 多周期K线合成
+    """
+
+    def __init__(self, platform, intervals, callback, source="kline", partial=False, close_delay=3000):
+        """ 初始化
+        @param platform 交易平台
+        @param intervals 需要合成的周期列表，如 ["5m", "15m", "1h", "4h", "1d"]
+        @param source 合成数据来源 kline 1分钟K线 / trade 成交，另一种来源的数据将被忽略
+        @param callback 推送回调函数 callback(kline, closed)，kline 为 EventKline 参数字典，closed 表示K线是否已结束
+        @param partial 是否推送未结束K线的最新状态(通过 check 每次调用时推送有变化的K线)
+        @param close_delay K线结束时间之后，等待多少毫秒仍未收到下一周期数据时强制结束
+        """
+        self._platform = platform
+        self._source = source
+        self._intervals = [(i, INTERVALS[i], kline_type_of(i)) for i in intervals]
+        self._interval_info = {i[0]: i for i in self._intervals}
+        self._callback = callback
+        self._partial = partial
+        self._close_delay = close_delay
+        self._bars = {}  # {(symbol, interval): _Bar}
+        self._closed = {}  # 最近一根已结束K线的开始时间 {(symbol, interval): start}
+        self.late = 0  # K线结束后收到的迟到数据条数(已丢弃)
+
+    def on_trade(self, symbol, price, quantity, timestamp):
+        """ 成交数据
+        @param symbol 交易对
+        @param price 成交价格字符串
+        @param quantity 成交数量字符串
+        @param timestamp 成交时间戳(毫秒)
+        """
+        if self._source != "trade":
+            return
+        price_f = float(price)
+        quantity_f = float(quantity)
+        for interval, length, kline_type in self._intervals:
+            bar = self._get_bar(symbol, interval, length, kline_type, timestamp)
+            if bar:
+                bar.add_trade(price, price_f, quantity_f)
+
+    def on_kline(self, symbol, _open, high, low, close, volume, timestamp):
+        """ 1分钟K线数据，同一分钟可多次推送
+        @param timestamp 1分钟K线开始时间戳(毫秒)
+        """
+        if self._source != "kline":
+            return
+        for interval, length, kline_type in self._intervals:
+            bar = self._get_bar(symbol, interval, length, kline_type, timestamp)
+            if bar:
+                bar.add_minute(timestamp, _open, high, low, close, volume)
+
+    def _get_bar(self, symbol, interval, length, kline_type, timestamp):
+        start = timestamp - timestamp % length
+        key = (symbol, interval)
+        bar = self._bars.get(key)
+        if bar is not None:
+            if start == bar.start:
+                return bar
+            if start < bar.start:  # 过期数据
+                self.late += 1
+                return None
+            self._close(symbol, interval, kline_type, bar)
+        elif start <= self._closed.get(key, -1):  # 该周期已结束并推送
+            self.late += 1
+            return None
+        bar = self._bars[key] = _Bar(start)
+        return bar
+
+    async def check(self, *args, **kwargs):
+        """ 定时检查：结束超时未收到下一周期数据的K线，推送有变化的未结束K线
+        """
+        now = tools.get_cur_timestamp_ms()
+        for (symbol, interval), bar in list(self._bars.items()):
+            _, length, kline_type = self._interval_info[interval]
+            if now >= bar.start + length + self._close_delay:
+                self._bars.pop((symbol, interval))
+                self._close(symbol, interval, kline_type, bar)
+            elif self._partial and bar.changed:
+                bar.changed = False
+                self._callback(self._make_kline(symbol, kline_type, bar), False)
+
+    def _close(self, symbol, interval, kline_type, bar):
+        self._closed[(symbol, interval)] = bar.start
+        if bar.open is None:
+            return
+        self._callback(self._make_kline(symbol, kline_type, bar), True)
+
+    def _make_kline(self, symbol, kline_type, bar):
+        _open, high, low, close, volume = bar.snapshot()
+        return {
+            "platform": self._platform,
+            "symbol": symbol,
+            "open": _open,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": "%.8f" % volume,
+            "timestamp": bar.start,
+            "kline_type": kline_type
+        }
+
+
+def create_kline_aggregator(platform, platform_config, callback):
+    """ 根据平台配置创建多周期K线合成，未配置 kline_intervals 时返回None
+    @param platform 交易平台
+    @param platform_config 平台行情配置
+        kline_intervals 合成周期列表，如 ["5m", "15m", "1h", "4h", "1d"]
+        kline_source 合成数据来源 kline / trade，默认订阅了 kline 时使用1分钟K线，否则使用成交
+        kline_partial 是否每秒推送未结束K线的最新状态(以 EventKlinePartial 推送)，默认 false
+    @param callback 推送回调函数 callback(kline, closed)
+    """
+    intervals = platform_config.get("kline_intervals")
+    if not intervals:
+        return None
+    default_source = "kline" if "kline" in platform_config.get("channels", []) else "trade"
+    aggregator = KlineAggregator(platform, intervals, callback, platform_config.get("kline_source", default_source),
+                                 platform_config.get("kline_partial", False))
+    LoopRunTask.register(aggregator.check, 1)
+    return aggregator
@@ -0,0 +1,107 @@
+# -*— coding:utf-8 -*-
+
+"""
+行情数据日志
+行情事件日志先放入有界队列，由后台线程统一格式化并写入，不阻塞事件循环；队列满时直接丢弃并计数。
+每个频道可配置采样策略:
+    {"every": N}        每个交易对每N条记录1条
+    {"interval": S}     每个交易对每S秒最多记录1条
+    false               不记录该频道
+
+Date:   2026/10/18
+"""
+
+import time
+import queue
+import threading
+
+from quant.utils import logger
+
+
+class _LogWriter(threading.Thread):
+    """ 后台日志写入线程，进程内所有行情日志共用
+    """
+
+    def __init__(self, maxsize=10000):
+        super(_LogWriter, self).__init__(name="market-log", daemon=True)
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0  # 队列已满丢弃的日志条数
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        while True:
+            channel, symbol, data, caller = self.queue.get()
+            try:
+                logger.info("symbol:", symbol, channel + ":", data, caller=caller)
+            except Exception as e:
+                logger.error("write log error! channel:", channel, "symbol:", symbol, "error:", e)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = _LogWriter()
+            _writer.start()
+    return _writer
+
+
+class MarketLogger:
+    """ 采样、异步写入的行情日志
+    """
+
+    def __init__(self, options=None):
+        """ 初始化
+        @param options 各频道采样配置 {"orderbook": {"every": 100}, "trade": {"interval": 1}, "kline": false}，
+                       未配置的频道全部记录；options为False时不记录任何行情日志
+        """
+        self._enabled = options is not False
+        self._options = options if isinstance(options, dict) else {}
+        self._counters = {}  # {(channel, symbol): count}
+        self._last_ts = {}  # {(channel, symbol): monotonic}
+        self.sampled = 0  # 因采样未记录的条数
+
+    def log(self, channel, symbol, data, caller=None):
+        """ 记录一条行情日志
+        @param channel 频道 orderbook / trade / kline / ...
+        @param symbol 交易对
+        @param data 行情数据，写入前不能再被修改
+        @param caller 调用者
+        """
+        if not self._enabled:
+            return
+        option = self._options.get(channel, True)
+        if option is False:
+            return
+        if isinstance(option, dict):
+            key = (channel, symbol)
+            every = option.get("every")
+            if every:
+                count = self._counters.get(key, 0)
+                self._counters[key] = count + 1
+                if count % every:
+                    self.sampled += 1
+                    return
+            interval = option.get("interval")
+            if interval:
+                now = time.monotonic()
+                if now - self._last_ts.get(key, 0) < interval:
+                    self.sampled += 1
+                    return
+                self._last_ts[key] = now
+        _get_writer().put((channel, symbol, data, caller))
+
+    @property
+    def dropped(self):
+        """ 队列已满丢弃的日志条数(进程内共享)
+        """
+        return _writer.dropped if _writer else 0
@@ -0,0 +1,205 @@
+# -*— coding:utf-8 -*-
+
+"""
+行情延迟统计
+记录每条消息的交易所时间、接收时间、解析完成时间及推送时间，按 平台/频道/交易对 统计:
+    network     交易所时间 -> 接收时间 (包含交易所与本机的时钟偏差)
+    internal    接收时间 -> 推送时间 (包含解析、订单薄维护、合并推送等待)
+    total       交易所时间 -> 推送时间
+按平台统计 parse (接收时间 -> 解析完成)。
+延迟使用对数分桶直方图流式统计(约3%精度)，记录开销为O(1)，可查询 p50 / p99 / p999 及消息数、消息速率。
+
+Date:   2026/10/18
+"""
+
+import math
+import time
+
+from quant.utils import logger
+from quant.tasks import LoopRunTask
+
+
+class Histogram:
+    """ 对数分桶延迟直方图，单位微秒
+    """
+
+    SUB_BUCKETS = 16  # 每个2的幂区间内的分桶数
+
+    __slots__ = ("_buckets", "count", "total", "max", "negative")
+
+    def __init__(self):
+        self._buckets = {}  # {bucket_index: count}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.negative = 0  # 小于0的记录数(时钟偏差)，按0统计
+
+    def record(self, value):
+        """ 记录一个延迟值
+        @param value 延迟(微秒)
+        """
+        if value < 1:
+            if value < 0:
+                self.negative += 1
+            value = 0
+            index = 0
+        else:
+            mantissa, exponent = math.frexp(value)
+            index = exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """ 分位数(微秒)，返回所在分桶的上界
+        @param p 分位 0~100
+        """
+        if not self.count:
+            return 0
+        target = self.count * p / 100
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= target:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def _upper(self, index):
+        if index == 0:
+            return 0
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        return math.ldexp(0.5 + (sub + 1) / (2 * self.SUB_BUCKETS), exponent)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 1) if self.count else 0,
+            "p50": round(self.percentile(50), 1),
+            "p99": round(self.percentile(99), 1),
+            "p999": round(self.percentile(99.9), 1),
+            "max": round(self.max, 1),
+            "negative": self.negative
+        }
+
+
+class MetricsRegistry:
+    """ 进程内所有平台的延迟统计 {(platform, channel, symbol): {stage: Histogram}}
+    """
+
+    STAGES = ("network", "internal", "total")
+
+    def __init__(self):
+        self._series = {}
+        self._parse = {}  # {platform: Histogram}
+        self._gauges = {}  # {platform: {name: func}}
+        self._histograms = {}  # 其它耗时统计 {(platform, name): Histogram}
+        self._start_ts = time.time()
+
+    def series(self, platform, channel, symbol):
+        key = (platform, channel, symbol)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = {stage: Histogram() for stage in self.STAGES}
+        return series
+
+    def parse_histogram(self, platform):
+        histogram = self._parse.get(platform)
+        if histogram is None:
+            histogram = self._parse[platform] = Histogram()
+        return histogram
+
+    def histogram(self, platform, name):
+        """ 获取平台的耗时统计，汇总时以 name 为key输出
+        @param platform 交易平台
+        @param name 统计名称
+        """
+        key = (platform, name)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        return histogram
+
+    def register_gauge(self, platform, name, func):
+        """ 注册状态指标，统计汇总时调用 func() 获取当前值
+        @param platform 交易平台
+        @param name 指标名称
+        @param func 返回当前值的函数
+        """
+        self._gauges.setdefault(platform, {})[name] = func
+
+    def summary(self, platform=None):
+        """ 统计汇总，延迟单位微秒，rate 为自启动以来的平均推送速率(条/秒)，交易所时间未知的推送不计入 network/total
+        @param platform 交易平台，None为全部
+        """
+        elapsed = max(time.time() - self._start_ts, 1e-6)
+        result = {}
+        for (p, channel, symbol), series in self._series.items():
+            if platform and p != platform:
+                continue
+            item = {stage: series[stage].summary() for stage in self.STAGES}
+            item["rate"] = round(series["internal"].count / elapsed, 2)
+            result.setdefault(p, {}).setdefault(channel, {})[symbol] = item
+        for p, histogram in self._parse.items():
+            if platform and p != platform:
+                continue
+            result.setdefault(p, {})["parse"] = histogram.summary()
+        for (p, name), histogram in self._histograms.items():
+            if platform and p != platform:
+                continue
+            result.setdefault(p, {})[name] = histogram.summary()
+        for p, gauges in self._gauges.items():
+            if platform and p != platform:
+                continue
+            result.setdefault(p, {})["gauges"] = {name: func() for name, func in gauges.items()}
+        return result
+
+
+registry = MetricsRegistry()  # 进程内共享的延迟统计
+
+
+class MarketMetrics:
+    """ 单个行情对象的延迟记录
+    """
+
+    def __init__(self, platform, summary_interval=0):
+        """ 初始化
+        @param platform 交易平台
+        @param summary_interval 统计汇总日志输出周期(秒)，0为不输出
+        """
+        self._platform = platform
+        self._parse = registry.parse_histogram(platform)
+        self.recv_ts = 0  # 当前消息接收时间(秒)
+        if summary_interval:
+            LoopRunTask.register(self.report, summary_interval)
+
+    def received(self):
+        """ 收到一条消息
+        """
+        self.recv_ts = time.time()
+
+    def parsed(self):
+        """ 当前消息解析完成
+        """
+        self._parse.record((time.time() - self.recv_ts) * 1e6)
+
+    def published(self, channel, symbol, exchange_ts, recv_ts=None):
+        """ 推送一条行情
+        @param channel 频道
+        @param symbol 交易对
+        @param exchange_ts 交易所时间戳(毫秒)，未知时为None
+        @param recv_ts 行情数据对应的接收时间(秒)，默认当前消息的接收时间
+        """
+        now = time.time()
+        recv_ts = recv_ts or self.recv_ts
+        series = registry.series(self._platform, channel, symbol)
+        series["internal"].record((now - recv_ts) * 1e6)
+        if exchange_ts:
+            series["network"].record((recv_ts * 1000 - exchange_ts) * 1000)
+            series["total"].record((now * 1000 - exchange_ts) * 1000)
+
+    async def report(self, *args, **kwargs):
+        """ 输出统计汇总
+        """
+        logger.info("latency summary(us):", registry.summary(self._platform), caller=self)
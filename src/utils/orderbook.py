@@ -0,0 +1,215 @@
+# -*— coding:utf-8 -*-
+
+"""
+有序订单薄
+买卖两边的价格在插入/删除时即保持有序，读取前N档的开销为O(N)，无需每次推送都对全部价格重新排序。
+可选缓存交易所推送的原始价格/数量字符串，推送时直接使用，并用于计算校验和(如OKEx v3 depth的CRC32)，避免浮点数与字符串之间的来回转换。
+
+Date:   2026/10/18
+"""
+
+import sys
+import zlib
+from bisect import bisect_left, bisect_right
+
+
+class OrderbookSide:
+    """ 订单薄单边(买或卖)
+    价格始终按升序保存在列表中，数量保存在字典中；卖盘从低到高读取，买盘从高到低读取。
+    """
+
+    def __init__(self, reverse=False):
+        """ 初始化
+        @param reverse 是否按价格从高到低读取，买盘为True，卖盘为False
+        """
+        self._reverse = reverse
+        self._prices = []  # 升序价格列表 [price, ...]
+        self._levels = {}  # 价格对应数量 {price: quantity}
+        self._raws = {}  # 原始数据 {price: [price_str, quantity_str]}
+
+    def __len__(self):
+        return len(self._prices)
+
+    def __bool__(self):
+        return bool(self._prices)
+
+    def __contains__(self, price):
+        return price in self._levels
+
+    def get(self, price, default=None):
+        return self._levels.get(price, default)
+
+    def clear(self):
+        self._prices = []
+        self._levels = {}
+        self._raws = {}
+
+    def update(self, price, quantity, raw=None):
+        """ 更新一档价格，数量为0时删除该档
+        @param price 价格
+        @param quantity 数量
+        @param raw 原始数据 [price_str, quantity_str]，用于推送及计算校验和，不需要时可不传
+        """
+        if quantity == 0:
+            self.remove(price)
+            return
+        if price not in self._levels:
+            self._prices.insert(bisect_left(self._prices, price), price)
+        self._levels[price] = quantity
+        if raw is not None:
+            self._raws[price] = raw
+
+    def remove(self, price):
+        """ 删除一档价格
+        @param price 价格
+        """
+        if self._levels.pop(price, None) is None:
+            return
+        self._raws.pop(price, None)
+        index = bisect_left(self._prices, price)
+        del self._prices[index]
+
+    def trim(self, length=None, limit=None, keep=0):
+        """ 删除远离盘口的档位
+        @param length 最多保留的档数，None为不限制
+        @param limit 价格界限，卖盘删除高于limit的档位，买盘删除低于limit的档位，None为不限制
+        @param keep 按读取顺序至少保留的档数，价格界限不删除前keep档
+        @return 删除的档数
+        """
+        prices = self._prices
+        count = len(prices)
+        cut = count if length is None else min(length, count)  # 按读取顺序保留前cut档
+        if limit is not None:
+            inside = count - bisect_left(prices, limit) if self._reverse else bisect_right(prices, limit)
+            cut = min(cut, max(inside, keep))
+        if cut >= count:
+            return 0
+        if self._reverse:
+            removed = prices[:count - cut]
+            del prices[:count - cut]
+        else:
+            removed = prices[cut:]
+            del prices[cut:]
+        levels, raws = self._levels, self._raws
+        for price in removed:
+            del levels[price]
+            raws.pop(price, None)
+        return len(removed)
+
+    def best(self):
+        """ 最优价格，无数据时返回None
+        """
+        if not self._prices:
+            return None
+        return self._prices[-1] if self._reverse else self._prices[0]
+
+    def within(self, price, length):
+        """ 价格是否在前length档范围内(不差于第length档的价格，档数不足length时都在范围内)，该价格的变化会改变前length档
+        @param price 价格
+        @param length 档数
+        """
+        prices = self._prices
+        if len(prices) < length:
+            return True
+        if self._reverse:
+            return price >= prices[-length]
+        return price <= prices[length - 1]
+
+    def prices(self, length=None):
+        """ 按读取顺序返回前length档价格
+        @param length 档数，None为全部
+        """
+        if self._reverse:
+            if length is None:
+                return self._prices[::-1]
+            return self._prices[:-length - 1:-1] if length else []
+        return self._prices[:length]
+
+    def top(self, length=None):
+        """ 按读取顺序返回前length档 [(price, quantity), ...]
+        @param length 档数，None为全部
+        """
+        levels = self._levels
+        return [(price, levels[price]) for price in self.prices(length)]
+
+    def raws(self, length=None):
+        """ 按读取顺序返回前length档的原始数据 [[price_str, quantity_str], ...]
+        @param length 档数，None为全部
+        """
+        raws = self._raws
+        return [raws[price] for price in self.prices(length)]
+
+    def memory_usage(self):
+        """ 本边占用内存(字节)，包括价格、数量及原始字符串对象
+        """
+        size = sys.getsizeof(self._prices) + sys.getsizeof(self._levels) + sys.getsizeof(self._raws)
+        for price, quantity in self._levels.items():
+            size += sys.getsizeof(price) + sys.getsizeof(quantity)
+        for raw in self._raws.values():
+            size += sys.getsizeof(raw) + sum(sys.getsizeof(s) for s in raw)
+        return size
+
+
+class Orderbook:
+    """ 单个交易对的订单薄
+    """
+
+    supports_checksum = True
+
+    def __init__(self):
+        self.asks = OrderbookSide()
+        self.bids = OrderbookSide(reverse=True)
+        self.timestamp = 0
+        self.recv_ts = 0  # 最近一次更新对应消息的本地接收时间(秒)
+
+    def clear(self):
+        self.asks.clear()
+        self.bids.clear()
+        self.timestamp = 0
+
+    def crossed(self):
+        """ 买一价是否大于等于卖一价
+        """
+        ask1 = self.asks.best()
+        bid1 = self.bids.best()
+        if ask1 is None or bid1 is None:
+            return False
+        return ask1 <= bid1
+
+    def trim(self, max_levels=None, band=None, keep=0):
+        """ 删除远离盘口的档位；交易所不推送深度范围之外档位的删除，不清理时这些档位会一直保留在本地订单薄中
+        @param max_levels 每边最多保留的档数，None为不限制
+        @param band 相对中间价的价格范围，如 0.05 删除偏离中间价5%以上的档位，None为不限制
+        @param keep 每边至少保留的档数(如校验和使用的档数)
+        @return 删除的档数
+        """
+        ask_limit = bid_limit = None
+        if band:
+            ask1, bid1 = self.asks.best(), self.bids.best()
+            if ask1 is not None and bid1 is not None:
+                mid = (ask1 + bid1) / 2
+                ask_limit, bid_limit = mid * (1 + band), mid * (1 - band)
+        return self.asks.trim(max_levels, ask_limit, keep) + self.bids.trim(max_levels, bid_limit, keep)
+
+    def checksum(self, length=25):
+        """ 计算OKEx v3 depth校验和
+        取买卖各前length档，按 "bid1:ask1:bid2:ask2..." 交替拼接原始字符串后计算CRC32，并转换为有符号32位整数。
+        @param length 档数
+        """
+        bids = self.bids.raws(length)
+        asks = self.asks.raws(length)
+        items = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                items.extend(bids[i])
+            if i < len(asks):
+                items.extend(asks[i])
+        crc = zlib.crc32(":".join(items).encode())
+        if crc > 0x7fffffff:
+            crc -= 0x100000000
+        return crc
+
+    def memory_usage(self):
+        """ 订单薄占用内存(字节)
+        """
+        return sys.getsizeof(self) + self.asks.memory_usage() + self.bids.memory_usage()
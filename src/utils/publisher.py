@@ -0,0 +1,159 @@
+# -*— coding:utf-8 -*-
+
+"""
+行情事件发布
+发布的同时更新进程内最新行情缓存(utils.cache)，配置 store 时同时写入列式行情存储(utils.store)；
+配置 orderbook_delta 时订单薄以增量订单薄事件(utils.delta)发布，缓存及存储中仍为完整订单薄；
+配置 sink 时事件写入本地事件接收端(utils.sink)，不再发布到消息队列。
+默认每个事件单独发布；开启批量发布后，同一 exchange/routing_key 的事件在一个时间窗口内或达到数量上限时合并为一条消息发布，
+合并后的消息名称、exchange、routing_key 与原事件相同，已订阅的消费者无需修改订阅即可收到，data 为原事件 data 组成的列表
+(窗口内只有一个事件时按原事件发布，data 不变)。
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from quant.event import Event, EventOrderbook
+from quant.utils import logger
+from quant.tasks import LoopRunTask
+
+from utils.cache import last_values, start_cache_server
+from utils.store import create_store
+from utils.delta import create_delta_encoder
+from utils.sink import create_sink
+
+
+class Publisher:
+    """ 直接发布，每个事件一条消息
+    """
+
+    def __init__(self, store=None, delta=None, sink=None):
+        """ 初始化
+        @param store 列式行情存储 TickStore，None为不存储
+        @param delta 增量订单薄编码 DeltaEncoder，None为发布完整订单薄
+        @param sink 本地事件接收端 EventSink，None为发布到消息队列
+        """
+        self._store = store
+        self._delta = delta
+        self._sink = sink
+
+    def publish(self, event):
+        event = self._prepare(event)
+        self._send(event)
+
+    def _send(self, event):
+        """ 发布到消息队列或本地事件接收端
+        """
+        if self._sink:
+            self._sink.send(event)
+        else:
+            event.publish()
+
+    def _prepare(self, event):
+        """ 更新缓存、写入存储，返回实际发布的事件
+        """
+        last_values.update(event)
+        if self._store:
+            self._store.append(event)
+        if self._delta and isinstance(event, EventOrderbook):
+            event = self._delta.encode(event.data)
+        return event
+
+    def flush(self):
+        pass
+
+
+class BatchPublisher(Publisher):
+    """ 批量发布
+    """
+
+    def __init__(self, max_delay=10, max_size=100, report_interval=60, store=None, delta=None, sink=None):
+        """ 初始化
+        @param max_delay 单批最长等待时间(毫秒)
+        @param max_size 单批最大事件数
+        @param report_interval 批量统计日志输出周期(秒)，0为不输出
+        @param store 列式行情存储 TickStore，None为不存储
+        @param delta 增量订单薄编码 DeltaEncoder，None为发布完整订单薄
+        @param sink 本地事件接收端 EventSink，None为发布到消息队列
+        """
+        super(BatchPublisher, self).__init__(store, delta, sink)
+        self._max_delay = max_delay / 1000
+        self._max_size = max_size
+        self._batches = {}  # 等待发布的事件 {(exchange, routing_key): [event, ...]}
+        self._timers = {}  # {(exchange, routing_key): TimerHandle}
+        self.batch_count = 0  # 已发布批次数
+        self.event_count = 0  # 已发布事件数
+        self.full_count = 0  # 因达到数量上限而发布的批次数
+        self.max_fill = 0  # 单批最大事件数
+        if report_interval:
+            LoopRunTask.register(self.report, report_interval)
+
+    def publish(self, event):
+        """ 加入待发布队列
+        @param event 事件
+        """
+        event = self._prepare(event)
+        key = (event.exchange, event.routing_key)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            self._timers[key] = asyncio.get_event_loop().call_later(self._max_delay, self._flush, key)
+        batch.append(event)
+        if len(batch) >= self._max_size:
+            self.full_count += 1
+            self._flush(key)
+
+    def flush(self):
+        """ 立即发布所有等待中的事件
+        """
+        for key in list(self._batches.keys()):
+            self._flush(key)
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self._batches.pop(key, None)
+        if not batch:
+            return
+        self.batch_count += 1
+        self.event_count += len(batch)
+        self.max_fill = max(self.max_fill, len(batch))
+        if len(batch) == 1:
+            self._send(batch[0])
+            return
+        first = batch[0]
+        event = Event(name=first.name, exchange=first.exchange, routing_key=first.routing_key,
+                      data=[e.data for e in batch])
+        self._send(event)
+
+    @property
+    def average_fill(self):
+        """ 平均每批事件数
+        """
+        return self.event_count / self.batch_count if self.batch_count else 0
+
+    async def report(self, *args, **kwargs):
+        """ 输出批量统计
+        """
+        logger.info("batches:", self.batch_count, "events:", self.event_count,
+                    "average fill:", "%.2f/%d" % (self.average_fill, self._max_size),
+                    "max fill:", self.max_fill, "full batches:", self.full_count, caller=self)
+
+
+def create_publisher(platform_config):
+    """ 根据平台配置创建事件发布器
+    @param platform_config 平台行情配置 {"batch": {"max_delay": 10, "max_size": 100}}，未配置 batch 时直接发布；
+                           配置 cache_server 时同时启动最新行情查询服务，配置 store 时同时写入列式行情存储，
+                           配置 orderbook_delta 时以增量订单薄事件发布订单薄，配置 sink 时写入本地事件接收端
+    """
+    start_cache_server(platform_config.get("cache_server"))
+    store = create_store(platform_config)
+    delta = create_delta_encoder(platform_config)
+    sink = create_sink(platform_config)
+    options = platform_config.get("batch")
+    if not options:
+        return Publisher(store, delta, sink)
+    return BatchPublisher(options.get("max_delay", 10), options.get("max_size", 100),
+                          options.get("report_interval", 60), store, delta, sink)
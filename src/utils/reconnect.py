@@ -0,0 +1,221 @@
+# -*— coding:utf-8 -*-
+
+"""
+统一重连调度及连接状态
+ReconnectScheduler: 进程内所有websocket连接断开后不立即重连，而是按指数退避加随机抖动计算等待时间，由调度协程按优先级依次重连，
+相邻两次重连至少间隔 CONNECT_INTERVAL 秒，避免网络抖动后所有连接同时重连、同时重新订阅触发交易所限频。
+ConnectionHealth: 连接断开时将该连接上的订单薄标记为过期(不丢弃)并推送 stale 状态事件，重连后收到该交易对的第一个订单薄时推送
+recovered 状态事件，同时统计每次 重连->收到第一个订单薄 的耗时。
+
+平台配置:
+    "reconnect": {"base_delay": 1, "max_delay": 60, "priority": 0}    退避基数(秒)、最长等待(秒)、连接优先级(越大越先重连)
+    "priority_symbols": ["BTC/USDT"]                                   优先订阅、所在连接优先重连的交易对
+
+Date:   2026/10/18
+"""
+
+import time
+import random
+import asyncio
+
+from quant.utils import logger
+
+from utils.event import EventMarketStatus
+from utils.metrics import registry
+
+STATUS_STALE = "stale"
+STATUS_RECOVERED = "recovered"
+
+
+def sort_by_priority(symbols, priority_symbols=None):
+    """ 交易对排序，优先交易对在前
+    @param symbols 交易对列表
+    @param priority_symbols 优先交易对列表
+    """
+    if not priority_symbols:
+        return list(symbols)
+    priority = {s: i for i, s in enumerate(priority_symbols)}
+    return sorted(symbols, key=lambda s: priority.get(s, len(priority)))
+
+
+class ReconnectScheduler:
+    """ 重连调度
+    """
+
+    CONNECT_INTERVAL = 0.2  # 相邻两次重连的最小间隔(秒)
+
+    def __init__(self):
+        self._pending = []  # 等待重连的连接 [[priority, ready_ts, conn], ...]
+        self._options = {}  # {conn: (priority, base_delay, max_delay, on_connect)}
+        self._attempts = {}  # 连续重连次数 {conn: count}
+        self._connecting = None  # 正在重连的连接
+        self._task = None
+
+    def reconnect(self, conn, priority=0, base_delay=1, max_delay=60, on_connect=None):
+        """ 安排连接重连，已在等待中的连接忽略
+        @param conn 框架 Websocket 对象，调度时调用 conn._connect()
+        @param priority 优先级，越大越先重连
+        @param base_delay 退避基数(秒)，第n次重连等待 base_delay * 2^n 秒(不超过max_delay)，并在 [1/2, 1] 倍之间随机抖动
+        @param max_delay 最长等待时间(秒)
+        @param on_connect 开始重连时的回调函数
+        """
+        if conn is self._connecting or any(entry[2] is conn for entry in self._pending):
+            return
+        self._options[conn] = (priority, base_delay, max_delay, on_connect)
+        attempts = self._attempts.get(conn, 0)
+        self._attempts[conn] = attempts + 1
+        delay = min(max_delay, base_delay * 2 ** attempts)
+        delay = random.uniform(delay / 2, delay)
+        loop = asyncio.get_event_loop()
+        self._pending.append([priority, loop.time() + delay, conn])
+        logger.warn("reconnect scheduled. conn:", conn.__class__.__name__, "attempts:", attempts + 1,
+                    "delay: %.2fs" % delay, caller=self)
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+
+    def reset(self, conn):
+        """ 连接恢复正常(重连后收到第一条消息)后重置退避次数
+        @param conn 连接
+        """
+        self._attempts.pop(conn, None)
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while self._pending:
+            now = loop.time()
+            ready = [entry for entry in self._pending if entry[1] <= now]
+            if not ready:
+                await asyncio.sleep(min(entry[1] for entry in self._pending) - now)
+                continue
+            entry = max(ready, key=lambda e: (e[0], -e[1]))  # 优先级高的先重连，同优先级先到期的先重连
+            self._pending.remove(entry)
+            conn = entry[2]
+            priority, base_delay, max_delay, on_connect = self._options[conn]
+            if on_connect:
+                on_connect()
+            self._connecting = conn
+            try:
+                await conn._connect()
+            except Exception as e:
+                logger.error("reconnect error! conn:", conn.__class__.__name__, "error:", e, caller=self)
+            self._connecting = None
+            if not conn.ws or conn.ws.closed:  # 连接失败，继续退避
+                self.reconnect(conn, priority, base_delay, max_delay, on_connect)
+            await asyncio.sleep(self.CONNECT_INTERVAL)
+        self._task = None
+
+    @property
+    def pending(self):
+        """ 等待重连的连接数
+        """
+        return len(self._pending)
+
+
+scheduler = ReconnectScheduler()  # 进程内共享的重连调度
+
+
+class ConnectionHealth:
+    """ 单个连接的订单薄状态
+    """
+
+    def __init__(self, platform, name, conn, publisher, options=None):
+        """ 初始化
+        @param platform 交易平台
+        @param name 连接名称
+        @param conn 框架 Websocket 对象
+        @param publisher 事件发布器
+        @param options 重连配置 {"base_delay": 1, "max_delay": 60, "priority": 0}
+        """
+        self._platform = platform
+        self._name = name
+        self._conn = conn
+        self._publisher = publisher
+        self._options = options or {}
+        self._connect_ts = None  # 本次重连开始时间，收到第一个订单薄后清空
+        self.waiting = False  # 重连后是否还未收到消息
+        self._histogram = registry.histogram(platform, "reconnect_first_book")  # 重连->第一个订单薄耗时(微秒)
+        self.stale = {}  # 过期的交易对 {symbol: stale_ts}
+        self.active = False  # 是否有过期交易对或等待第一个订单薄，为False时 book_received 可以不调用
+        self.reconnects = 0  # 重连次数
+        self.last_first_book_ms = None  # 最近一次 重连->第一个订单薄 耗时(毫秒)
+        registry.register_gauge(platform, "connection:" + name, self.stats)
+
+    def disconnected(self, symbols, priority=0):
+        """ 连接断开，标记交易对订单薄过期并安排重连
+        @param symbols 该连接上的订单薄交易对
+        @param priority 额外的连接优先级(如连接上有优先交易对)
+        """
+        now = time.time()
+        for symbol in symbols:
+            if symbol in self.stale:
+                continue
+            self.stale[symbol] = now
+            self._publish(symbol, STATUS_STALE, now)
+        self.active = True
+        scheduler.reconnect(self._conn, self._options.get("priority", 0) + priority,
+                            self._options.get("base_delay", 1), self._options.get("max_delay", 60), self._connecting)
+
+    def _connecting(self):
+        self._connect_ts = time.time()
+        self.waiting = True
+        self.reconnects += 1
+
+    def received(self):
+        """ 重连后收到第一条消息，连接已恢复正常
+        """
+        self.waiting = False
+        scheduler.reset(self._conn)
+
+    def book_received(self, symbol):
+        """ 收到交易对的订单薄(重建完成)
+        @param symbol 交易对
+        """
+        now = time.time()
+        if self._connect_ts:
+            self.last_first_book_ms = round((now - self._connect_ts) * 1000, 1)
+            self._histogram.record((now - self._connect_ts) * 1e6)
+            self._connect_ts = None
+            logger.info("first orderbook after reconnect. connection:", self._name, "symbol:", symbol,
+                        "elapsed(ms):", self.last_first_book_ms, caller=self)
+        stale_ts = self.stale.pop(symbol, None)
+        if stale_ts:
+            self._publish(symbol, STATUS_RECOVERED, now, int((now - stale_ts) * 1000))
+        self.active = bool(self.stale) or self._connect_ts is not None
+
+    def discard(self, symbol):
+        """ 不再订阅的交易对
+        @param symbol 交易对
+        """
+        self.stale.pop(symbol, None)
+        self.active = bool(self.stale) or self._connect_ts is not None
+
+    def _publish(self, symbol, status, ts, stale_ms=None):
+        data = {
+            "platform": self._platform,
+            "symbol": symbol,
+            "status": status,
+            "timestamp": int(ts * 1000)
+        }
+        if stale_ms is not None:
+            data["stale_ms"] = stale_ms
+        self._publisher.publish(EventMarketStatus(**data))
+
+    def stats(self):
+        """ 连接状态
+        """
+        return {
+            "reconnects": self.reconnects,
+            "stale": len(self.stale),
+            "last_first_book_ms": self.last_first_book_ms
+        }
+
+
+def create_connection_health(platform, platform_config, name, conn, publisher):
+    """ 创建连接状态
+    @param platform 交易平台
+    @param platform_config 平台行情配置 {"reconnect": {"base_delay": 1, "max_delay": 60, "priority": 0}}
+    @param name 连接名称
+    @param conn 框架 Websocket 对象
+    @param publisher 事件发布器
+    """
+    return ConnectionHealth(platform, name, conn, publisher, platform_config.get("reconnect"))
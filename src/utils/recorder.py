@@ -0,0 +1,183 @@
+# -*— coding:utf-8 -*-
+
+"""
+原始websocket数据帧录制及读取
+每一帧记录为 [接收时间戳(秒, double) | 类型(1字节, 0文本JSON / 1二进制) | 长度(4字节) | 原始数据]，
+按大小或时间滚动写入gzip压缩文件，文件名 {platform}-{YYYYmmddHHMMSS}.frames.gz。
+读取协程只把收到的原始文本/二进制数据放入有界队列，由后台线程压缩及写入文件，不阻塞事件循环；队列满时直接丢弃并计数。
+
+Date:   2026/10/18
+"""
+
+import os
+import gzip
+import time
+import queue
+import struct
+import atexit
+import threading
+
+import aiohttp
+
+from quant.utils import logger
+
+from utils.decode import loads
+
+FRAME_TEXT = 0  # 文本帧(JSON)
+FRAME_BINARY = 1  # 二进制帧
+
+_HEADER = struct.Struct("<dBI")
+
+
+class Recorder:
+    """ 原始数据帧录制
+    """
+
+    def __init__(self, platform, path, max_bytes=100 * 1024 * 1024, rotate_interval=3600, compresslevel=1,
+                 maxsize=100000):
+        """ 初始化
+        @param platform 交易平台
+        @param path 录制文件保存目录
+        @param max_bytes 单个文件最大写入字节数(压缩前)，超过后滚动到新文件
+        @param rotate_interval 单个文件最长写入时间(秒)，超过后滚动到新文件
+        @param compresslevel gzip压缩等级
+        @param maxsize 等待写入的最大帧数
+        """
+        self._platform = platform
+        self._path = path
+        self._max_bytes = max_bytes
+        self._rotate_interval = rotate_interval
+        self._compresslevel = compresslevel
+        self._file = None
+        self._filename = None
+        self._bytes = 0
+        self._opened_at = 0
+        self._queue = queue.Queue(maxsize)
+        self.frames = 0  # 已写入帧数
+        self.dropped = 0  # 队列已满丢弃的帧数
+        os.makedirs(self._path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="recorder-" + platform, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def filename(self):
+        return self._filename
+
+    def write(self, payload, ts=None):
+        """ 录制一帧，由读取协程在解析前调用
+        @param payload 收到的原始数据，bytes为二进制帧，str为文本帧
+        @param ts 接收时间戳(秒)，默认当前时间
+        """
+        try:
+            self._queue.put_nowait((ts or time.time(), payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """ 写入队列中剩余的帧并关闭文件
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.error("write frame error! platform:", self._platform, "error:", e, caller=self)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, ts, payload):
+        if isinstance(payload, str):
+            kind = FRAME_TEXT
+            payload = payload.encode()
+        else:
+            kind = FRAME_BINARY
+            payload = bytes(payload)
+        if not self._file or self._bytes >= self._max_bytes or ts - self._opened_at >= self._rotate_interval:
+            self._rotate(ts)
+        self._file.write(_HEADER.pack(ts, kind, len(payload)))
+        self._file.write(payload)
+        self._bytes += _HEADER.size + len(payload)
+        self.frames += 1
+
+    def _rotate(self, ts):
+        if self._file:
+            self._file.close()
+        name = "{p}-{t}.frames.gz".format(p=self._platform, t=time.strftime("%Y%m%d%H%M%S", time.localtime(ts)))
+        self._filename = os.path.join(self._path, name)
+        self._file = gzip.open(self._filename, "ab", compresslevel=self._compresslevel)
+        self._bytes = 0
+        self._opened_at = ts
+
+
+async def receive_frames(conn, recorder=None, metrics=None):
+    """ 接收websocket数据帧(代替框架 Websocket.receive，处理方式与其一致)，在解析前录制原始数据及记录接收时间
+    @param conn 框架 Websocket 对象
+    @param recorder 录制器，None为不录制
+    @param metrics 延迟记录 MarketMetrics，文本帧在JSON解析前记录接收时间、解析后记录解析耗时，None为不记录
+    """
+    async for msg in conn.ws:
+        if msg.type == aiohttp.WSMsgType.TEXT:
+            if metrics:
+                metrics.received()
+            if recorder:
+                recorder.write(msg.data)
+            try:
+                data = loads(msg.data)
+            except ValueError:
+                data = msg.data
+            if metrics:
+                metrics.parsed()
+            await conn.process(data)
+        elif msg.type == aiohttp.WSMsgType.BINARY:
+            if recorder:
+                recorder.write(msg.data)
+            await conn.process_binary(msg.data)
+        elif msg.type == aiohttp.WSMsgType.CLOSED:
+            logger.warn("receive event CLOSED:", msg, caller=conn)
+            await conn._reconnect()
+            return
+        elif msg.type == aiohttp.WSMsgType.ERROR:
+            logger.error("receive event ERROR:", msg, caller=conn)
+        else:
+            logger.warn("unhandled msg:", msg, caller=conn)
+
+
+def read_frames(filename):
+    """ 读取录制文件，文件末尾不完整(如进程异常退出)时忽略最后的残缺帧
+    @param filename 录制文件路径
+    @return 生成器 (ts, kind, payload)
+    """
+    with gzip.open(filename, "rb") as f:
+        while True:
+            try:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                ts, kind, length = _HEADER.unpack(header)
+                payload = f.read(length)
+            except EOFError:
+                return
+            if len(payload) < length:
+                return
+            yield ts, kind, payload
+
+
+def create_recorder(platform, platform_config):
+    """ 根据平台配置创建录制器，未配置 record 时返回None
+    @param platform 交易平台
+    @param platform_config 平台行情配置 {"record": {"path": "...", "max_bytes": ..., "rotate_interval": ..., "maxsize": ...}}
+    """
+    options = platform_config.get("record")
+    if not options:
+        return None
+    return Recorder(platform, options["path"], options.get("max_bytes", 100 * 1024 * 1024),
+                    options.get("rotate_interval", 3600), maxsize=options.get("maxsize", 100000))
@@ -0,0 +1,88 @@
+# -*— coding:utf-8 -*-
+
+"""
+配置热加载
+配置文件修改(按修改时间定时检查)或进程收到 SIGHUP 信号时重新读取配置文件，将各平台 symbols / channels 的变化交给对应行情对象的
+reload 方法，在现有连接上订阅/取消订阅，不重新连接。其它配置项的修改需要重启服务后生效。
+
+配置:
+    "RELOAD": {"interval": 5}    定时检查配置文件的周期(秒)，不配置时只响应 SIGHUP 信号
+
+Date:   2026/10/18
+"""
+
+import os
+import json
+import signal
+import asyncio
+
+from quant.utils import logger
+from quant.tasks import LoopRunTask, SingleTask
+
+
+class ConfigReloader:
+    """ 配置热加载
+    """
+
+    def __init__(self, config_file, markets):
+        """ 初始化
+        @param config_file 配置文件
+        @param markets 行情对象 {platform: market}
+        """
+        self._config_file = config_file
+        self._markets = markets
+        self._mtime = os.path.getmtime(config_file)
+        config_data = self._load()
+        self._platforms = config_data.get("PLATFORMS", {})  # 当前生效的平台配置
+        self.reloads = 0  # 已应用的热加载次数
+        options = config_data.get("RELOAD") or {}
+        if options.get("interval"):
+            LoopRunTask.register(self.check, options["interval"])
+        try:
+            asyncio.get_event_loop().add_signal_handler(signal.SIGHUP, SingleTask.run, self.reload)
+        except (NotImplementedError, AttributeError, RuntimeError):  # 不支持信号的平台只能定时检查
+            pass
+
+    def _load(self):
+        with open(self._config_file) as f:
+            return json.load(f)
+
+    async def check(self, *args, **kwargs):
+        """ 配置文件修改后重新加载
+        """
+        try:
+            mtime = os.path.getmtime(self._config_file)
+        except OSError as e:
+            logger.error("check config file error! file:", self._config_file, "error:", e, caller=self)
+            return
+        if mtime != self._mtime:
+            self._mtime = mtime
+            await self.reload()
+
+    async def reload(self, *args, **kwargs):
+        """ 重新读取配置文件，将 symbols / channels 有变化的平台交给行情对象处理
+        """
+        try:
+            platforms = self._load().get("PLATFORMS", {})
+        except Exception as e:
+            logger.error("load config file error! file:", self._config_file, "error:", e, caller=self)
+            return
+        for platform, market in self._markets.items():
+            options = platforms.get(platform)
+            if not options:
+                logger.warn("platform removed from config, restart to take effect. platform:", platform, caller=self)
+                continue
+            current = self._platforms.get(platform, {})
+            if set(options.get("symbols", [])) == set(current.get("symbols", [])) and \
+                    options.get("channels") == current.get("channels"):
+                continue
+            try:
+                await market.reload(options)
+            except Exception as e:
+                logger.error("reload error! platform:", platform, "error:", e, caller=self)
+                continue
+            self._platforms[platform] = options
+            self.reloads += 1
+        for platform in platforms:
+            if platform not in self._markets:
+                logger.warn("new platform in config, restart to take effect. platform:", platform, caller=self)
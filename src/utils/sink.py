@@ -0,0 +1,96 @@
+# -*— coding:utf-8 -*-
+
+"""
+本地事件接收端
+压测时代替消息队列发布事件: 事件以 JSON 行({"name", "exchange", "routing_key", "data"} + 换行)写入本地TCP连接，
+由 benchmarks/exchange_simulator.py 的接收端统计吞吐量、丢失率及端到端延迟。
+写入不等待对端读取，连接未建立或发送缓冲区超过上限时丢弃事件并计数(不阻塞行情处理)，断开后自动重连。
+
+平台配置:
+    "sink": {"host": "127.0.0.1", "port": 9900, "max_buffer": 16777216}    配置后该平台的事件不再发布到消息队列
+
+Date:   2026/10/18
+"""
+
+import json
+import asyncio
+
+from quant.utils import logger
+
+from utils.metrics import registry
+
+_sinks = {}  # 进程内已创建的接收端 {(host, port): EventSink}
+
+
+class EventSink:
+    """ 本地事件接收端连接
+    """
+
+    RETRY_INTERVAL = 1  # 连接失败后重试间隔(秒)
+
+    def __init__(self, host="127.0.0.1", port=9900, max_buffer=16 * 1024 * 1024):
+        """ 初始化
+        @param host 接收端地址
+        @param port 接收端端口
+        @param max_buffer 发送缓冲区上限(字节)，超过时丢弃事件
+        """
+        self._host = host
+        self._port = port
+        self._max_buffer = max_buffer
+        self._writer = None
+        self._task = None
+        self.sent = 0  # 已写入的事件数
+        self.dropped = 0  # 未连接或缓冲区已满丢弃的事件数
+        registry.register_gauge("sink", "{h}:{p}".format(h=host, p=port), self.stats)
+
+    def send(self, event):
+        """ 写入一个事件
+        @param event 事件
+        """
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            self._writer = None
+            self.dropped += 1
+            if self._task is None:
+                self._task = asyncio.get_event_loop().create_task(self._connect())
+            return
+        if writer.transport.get_write_buffer_size() > self._max_buffer:
+            self.dropped += 1
+            return
+        msg = {"name": event.name, "exchange": event.exchange, "routing_key": event.routing_key, "data": event.data}
+        writer.write(json.dumps(msg, default=str).encode() + b"\n")
+        self.sent += 1
+
+    async def _connect(self):
+        while True:
+            try:
+                _, self._writer = await asyncio.open_connection(self._host, self._port)
+                logger.info("sink connected. host:", self._host, "port:", self._port, caller=self)
+                break
+            except OSError as e:
+                logger.error("connect sink error! host:", self._host, "port:", self._port, "error:", e, caller=self)
+                await asyncio.sleep(self.RETRY_INTERVAL)
+        self._task = None
+
+    def stats(self):
+        """ 接收端统计
+        """
+        return {
+            "connected": self._writer is not None and not self._writer.is_closing(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "buffer": self._writer.transport.get_write_buffer_size() if self._writer else 0
+        }
+
+
+def create_sink(platform_config):
+    """ 根据平台配置创建本地事件接收端，同一进程内相同地址共用一个连接；未配置 sink 时返回None
+    @param platform_config 平台行情配置 {"sink": {"host": "127.0.0.1", "port": 9900}}
+    """
+    options = platform_config.get("sink")
+    if not options:
+        return None
+    address = (options.get("host", "127.0.0.1"), options.get("port", 9900))
+    if address not in _sinks:
+        _sinks[address] = EventSink(address[0], address[1], options.get("max_buffer", 16 * 1024 * 1024))
+    return _sinks[address]
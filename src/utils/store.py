@@ -0,0 +1,274 @@
+# -*— coding:utf-8 -*-
+
+"""
+列式行情存储
+将本服务推送的成交、K线、订单薄(前N档)直接追加写入按 平台/日期/交易对 划分的定长记录文件，记录格式为 NumPy 结构化数组(小端)，
+读取时通过 numpy.memmap 零拷贝映射，供回测直接使用。
+事件循环中只缓存事件数据的引用，数值转换及写盘由后台线程完成；文件路径:
+    {path}/{platform}/{YYYYmmdd}/{symbol}.{channel}.dat    symbol中的斜杠替换为下划线，订单薄channel为 orderbook{depth}，日期为UTC日期
+
+需要安装 numpy。
+
+Date:   2026/10/18
+"""
+
+import os
+import time
+import queue
+import atexit
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from quant.utils import logger
+from quant.tasks import LoopRunTask
+from quant.order import ORDER_ACTION_BUY
+
+from utils.cache import channel_of
+
+TRADE_DTYPE = [("timestamp", "<i8"), ("price", "<f8"), ("quantity", "<f8"), ("side", "i1")]  # side: 1买 / -1卖
+KLINE_DTYPE = [("timestamp", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+               ("volume", "<f8")]
+
+
+def orderbook_dtype(depth):
+    """ 订单薄记录格式，不足depth档的位置填充NaN
+    @param depth 档数
+    """
+    return [("timestamp", "<i8"), ("bid_price", "<f8", depth), ("bid_quantity", "<f8", depth),
+            ("ask_price", "<f8", depth), ("ask_quantity", "<f8", depth)]
+
+
+def dtype_of(channel):
+    """ 频道对应的记录格式
+    @param channel 频道 trade / kline / kline_5m / ... / orderbook{depth}
+    """
+    if channel == "trade":
+        return np.dtype(TRADE_DTYPE)
+    if channel.startswith("kline"):
+        return np.dtype(KLINE_DTYPE)
+    if channel.startswith("orderbook"):
+        return np.dtype(orderbook_dtype(int(channel[len("orderbook"):])))
+    raise ValueError("unknown channel: %s" % channel)
+
+
+def filename_of(path, platform, symbol, channel, day):
+    """ 存储文件路径
+    @param day 日期 YYYYmmdd
+    """
+    return os.path.join(path, platform, day, "{s}.{c}.dat".format(s=symbol.replace("/", "_"), c=channel))
+
+
+def load(path, platform, symbol, channel, day):
+    """ 读取一天的行情数据，以只读 memmap 方式零拷贝映射；文件末尾不完整的记录(如写入时进程异常退出)被忽略
+    @param path 存储目录
+    @param platform 交易平台
+    @param symbol 交易对
+    @param channel 频道 trade / kline / kline_5m / ... / orderbook{depth}
+    @param day 日期 YYYYmmdd
+    @return numpy结构化数组，无数据时返回空数组
+    """
+    dtype = dtype_of(channel)
+    filename = filename_of(path, platform, symbol, channel, day)
+    try:
+        count = os.path.getsize(filename) // dtype.itemsize
+    except FileNotFoundError:
+        count = 0
+    if not count:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode="r", shape=(count,))
+
+
+def _trade_rows(items):
+    return [(int(d["timestamp"]), float(d["price"]), float(d["quantity"]), 1 if d["action"] == ORDER_ACTION_BUY else -1)
+            for d in items]
+
+
+def _kline_rows(items):
+    return [(int(d["timestamp"]), float(d["open"]), float(d["high"]), float(d["low"]), float(d["close"]),
+             float(d["volume"])) for d in items]
+
+
+def _orderbook_array(items, dtype, depth):
+    arr = np.empty(len(items), dtype=dtype)
+    for name in ("bid_price", "bid_quantity", "ask_price", "ask_quantity"):
+        arr[name] = np.nan
+    for i, d in enumerate(items):
+        arr["timestamp"][i] = int(d["timestamp"])
+        for side, levels in (("bid", d["bids"][:depth]), ("ask", d["asks"][:depth])):
+            if levels:
+                levels = np.array(levels, dtype="<f8")
+                arr[side + "_price"][i, :len(levels)] = levels[:, 0]
+                arr[side + "_quantity"][i, :len(levels)] = levels[:, 1]
+    return arr
+
+
+class _StoreWriter(threading.Thread):
+    """ 后台写盘线程
+    """
+
+    def __init__(self, path, depth, maxsize):
+        super(_StoreWriter, self).__init__(name="market-store", daemon=True)
+        self._path = path
+        self._depth = depth
+        self.queue = queue.Queue(maxsize)
+        self._files = {}  # 已打开的文件 {filename: file}
+        self._day = None
+        self.rows = 0  # 已写入记录数
+        self.bytes = 0  # 已写入字节数
+        self.errors = 0  # 写入失败的批次数
+
+    def run(self):
+        while True:
+            batch = self.queue.get()
+            try:
+                if batch is None:
+                    return
+                self._write(batch)
+            except Exception as e:
+                self.errors += 1
+                logger.error("write store error! error:", e, caller=self)
+            finally:
+                self.queue.task_done()
+
+    def _write(self, batch):
+        """ 写入一批数据
+        @param batch {(platform, channel, symbol, day): [data, ...]}
+        """
+        for (platform, channel, symbol, day), items in batch.items():
+            if day != self._day:  # 跨天后关闭前一天的文件
+                self.close_files()
+                self._day = day
+            if channel == "trade":
+                arr = np.array(_trade_rows(items), dtype=TRADE_DTYPE)
+            elif channel.startswith("kline"):
+                arr = np.array(_kline_rows(items), dtype=KLINE_DTYPE)
+            else:
+                channel = "orderbook%d" % self._depth
+                arr = _orderbook_array(items, dtype_of(channel), self._depth)
+            filename = filename_of(self._path, platform, symbol, channel, day)
+            f = self._files.get(filename)
+            if f is None:
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                f = self._files[filename] = open(filename, "ab")
+            f.write(arr.tobytes())
+            f.flush()
+            self.rows += len(arr)
+            self.bytes += arr.nbytes
+
+    def close_files(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+class TickStore:
+    """ 列式行情存储
+    """
+
+    def __init__(self, path, depth=5, flush_interval=1, flush_size=10000, queue_size=100, report_interval=60):
+        """ 初始化
+        @param path 存储目录
+        @param depth 订单薄存储档数
+        @param flush_interval 写盘周期(秒)
+        @param flush_size 缓存记录数达到该值时立即交给后台线程写盘
+        @param queue_size 后台写盘队列长度(批次)，队列满时丢弃该批数据并计数
+        @param report_interval 存储统计日志输出周期(秒)，0为不输出
+        """
+        self._flush_size = flush_size
+        self._buffers = {}  # 等待写盘的数据 {(platform, channel, symbol, day): [data, ...]}
+        self._buffered = 0
+        self._days = {}  # UTC日期缓存 {timestamp // 86400000: "YYYYmmdd"}
+        self._klines = {}  # 未结束的K线，开始时间变化后才写入上一根 {(platform, channel, symbol): data}
+        self._writer = _StoreWriter(path, depth, queue_size)
+        self._writer.start()
+        self.dropped = 0  # 写盘队列已满丢弃的记录数
+        LoopRunTask.register(self.flush, flush_interval)
+        if report_interval:
+            LoopRunTask.register(self.report, report_interval)
+        atexit.register(self.close)
+
+    def append(self, event):
+        """ 追加一条行情事件，非成交、K线、订单薄事件直接忽略
+        @param event 事件
+        """
+        channel = channel_of(event)
+        if channel == "trade" or channel == "orderbook":
+            data = event.data
+        elif channel.startswith("kline"):
+            data = event.data
+            key = (data["platform"], channel, data["symbol"])
+            last = self._klines.get(key)
+            self._klines[key] = data
+            if last is None or last["timestamp"] == data["timestamp"]:
+                return
+            data = last
+        else:
+            return
+        self._add(channel, data)
+
+    def _add(self, channel, data):
+        index = int(data["timestamp"]) // 86400000
+        day = self._days.get(index)
+        if day is None:
+            day = self._days[index] = time.strftime("%Y%m%d", time.gmtime(index * 86400))
+        key = (data["platform"], channel, data["symbol"], day)
+        items = self._buffers.get(key)
+        if items is None:
+            items = self._buffers[key] = []
+        items.append(data)
+        self._buffered += 1
+        if self._buffered >= self._flush_size:
+            self._submit()
+
+    def _submit(self):
+        if not self._buffers:
+            return
+        batch, count = self._buffers, self._buffered
+        self._buffers = {}
+        self._buffered = 0
+        try:
+            self._writer.queue.put_nowait(batch)
+        except queue.Full:
+            self.dropped += count
+
+    async def flush(self, *args, **kwargs):
+        """ 定时将缓存数据交给后台线程写盘
+        """
+        self._submit()
+
+    def close(self):
+        """ 写入所有缓存数据(包括未结束的K线)并等待后台线程退出
+        """
+        for (platform, channel, symbol), data in self._klines.items():
+            self._add(channel, data)
+        self._klines = {}
+        self._submit()
+        if self._writer.is_alive():
+            self._writer.queue.put(None)
+            self._writer.join()
+        self._writer.close_files()
+
+    async def report(self, *args, **kwargs):
+        """ 输出存储统计
+        """
+        logger.info("rows:", self._writer.rows, "bytes:", self._writer.bytes, "pending batches:",
+                    self._writer.queue.qsize(), "dropped:", self.dropped, "errors:", self._writer.errors, caller=self)
+
+
+def create_store(platform_config):
+    """ 根据平台配置创建行情存储，未配置 store 时返回None
+    @param platform_config 平台行情配置 {"store": {"path": "/data/market/ticks", "depth": 5, "flush_interval": 1}}
+    """
+    options = platform_config.get("store")
+    if not options:
+        return None
+    if np is None:
+        logger.error("store requires numpy, please install numpy first! store disabled.")
+        return None
+    return TickStore(options["path"], options.get("depth", 5), options.get("flush_interval", 1),
+                     options.get("flush_size", 10000), options.get("queue_size", 100),
+                     options.get("report_interval", 60))
@@ -0,0 +1,234 @@
+# -*— coding:utf-8 -*-
+
+"""
+单元测试公共配置
+被测模块位于 src 目录下，依赖 thenextquant 框架(quant)。已安装框架时直接使用；未安装时(如只为运行测试的干净环境)，
+在 sys.modules 中注册一个只包含本项目用到的接口的最小实现，行为与框架一致(如 EventKline 只支持 kline / kline_5m / kline_15m)。
+测试不连接网络、不发布到消息队列: 行情对象的 Websocket.initialize 及事件发布均由测试替换。
+
+运行:
+    python -m pytest tests
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import time
+import types
+import asyncio
+import calendar
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    if "." in name:
+        parent, _, child = name.rpartition(".")
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def _install_quant():
+    """ 注册框架的最小实现
+    """
+    _module("quant")
+    _module("quant.utils")
+
+    def _log(*args, **kwargs):
+        pass
+
+    logger = _module("quant.utils.logger", info=_log, debug=_log, warn=_log, error=_log, exception=_log)
+
+    def utctime_str_to_mts(utctime_str, fmt="%Y-%m-%dT%H:%M:%S.%fZ"):
+        t = time.strptime(utctime_str.split(".")[0] + ".000Z", fmt)
+        ms = int(utctime_str.split(".")[1][:3]) if "." in utctime_str else 0
+        return calendar.timegm(t) * 1000 + ms
+
+    _module("quant.utils.tools", get_cur_timestamp=lambda: int(time.time()),
+            get_cur_timestamp_ms=lambda: int(time.time() * 1000), utctime_str_to_mts=utctime_str_to_mts)
+
+    const = _module("quant.const", OKEX="okex", OKEX_FUTURE="okex_future", BINANCE="binance", DERIBIT="deribit",
+                    MARKET_TYPE_KLINE="kline", MARKET_TYPE_KLINE_5M="kline_5m", MARKET_TYPE_KLINE_15M="kline_15m")
+    _module("quant.order", ORDER_ACTION_BUY="BUY", ORDER_ACTION_SELL="SELL")
+
+    class _Config:
+        platforms = {}
+        proxy = None
+
+    _module("quant.config", config=_Config())
+
+    class LoopRunTask:
+        @classmethod
+        def register(cls, func, interval=1, *args, **kwargs):
+            pass
+
+    class SingleTask:
+        @classmethod
+        def run(cls, func, *args, **kwargs):
+            asyncio.get_event_loop().create_task(func(*args, **kwargs))
+
+    _module("quant.tasks", LoopRunTask=LoopRunTask, SingleTask=SingleTask)
+
+    class Event:
+        def __init__(self, name=None, exchange=None, queue=None, routing_key=None, pre_fetch_count=1, data=None):
+            self.name = name
+            self.exchange = exchange
+            self.queue = queue
+            self.routing_key = routing_key
+            self.data = data
+
+        def publish(self):
+            raise RuntimeError("event publish is not available in tests")
+
+    class EventOrderbook(Event):
+        def __init__(self, platform=None, symbol=None, asks=None, bids=None, timestamp=None):
+            data = {"platform": platform, "symbol": symbol, "asks": asks, "bids": bids, "timestamp": timestamp}
+            super(EventOrderbook, self).__init__("EVENT_ORDERBOOK", "Orderbook", None,
+                                                 "{p}.{s}".format(p=platform, s=symbol), data=data)
+
+    class EventTrade(Event):
+        def __init__(self, platform=None, symbol=None, action=None, price=None, quantity=None, timestamp=None):
+            data = {"platform": platform, "symbol": symbol, "action": action, "price": price, "quantity": quantity,
+                    "timestamp": timestamp}
+            super(EventTrade, self).__init__("EVENT_TRADE", "Trade", None, "{p}.{s}".format(p=platform, s=symbol),
+                                             data=data)
+
+    class EventKline(Event):
+        def __init__(self, platform=None, symbol=None, open=None, high=None, low=None, close=None, volume=None,
+                     timestamp=None, kline_type=None):
+            if kline_type == const.MARKET_TYPE_KLINE:
+                name, exchange = "EVENT_KLINE", "Kline"
+            elif kline_type == const.MARKET_TYPE_KLINE_5M:
+                name, exchange = "EVENT_KLINE_5MIN", "Kline.5min"
+            elif kline_type == const.MARKET_TYPE_KLINE_15M:
+                name, exchange = "EVENT_KLINE_15MIN", "Kline.15min"
+            else:
+                logger.error("kline_type error! kline_type:", kline_type, caller=self)
+                return
+            data = {"platform": platform, "symbol": symbol, "open": open, "high": high, "low": low, "close": close,
+                    "volume": volume, "timestamp": timestamp, "kline_type": kline_type}
+            super(EventKline, self).__init__(name, exchange, None, "{p}.{s}".format(p=platform, s=symbol), data=data)
+
+    _module("quant.event", Event=Event, EventOrderbook=EventOrderbook, EventTrade=EventTrade, EventKline=EventKline)
+
+    class Websocket:
+        def __init__(self, url, check_conn_interval=10, send_hb_interval=10):
+            self._url = url
+            self._check_conn_interval = check_conn_interval
+            self._send_hb_interval = send_hb_interval
+            self.ws = None
+            self.heartbeat_msg = None
+
+        def initialize(self):
+            pass
+
+        async def _connect(self):
+            pass
+
+        async def _reconnect(self):
+            pass
+
+        async def receive(self):
+            pass
+
+    _module("quant.utils.websocket", Websocket=Websocket)
+
+    class _Quant:
+        def initialize(self, config_module=None):
+            pass
+
+        def start(self):
+            pass
+
+    _module("quant.quant", quant=_Quant())
+
+
+def _install_aiohttp():
+    """ 注册 aiohttp 的最小实现(框架依赖 aiohttp，未安装框架时通常也未安装)，只提供模块导入时用到的名称，不能建立连接
+    """
+    class WSMsgType:
+        TEXT = 1
+        BINARY = 2
+        CLOSED = 257
+        ERROR = 258
+
+    class ClientSession:
+        closed = False
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def get(self, *args, **kwargs):
+            raise RuntimeError("http request is not available in tests")
+
+        async def close(self):
+            self.closed = True
+
+    aiohttp = _module("aiohttp", WSMsgType=WSMsgType, ClientSession=ClientSession)
+    _module("aiohttp.web")
+    aiohttp.stub = True
+
+
+try:
+    import quant.event  # noqa: F401
+except ImportError:
+    _install_quant()
+
+try:
+    import aiohttp  # noqa: F401
+except ImportError:
+    _install_aiohttp()
+
+
+class Published(list):
+    """ 已发布的事件
+    """
+
+    def events(self, name=None):
+        return [e for e in self if name is None or e.name == name]
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """ 记录所有经 utils.publisher 发布的事件
+    """
+    from utils.publisher import Publisher
+
+    events = Published()
+    monkeypatch.setattr(Publisher, "_send", lambda self, event: events.append(event))
+    return events
+
+
+@pytest.fixture
+def market_config(monkeypatch):
+    """ 设置 config.platforms 并禁止行情对象建立连接，返回设置平台配置的函数 set_platform(platform, options)
+    """
+    from quant.config import config
+    from quant.utils.websocket import Websocket
+
+    monkeypatch.setattr(Websocket, "initialize", lambda self: None)
+    monkeypatch.setattr(config, "platforms", {}, raising=False)
+
+    def set_platform(platform, options):
+        config.platforms[platform] = options
+        return options
+
+    return set_platform
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+    asyncio.set_event_loop(None)
@@ -0,0 +1,73 @@
+# -*— coding:utf-8 -*-
+
+"""
+Binance 连接分片测试: 数据流按 max_streams 分配到多个连接，连接建立后 SUBSCRIBE，热加载时在现有连接上增减订阅
+
+Date:   2026/10/18
+"""
+
+import pytest
+
+from platforms.binance import Binance, BinanceConnection
+
+
+class FakeWS:
+    closed = False
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+@pytest.fixture
+def binance(market_config, monkeypatch):
+    monkeypatch.setattr(BinanceConnection, "SUBSCRIBE_DELAY", 0)
+
+    def create(**options):
+        market_config("binance", dict({"symbols": ["BTC/USDT", "ETH/USDT", "EOS/USDT"],
+                                       "channels": ["orderbook", "trade"], "max_streams": 4}, **options))
+        return Binance()
+
+    return create
+
+
+def test_streams_split_across_connections(binance, loop):
+    market = binance()
+    streams = [conn.streams for conn in market._connections]
+    assert [len(s) for s in streams] == [4, 2]
+    assert sorted(sum(streams, [])) == sorted(market._make_streams())
+    assert all(conn._url.endswith("/stream") for conn in market._connections)
+
+    conn = market._connections[0]
+    conn.ws = FakeWS()
+    conn.SUBSCRIBE_BATCH = 3
+    loop.run_until_complete(conn.connected_callback())
+    assert [m["params"] for m in conn.ws.sent] == [streams[0][:3], streams[0][3:]]
+    assert [m["id"] for m in conn.ws.sent] == [1, 2]
+    assert {m["method"] for m in conn.ws.sent} == {"SUBSCRIBE"}
+
+
+def test_reload_subscribes_on_existing_connections(binance, loop):
+    market = binance()
+    for conn in market._connections:
+        conn.ws = FakeWS()
+    loop.run_until_complete(market.reload({"symbols": ["BTC/USDT", "ETH/USDT", "EOS/USDT", "BNB/USDT"],
+                                           "channels": ["orderbook", "trade"]}))
+    assert len(market._connections) == 2
+    assert market._connections[1].ws.sent == [{"method": "SUBSCRIBE", "params": ["bnbusdt@depth20", "bnbusdt@trade"],
+                                               "id": 1}]
+
+    loop.run_until_complete(market.reload({"symbols": ["BTC/USDT", "ETH/USDT", "EOS/USDT", "BNB/USDT", "XRP/USDT"],
+                                           "channels": ["orderbook", "trade"]}))
+    assert [len(conn.streams) for conn in market._connections] == [4, 4, 2]
+
+    loop.run_until_complete(market.reload({"symbols": ["BTC/USDT"], "channels": ["orderbook"]}))
+    remaining = [s for conn in market._connections for s in conn.streams]
+    assert remaining == ["btcusdt@depth20"]
+    unsubscribed = [m["params"] for conn in market._connections[:2] for m in conn.ws.sent
+                    if m["method"] == "UNSUBSCRIBE"]
+    assert sorted(sum(unsubscribed, [])) == sorted(["btcusdt@trade", "ethusdt@depth20", "ethusdt@trade",
+                                                    "eosusdt@depth20", "eosusdt@trade", "bnbusdt@depth20",
+                                                    "bnbusdt@trade"])
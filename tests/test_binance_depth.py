@@ -0,0 +1,117 @@
+# -*— coding:utf-8 -*-
+
+"""
+Binance diff 订单薄测试: 快照同步、更新id缺失后重新同步、快照获取失败时退避重试、快照HTTP会话复用及关闭
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+import pytest
+
+from platforms import binance as binance_module
+from platforms.binance import Binance
+
+
+def diff(u_first, u_last, bids=None, asks=None):
+    return {"stream": "btcusdt@depth@100ms",
+            "data": {"e": "depthUpdate", "E": 1546300800000 + u_last, "s": "BTCUSDT", "U": u_first, "u": u_last,
+                     "b": bids or [], "a": asks or []}}
+
+
+@pytest.fixture
+def market(market_config):
+    market_config("binance", {"symbols": ["BTC/USDT"], "channels": ["orderbook"], "orderbook_mode": "diff",
+                              "resync": {"base_delay": 0.001, "max_delay": 0.004}})
+    return Binance()
+
+
+def run(loop, market, *msgs):
+    for msg in msgs:
+        loop.run_until_complete(market.deal_message(msg))
+    loop.run_until_complete(asyncio.sleep(0.01))
+
+
+def test_snapshot_sync_and_gap_resync(market, published, loop):
+    snapshots = [{"lastUpdateId": 100, "asks": [["101", "1"]], "bids": [["99", "1"]]},
+                 {"lastUpdateId": 200, "asks": [["102", "1"]], "bids": [["98", "1"]]}]
+    requested = []
+
+    async def get_depth_snapshot(symbol):
+        requested.append(symbol)
+        return snapshots.pop(0)
+
+    market._get_depth_snapshot = get_depth_snapshot
+    run(loop, market, diff(95, 101, bids=[["99.5", "2"]]))
+    assert market._depth_update_ids["BTC/USDT"] == 101
+    assert published[-1].data["bids"] == [["99.5", "2"], ["99", "1"]]
+
+    run(loop, market, diff(102, 102, asks=[["101", "0"], ["100.5", "1"]]))
+    assert published[-1].data["asks"] == [["100.5", "1"]]
+
+    run(loop, market, diff(150, 201))  # 更新id不连续
+    assert requested == ["BTC/USDT", "BTC/USDT"]
+    assert market._depth_resyncs == {"BTC/USDT": 1}
+    assert market._depth_update_ids["BTC/USDT"] == 201
+    assert published[-1].data["asks"] == [["102", "1"]]
+
+
+def test_snapshot_failure_backs_off(market, published, loop, monkeypatch):
+    attempts = []
+    delays = []
+    monkeypatch.setattr(binance_module.random, "uniform", lambda a, b: delays.append(b) or b)
+
+    async def get_depth_snapshot(symbol):
+        attempts.append(symbol)
+        if len(attempts) < 4:
+            raise RuntimeError("503")
+        if len(attempts) == 4:
+            return {"lastUpdateId": 10, "asks": [], "bids": []}  # 早于缓存的增量数据
+        return {"lastUpdateId": 100, "asks": [["101", "1"]], "bids": [["99", "1"]]}
+
+    market._get_depth_snapshot = get_depth_snapshot
+    run(loop, market, diff(95, 101))
+    loop.run_until_complete(asyncio.sleep(0.05))
+    assert len(attempts) == 5
+    assert delays == [0.001, 0.002, 0.004, 0.004]
+    assert "BTC/USDT" in market._depth_books
+    assert market._depth_attempts == {}
+    assert not market._depth_syncing
+
+
+def test_session_reused_and_closed(market, loop):
+    class Response:
+        status = 200
+
+        async def json(self):
+            return {"lastUpdateId": 1, "asks": [], "bids": []}
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            pass
+
+    class Session:
+        closed = False
+        requests = 0
+
+        def get(self, url, params=None, proxy=None):
+            Session.requests += 1
+            return Response()
+
+        async def close(self):
+            self.closed = True
+
+    session = market._session = Session()
+    loop.run_until_complete(market._get_depth_snapshot("BTC/USDT"))
+    loop.run_until_complete(market._get_depth_snapshot("BTC/USDT"))
+    assert market._session is session and Session.requests == 2
+
+    loop.run_until_complete(market.reload({"symbols": ["BTC/USDT"], "channels": ["orderbook"]}))
+    assert session.closed and market._session is None
+
+    market._session = session = Session()
+    market.close()
+    assert session.closed and market._session is None
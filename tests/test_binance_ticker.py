@@ -0,0 +1,86 @@
+# -*— coding:utf-8 -*-
+
+"""
+Binance 全市场ticker测试: 单独的ticker连接、按 exchangeInfo 转换交易对名称、热加载更新过滤条件、多进程分片只订阅一次
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+import pytest
+
+from platforms.binance import Binance
+from supervisor import make_worker_configs
+
+EXCHANGE_INFO = {"symbols": [{"symbol": "BTCUSDT", "baseAsset": "BTC", "quoteAsset": "USDT"},
+                             {"symbol": "ETHDAI", "baseAsset": "ETH", "quoteAsset": "DAI"},
+                             {"symbol": "BNBBTC", "baseAsset": "BNB", "quoteAsset": "BTC"}]}
+
+
+@pytest.fixture
+def binance(market_config, monkeypatch, loop):
+    requests = []
+
+    async def get_exchange_info(self):
+        requests.append(self)
+        return EXCHANGE_INFO
+
+    monkeypatch.setattr(Binance, "_get_exchange_info", get_exchange_info)
+
+    def create(**options):
+        market_config("binance", dict({"symbols": ["BTC/USDT"], "channels": ["orderbook", "ticker"],
+                                       "max_streams": 10, "ticker_interval": 0}, **options))
+        market = Binance()
+        market.requests = requests
+        return market
+
+    return create
+
+
+def mini_ticker(name, close):
+    return {"e": "24hrMiniTicker", "E": 1546300800000, "s": name, "c": close, "o": "1", "h": "2", "l": "0.5",
+            "v": "10", "q": "20"}
+
+
+def test_ticker_streams_on_dedicated_connection(binance, loop):
+    market = binance()
+    assert [conn.streams for conn in market._connections] == [["btcusdt@depth20"], ["!miniTicker@arr", "!bookTicker"]]
+    assert market._ticker_connection is market._connections[1]
+
+    loop.run_until_complete(market.subscribe(["ethusdt@depth20"]))
+    assert market._connections[0].streams == ["btcusdt@depth20", "ethusdt@depth20"]
+    assert market._ticker_connection.streams == ["!miniTicker@arr", "!bookTicker"]
+
+
+def test_symbols_from_exchange_info(binance, published, loop):
+    market = binance()
+    assert market._to_symbol("BTCUSDT") == "BTC/USDT"  # 配置的交易对
+    loop.run_until_complete(asyncio.sleep(0))  # exchangeInfo 加载完成
+    assert len(market.requests) == 1
+    market.deal_ticker("!miniTicker@arr", [mini_ticker("ETHDAI", "100"), mini_ticker("BNBBTC", "0.01"),
+                                           mini_ticker("XRPUSDT", "0.3")])
+    tickers = {e.data["symbol"]: e.data for e in published.events("EVENT_TICKER")}
+    assert sorted(tickers) == ["BNB/BTC", "ETH/DAI", "XRP/USDT"]
+    assert tickers["ETH/DAI"]["last"] == "100"
+
+
+def test_reload_refreshes_ticker_filter(binance, published, loop):
+    market = binance(ticker_symbols=["*/USDT"])
+    loop.run_until_complete(asyncio.sleep(0))
+    market.deal_ticker("!miniTicker@arr", [mini_ticker("BTCUSDT", "1"), mini_ticker("BNBBTC", "2")])
+    assert [e.data["symbol"] for e in published.events("EVENT_TICKER")] == ["BTC/USDT"]
+
+    loop.run_until_complete(market.reload({"symbols": ["BTC/USDT"], "channels": ["orderbook", "ticker"],
+                                           "ticker_symbols": ["*/BTC"]}))
+    assert len(market.requests) == 2
+    assert "BTC/USDT" not in market._tickers
+    market.deal_ticker("!miniTicker@arr", [mini_ticker("BTCUSDT", "3"), mini_ticker("BNBBTC", "4")])
+    assert [e.data["symbol"] for e in published.events("EVENT_TICKER")] == ["BTC/USDT", "BNB/BTC"]
+
+
+def test_ticker_on_first_shard_only():
+    workers = dict(make_worker_configs({"PLATFORMS": {"binance": {
+        "symbols": ["BTC/USDT", "ETH/USDT", "BNB/USDT"], "channels": ["orderbook", "ticker"], "shards": 3}}}))
+    channels = {name: config["PLATFORMS"]["binance"]["channels"] for name, config in workers.items()}
+    assert channels == {"binance-0": ["orderbook", "ticker"], "binance-1": ["orderbook"], "binance-2": ["orderbook"]}
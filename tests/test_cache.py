@@ -0,0 +1,61 @@
+# -*— coding:utf-8 -*-
+
+"""
+最新行情缓存测试: 按 平台/频道/交易对 保存最新数据，查询服务返回缓存内容及延迟统计
+
+Date:   2026/10/18
+"""
+
+import pytest
+import aiohttp
+
+from quant.event import EventOrderbook, EventTrade
+
+from utils.cache import LastValueCache, CacheServer, channel_of, last_values
+from utils.event import EventTicker, EventOrderbookTier, EventKlinePartial, EventKlineInterval
+
+
+def test_channel_of_events():
+    assert channel_of(EventOrderbook("okex", "BTC/USDT", [], [], 1)) == "orderbook"
+    assert channel_of(EventTrade("okex", "BTC/USDT", "BUY", "1", "1", 1)) == "trade"
+    assert channel_of(EventTicker(platform="binance", symbol="BTC/USDT")) == "ticker"
+    assert channel_of(EventOrderbookTier(platform="okex", symbol="BTC/USDT", depth=5)) == "orderbook5"
+    assert channel_of(EventKlinePartial(platform="okex", symbol="BTC/USDT", kline_type="kline_5m")) == \
+        "partial:kline_5m"
+    assert channel_of(EventKlineInterval(platform="okex", symbol="BTC/USDT", kline_type="kline_4h")) == "kline_4h"
+
+
+def test_last_value_per_symbol():
+    cache = LastValueCache()
+    cache.update(EventTrade("okex", "BTC/USDT", "BUY", "1", "1", 1))
+    cache.update(EventTrade("okex", "BTC/USDT", "SELL", "2", "1", 2))
+    cache.update(EventTrade("okex", "ETH/USDT", "BUY", "3", "1", 3))
+    cache.update(EventOrderbook("binance", "BTC/USDT", [["1", "1"]], [], 4))
+    assert cache.get("okex", "trade", "BTC/USDT")["price"] == "2"
+    assert sorted(cache.get("okex", "trade")) == ["BTC/USDT", "ETH/USDT"]
+    assert sorted(cache.get()) == ["binance", "okex"]
+    assert cache.get("okex", "orderbook") == {}
+    assert cache.get("deribit") == {}
+
+
+@pytest.mark.skipif(getattr(aiohttp, "stub", False), reason="aiohttp is not installed")
+def test_cache_server(loop, tmp_path):
+    last_values.set("okex", "trade", "BTC/USDT", {"price": "100"})
+    path = str(tmp_path / "cache.sock")
+    server = CacheServer(path=path)
+
+    async def query():
+        await server.start()
+        async with aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=path)) as session:
+            async with session.get("http://localhost/snapshot", params={"platform": "okex", "channel": "trade",
+                                                                       "symbol": "BTC/USDT"}) as response:
+                snapshot = await response.json()
+            async with session.get("http://localhost/snapshot", params={"platform": "okex", "channel": "trade",
+                                                                       "symbol": "XRP/USDT"}) as response:
+                missing = response.status
+            async with session.get("http://localhost/metrics") as response:
+                metrics = response.status
+        await server._runner.cleanup()
+        return snapshot, missing, metrics
+
+    assert loop.run_until_complete(query()) == ({"price": "100"}, 404, 200)
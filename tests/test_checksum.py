@@ -0,0 +1,66 @@
+# -*— coding:utf-8 -*-
+
+"""
+OKEx 订单薄校验测试: 校验和不一致时丢弃本地订单薄并单独重新订阅该交易对，错误次数可通过 /metrics 查询
+
+Date:   2026/10/18
+"""
+
+from utils.metrics import registry
+
+from test_okex import checksum_of, depth, create_market
+
+
+class FakeWS:
+    """ 记录发送的订阅消息
+    """
+
+    def __init__(self, closed=False):
+        self.closed = closed
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+ASKS = {"100.1": "1", "100.2": "2"}
+BIDS = {"99.9": "1", "99.8": "2"}
+
+
+def test_checksum_mismatch_resubscribes(market_config, published, loop):
+    market, symbol = create_market(market_config, "okex")
+    market.ws = FakeWS()
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", ASKS, BIDS,
+                                                      checksum_of(ASKS, BIDS))))
+    assert symbol in market._orderbooks
+
+    bad = depth("spot/depth", "update", "BTC-USDT", {"100.1": "3"}, {}, checksum_of(ASKS, BIDS))
+    loop.run_until_complete(market.deal_message(bad))
+    assert symbol not in market._orderbooks
+    assert market.ws.sent == [{"op": "unsubscribe", "args": ["spot/depth:BTC-USDT"]},
+                              {"op": "subscribe", "args": ["spot/depth:BTC-USDT"]}]
+    assert len(published.events("EVENT_ORDERBOOK")) == 1
+    assert registry.summary("okex")["okex"]["gauges"]["checksum_errors"] == {symbol: 1}
+
+    # 重新订阅前收到的增量数据被忽略，新的全量数据重建订单薄
+    loop.run_until_complete(market.deal_message(bad))
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", ASKS, BIDS,
+                                                      checksum_of(ASKS, BIDS))))
+    assert symbol in market._orderbooks
+    assert market.checksum_errors == {symbol: 1}
+    assert len(published.events("EVENT_ORDERBOOK")) == 2
+
+
+def test_resubscribe_on_closed_connection_only_drops_book(market_config, published, loop):
+    market, symbol = create_market(market_config, "okex_future")
+    market.ws = FakeWS(closed=True)
+    loop.run_until_complete(market.deal_message(depth("futures/depth", "partial", "BTC-USD-190628", ASKS, BIDS,
+                                                      checksum_of(ASKS, BIDS))))
+    market._health.stale[symbol] = 1
+    loop.run_until_complete(market.resubscribe_orderbook(symbol))
+    assert symbol not in market._orderbooks
+    assert symbol not in market._health.stale
+    assert market.ws.sent == []
+
+    market.ws = None
+    loop.run_until_complete(market.resubscribe_orderbook(symbol))
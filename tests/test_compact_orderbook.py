@@ -0,0 +1,63 @@
+# -*— coding:utf-8 -*-
+
+"""
+紧凑订单薄测试: 与有序订单薄的读取结果一致，内存占用更小，OKEx compact 存储时订单薄内存可通过 /metrics 查询
+
+Date:   2026/10/18
+"""
+
+import random
+
+from utils.metrics import registry
+from utils.orderbook import Orderbook
+from utils.compact_orderbook import CompactOrderbook, decimals_of
+
+from test_okex import depth, create_market
+
+
+def test_decimals_of():
+    assert decimals_of("0.0100") == 4
+    assert decimals_of("1") == 0
+    assert decimals_of(1e-08) == 8
+
+
+def test_same_levels_as_sorted_book():
+    rnd = random.Random(7)
+    compact, sorted_book = CompactOrderbook("0.1", 4), Orderbook()
+    for _ in range(2000):
+        side = rnd.choice(("asks", "bids"))
+        price = round((100 + rnd.randint(1, 300) / 10) if side == "asks" else (100 - rnd.randint(0, 300) / 10), 1)
+        quantity = rnd.choice((0, 0.5, 1.25, 3))
+        raw = ["%.1f" % price, "%.4f" % quantity]
+        getattr(compact, side).update(price, quantity, raw)
+        getattr(sorted_book, side).update(price, quantity, raw)
+    for side in ("asks", "bids"):
+        assert getattr(compact, side).raws(20) == getattr(sorted_book, side).raws(20)
+        assert len(getattr(compact, side)) == len(getattr(sorted_book, side))
+    assert round(compact.asks.best(), 1) == sorted_book.asks.best()
+    assert not compact.crossed()
+    assert compact.checksum() is None and not compact.supports_checksum
+    assert compact.memory_usage() < sorted_book.memory_usage()
+
+
+def test_within_and_trim():
+    book = CompactOrderbook("0.1", 2)
+    for i in range(10):
+        book.asks.update(101 + i, 1)
+        book.bids.update(99 - i, 1)
+    assert book.asks.within(102.0, 2) and not book.asks.within(103.0, 2)
+    assert book.bids.within(98.0, 2) and not book.bids.within(97.0, 2)
+    assert book.trim(max_levels=5) == 10
+    assert book.asks.raws() == [["%.1f" % (101 + i), "1.00"] for i in range(5)]
+    assert book.trim(band=0.02, keep=1) == 3 + 3  # 中间价100，保留 [98, 102] 内的档位
+
+
+def test_okex_compact_store_reports_memory(market_config, published, loop):
+    market, symbol = create_market(market_config, "okex", {
+        "orderbook_store": "compact", "tick_sizes": {"BTC/USDT": "0.1"}, "size_decimals": {"BTC/USDT": 3}})
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT",
+                                                      {"100.1": "1.5"}, {"99.9": "2"}, None)))
+    assert published[-1].data["asks"] == [["100.1", "1.500"]]
+    sizes = registry.summary("okex")["okex"]["gauges"]["orderbooks"][symbol]
+    assert sizes["asks"] == sizes["bids"] == 1
+    assert sizes["bytes"] == market._orderbooks[symbol].memory_usage() > 0
@@ -0,0 +1,73 @@
+# -*— coding:utf-8 -*-
+
+"""
+按symbol合并推送测试: 推送档位不变时不推送、合并周期内只推送最新状态、orderbook_length 为 0 时推送全部档位
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from utils.conflation import Conflator
+
+from test_okex import checksum_of, depth, create_market
+
+
+def test_conflator_immediate_and_windowed(loop):
+    fired = []
+    immediate = Conflator(fired.append)
+    immediate.update("BTC/USDT")
+    immediate.update("BTC/USDT")
+    assert fired == ["BTC/USDT", "BTC/USDT"]
+    assert immediate.interval == 0
+
+    fired.clear()
+    windowed = Conflator(fired.append, 50)
+    for _ in range(5):
+        windowed.update("ETH/USDT")
+    assert fired == ["ETH/USDT"]
+    windowed.update("ETH/USDT")
+    assert fired == ["ETH/USDT"]
+    loop.run_until_complete(asyncio.sleep(0.08))
+    assert fired == ["ETH/USDT", "ETH/USDT"]
+    assert windowed.published == 2
+    assert windowed.conflated == 4
+
+
+def _okex_partial(market, loop, asks, bids):
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", asks, bids,
+                                                      checksum_of(asks, bids))))
+
+
+def test_okex_skips_updates_outside_published_depth(market_config, published, loop):
+    market, _ = create_market(market_config, "okex", {"orderbook_length": 2})
+    asks = {"100.1": "1", "100.2": "2", "100.3": "3"}
+    bids = {"99.9": "1", "99.8": "2", "99.7": "3"}
+    _okex_partial(market, loop, asks, bids)
+    assert len(published.events("EVENT_ORDERBOOK")) == 1
+
+    asks["100.3"] = "9"
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "update", "BTC-USDT", {"100.3": "9"}, {},
+                                                      checksum_of(asks, bids))))
+    assert len(published.events("EVENT_ORDERBOOK")) == 1
+
+    bids["99.8"] = "5"
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "update", "BTC-USDT", {}, {"99.8": "5"},
+                                                      checksum_of(asks, bids))))
+    books = published.events("EVENT_ORDERBOOK")
+    assert len(books) == 2
+    assert books[-1].data["bids"] == [["99.9", "1"], ["99.8", "5"]]
+
+
+def test_okex_zero_length_publishes_whole_book(market_config, published, loop):
+    market, _ = create_market(market_config, "okex", {"orderbook_length": 0})
+    asks = {"100.1": "1", "100.2": "2", "100.3": "3"}
+    bids = {"99.9": "1", "99.8": "2", "99.7": "3"}
+    _okex_partial(market, loop, asks, bids)
+    asks["100.3"] = "9"
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "update", "BTC-USDT", {"100.3": "9"}, {},
+                                                      checksum_of(asks, bids))))
+    books = published.events("EVENT_ORDERBOOK")
+    assert len(books) == 2
+    assert books[-1].data["asks"] == [["100.1", "1"], ["100.2", "2"], ["100.3", "9"]]
+    assert len(books[-1].data["bids"]) == 3
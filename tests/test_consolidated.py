@@ -0,0 +1,76 @@
+# -*— coding:utf-8 -*-
+
+"""
+跨交易所合并订单薄测试: 按统一交易对名称合并各平台前N档并标注各平台数量，未变化时不推送，平台订单薄失效时移除
+
+Date:   2026/10/18
+"""
+
+from utils import consolidated
+from utils.consolidated import create_consolidator, venue_of, normalize_symbol
+
+from test_okex import checksum_of, depth, create_market
+
+
+class Books(dict):
+    """ 平台订单薄前N档 {symbol: {"asks", "bids", "timestamp"}}，snapshot 与平台行情类的接口一致
+    """
+
+    def snapshot(self, symbol, depth):
+        book = self.get(symbol)
+        if not book:
+            return None
+        return {"asks": book["asks"][:depth], "bids": book["bids"][:depth], "timestamp": book["timestamp"]}, None, None
+
+
+def test_normalize_symbol():
+    assert normalize_symbol("btc-usdt") == "BTC/USDT"
+    assert normalize_symbol("BTC_USDT") == "BTC/USDT"
+
+
+def test_merge_publish_and_discard(monkeypatch, published):
+    monkeypatch.setattr(consolidated, "_consolidator", None)
+    assert venue_of("binance", None) is None
+    consolidator = create_consolidator({"depth": 2, "platforms": ["binance", "deribit"],
+                                        "aliases": {"deribit": {"BTC-PERPETUAL": "BTC/USDT"}}})
+    binance, deribit = Books(), Books()
+    binance_venue = venue_of("binance", binance.snapshot)
+    deribit_venue = venue_of("deribit", deribit.snapshot)
+    assert venue_of("okex", None) is None
+
+    binance["BTC/USDT"] = {"asks": [["100.1", "1"], ["100.3", "2"]], "bids": [["99.9", "1"]], "timestamp": 1}
+    binance_venue.update("BTC/USDT")
+    assert published == []  # 只有一个平台
+    deribit["BTC-PERPETUAL"] = {"asks": [["100.1", "0.5"], ["100.2", "3"]], "bids": [["100.2", "2"]],
+                                "timestamp": 2}
+    deribit_venue.update("BTC-PERPETUAL")
+    event = published[-1]
+    assert event.name == "EVENT_ORDERBOOK_CONSOLIDATED" and event.routing_key == "consolidated.BTC/USDT"
+    assert event.data["asks"] == [["100.1", "1.5", {"binance": "1", "deribit": "0.5"}],
+                                  ["100.2", "3", {"deribit": "3"}]]
+    assert event.data["bids"] == [["100.2", "2", {"deribit": "2"}], ["99.9", "1", {"binance": "1"}]]
+    assert event.data["bbo"]["crossed"] and event.data["bbo"]["ask_platforms"] == ["binance", "deribit"]
+    assert event.data["platforms"] == {"binance": 1, "deribit": 2} and event.data["timestamp"] == 2
+
+    binance["BTC/USDT"]["asks"][1] = ["100.3", "5"]  # 合并结果前N档之外的变化
+    binance_venue.update("BTC/USDT")
+    deribit_venue.update("BTC-PERPETUAL")
+    assert len(published) == 1
+    assert consolidator.unchanged == 1 and consolidator.suppressed == 1
+
+    deribit_venue.discard("BTC-PERPETUAL")
+    binance_venue.update("BTC/USDT")
+    assert len(published) == 1
+    assert consolidator.stats()["published"] == 1
+
+
+def test_okex_orderbook_feeds_consolidator(monkeypatch, market_config, published, loop):
+    monkeypatch.setattr(consolidated, "_consolidator", None)
+    create_consolidator({"depth": 1, "min_venues": 1})
+    market, symbol = create_market(market_config, "okex")
+    asks, bids = {"100.1": "1", "100.2": "2"}, {"99.9": "1"}
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", asks, bids,
+                                                      checksum_of(asks, bids))))
+    event = published.events("EVENT_ORDERBOOK_CONSOLIDATED")[-1]
+    assert event.data["asks"] == [["100.1", "1", {"okex": "1"}]]
+    assert event.data["bids"] == [["99.9", "1", {"okex": "1"}]]
@@ -0,0 +1,30 @@
+# -*— coding:utf-8 -*-
+
+"""
+数据帧解码测试: 解压解析与标准库一致，心跳返回不做JSON解析
+
+Date:   2026/10/18
+"""
+
+import json
+import zlib
+
+from utils.decode import decode_deflate_frame, loads, JSON_BACKEND
+
+
+def deflate(data):
+    c = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return c.compress(data) + c.flush()
+
+
+def test_decode_deflate_frame():
+    msg = {"table": "spot/depth", "data": [{"instrument_id": "BTC-USDT", "asks": [["3800.1", "0.5", "0", "1"]],
+                                            "checksum": -1234567}]}
+    assert decode_deflate_frame(deflate(json.dumps(msg).encode())) == msg
+    assert decode_deflate_frame(deflate(b"pong")) is None
+
+
+def test_loads_keeps_strings():
+    assert JSON_BACKEND in ("orjson", "json")
+    assert loads('{"p": "0.10000000", "q": 1}') == {"p": "0.10000000", "q": 1}
+    assert loads(b'[["1.0", "2"]]') == [["1.0", "2"]]
@@ -0,0 +1,38 @@
+# -*— coding:utf-8 -*-
+
+"""
+多档位订单薄测试: 同一本地订单薄按各档位的档数及推送周期分别推送，按交易对配置档位
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from test_okex import checksum_of, depth, create_market
+
+
+def test_okex_tiers(market_config, published, loop):
+    market, symbol = create_market(market_config, "okex", {"orderbook_tiers": {
+        "BTC/USDT": [{"depth": 1, "interval_ms": 0}, {"depth": 3, "interval_ms": 50}, {"depth": 1}],
+        "*": [{"depth": 5}]}})
+    asks = {"100.1": "1", "100.2": "2", "100.3": "3", "100.4": "4"}
+    bids = {"99.9": "1", "99.8": "2"}
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", asks, bids,
+                                                      checksum_of(asks, bids))))
+    for quantity in ("5", "6"):
+        asks["100.1"] = quantity
+        loop.run_until_complete(market.deal_message(depth("spot/depth", "update", "BTC-USDT", {"100.1": quantity},
+                                                          {}, checksum_of(asks, bids))))
+    tiers = [e for e in published if e.routing_key != "okex.BTC/USDT"]
+    assert [(e.routing_key, e.data["asks"][0][1]) for e in tiers] == [
+        ("okex.BTC/USDT.depth1", "1"), ("okex.BTC/USDT.depth3", "1"),
+        ("okex.BTC/USDT.depth1", "5"), ("okex.BTC/USDT.depth1", "6")]
+    assert tiers[0].data["depth"] == 1 and len(tiers[0].data["asks"]) == 1
+    assert tiers[0].name == "EVENT_ORDERBOOK" and tiers[0].exchange == "Orderbook"
+
+    loop.run_until_complete(asyncio.sleep(0.08))
+    last = published[-1]
+    assert last.routing_key == "okex.BTC/USDT.depth3"
+    assert last.data["asks"] == [["100.1", "6"], ["100.2", "2"], ["100.3", "3"]]
+    assert len(market._tiers._get_conflators("BTC/USDT")) == 2  # 重复的档数被忽略
+    assert [c.interval for c in market._tiers._get_conflators("ETH/USDT")] == [0]
@@ -0,0 +1,49 @@
+# -*— coding:utf-8 -*-
+
+"""
+Deribit 行情测试: 默认每条通知都推送，配置合并周期后周期内只推送最新订单薄，合并统计可通过 /metrics 查询
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from utils.metrics import registry
+
+
+def notification(symbol, ts, bid):
+    return {"message": "order_book_event", "result": {
+        "instrument": symbol, "tstamp": ts,
+        "bids": [{"price": bid, "quantity": 1}], "asks": [{"price": bid + 1, "quantity": 1}]}}
+
+
+def create_market(market_config, **options):
+    from platforms.deribit import Deribit
+
+    market_config("deribit", dict({"wss": "wss://www.deribit.com/ws/api/v1/",
+                                   "symbols": ["BTC-PERPETUAL", "ETH-PERPETUAL"]}, **options))
+    return Deribit()
+
+
+def test_every_notification_published_by_default(market_config, published, loop):
+    market = create_market(market_config)
+    msg = {"notifications": [notification("BTC-PERPETUAL", 1, 3800), notification("BTC-PERPETUAL", 2, 3801),
+                             notification("XRP-PERPETUAL", 3, 1)]}
+    loop.run_until_complete(market.process(msg))
+    assert [e.data["timestamp"] for e in published.events("EVENT_ORDERBOOK")] == [1, 2]
+
+
+def test_notifications_conflated_within_window(market_config, published, loop):
+    market = create_market(market_config, conflation_interval=50)
+    for i in range(5):
+        loop.run_until_complete(market.process({"notifications": [notification("BTC-PERPETUAL", 100 + i, 3800 + i)]}))
+    loop.run_until_complete(market.process({"notifications": [notification("ETH-PERPETUAL", 200, 120)]}))
+    books = published.events("EVENT_ORDERBOOK")
+    assert [(e.data["symbol"], e.data["timestamp"]) for e in books] == [("BTC-PERPETUAL", 100), ("ETH-PERPETUAL", 200)]
+
+    loop.run_until_complete(asyncio.sleep(0.08))
+    books = published.events("EVENT_ORDERBOOK")
+    assert [(e.data["symbol"], e.data["timestamp"]) for e in books][-1] == ("BTC-PERPETUAL", 104)
+    assert books[-1].data["bids"] == [[3804, 1]]
+    assert len(books) == 3
+    assert registry.summary("deribit")["deribit"]["gauges"]["conflation"] == {"published": 3, "conflated": 3}
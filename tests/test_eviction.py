@@ -0,0 +1,69 @@
+# -*— coding:utf-8 -*-
+
+"""
+OKEx 订单薄档位清理测试: 超出档数上限或价格范围的档位被清理，校验和使用的前25档始终保留，清理数量可通过 /metrics 查询
+
+Date:   2026/10/18
+"""
+
+import pytest
+
+from utils.metrics import registry
+
+from test_okex import checksum_of, depth, create_market, PLATFORMS
+
+
+def levels(start, step, count):
+    return {"%.1f" % (start + step * i): str(i + 1) for i in range(count)}
+
+
+@pytest.mark.parametrize("platform,table,instrument_id,channel", PLATFORMS)
+def test_max_levels_evicts_far_levels(market_config, published, loop, platform, table, instrument_id, channel):
+    market, symbol = create_market(market_config, platform, {"orderbook_max_levels": 30})
+    asks, bids = levels(100.1, 0.1, 40), levels(99.9, -0.1, 40)
+    loop.run_until_complete(market.deal_message(depth(table, "partial", instrument_id, asks, bids,
+                                                      checksum_of(asks, bids))))
+    ob = market._orderbooks[symbol]
+    assert len(ob.asks) == len(ob.bids) == 30
+    assert ob.asks.get(103.1) is None and ob.asks.get(103.0) is not None
+
+    # 删除盘口档位后，校验和使用的前25档仍在本地订单薄中
+    del asks["100.1"]
+    bids["99.9"] = "7"
+    loop.run_until_complete(market.deal_message(depth(table, "update", instrument_id, {"100.1": "0"},
+                                                      {"99.9": "7"}, checksum_of(asks, bids))))
+    assert market.checksum_errors == {}
+    assert len(published.events("EVENT_ORDERBOOK")) == 2
+    sizes = registry.summary(platform)[platform]["gauges"]["orderbooks"][symbol]
+    assert (sizes["asks"], sizes["bids"], sizes["evicted"]) == (29, 30, 20)
+
+
+def test_max_levels_not_below_checksum_levels(market_config, published, loop):
+    market, symbol = create_market(market_config, "okex", {"orderbook_max_levels": 10})
+    assert market._max_levels == market.CHECKSUM_LEVELS
+    asks, bids = levels(100.1, 0.1, 30), levels(99.9, -0.1, 30)
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", asks, bids,
+                                                      checksum_of(asks, bids))))
+    ob = market._orderbooks[symbol]
+    assert len(ob.asks) == len(ob.bids) == 25
+    assert market.checksum_errors == {}
+
+    # 上限等于校验档数时，被删除的第26档不会再次推送，盘口档位删除后校验失败并重新订阅(见 docs/okex.md)
+    del asks["100.1"]
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "update", "BTC-USDT", {"100.1": "0"}, {},
+                                                      checksum_of(asks, bids))))
+    assert market.checksum_errors == {symbol: 1}
+    assert symbol not in market._orderbooks
+
+
+def test_band_evicts_far_levels(market_config, published, loop):
+    market, symbol = create_market(market_config, "okex", {"orderbook_band": 0.05})
+    asks = dict(levels(100.1, 0.1, 30), **{"200.0": "1", "300.0": "1"})
+    bids = dict(levels(99.9, -0.1, 30), **{"10.0": "1"})
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", asks, bids,
+                                                      checksum_of(asks, bids))))
+    ob = market._orderbooks[symbol]
+    assert (len(ob.asks), len(ob.bids)) == (30, 30)
+    assert ob.asks.get(200.0) is None and ob.bids.get(10.0) is None
+    assert market.orderbook_sizes()[symbol]["evicted"] == 3
+    assert market.checksum_errors == {}
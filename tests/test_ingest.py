@@ -0,0 +1,88 @@
+# -*— coding:utf-8 -*-
+
+"""
+接收队列测试: latest 策略合并后的处理顺序与接收顺序一致
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from utils.ingest import IngestQueue, merge_levels
+
+
+def run(messages, policies, maxsize=100):
+    """ 将消息依次入队(期间不让出事件循环)，再等待处理协程处理完毕
+    @param messages [(channel, key, item), ...]
+    @return 处理顺序, 队列
+    """
+    processed = []
+
+    async def handler(item):
+        processed.append(item)
+
+    async def main():
+        queue = IngestQueue("test", "0", handler, maxsize, policies, report_interval=0)
+        for channel, key, item in messages:
+            await queue.put(channel, key, item, lambda old, new: old + new)
+        while queue.depth:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        queue._task.cancel()
+        return queue
+
+    loop = asyncio.new_event_loop()
+    try:
+        queue = loop.run_until_complete(main())
+    finally:
+        loop.close()
+    return processed, queue
+
+
+def test_latest_merges_per_key():
+    processed, queue = run([
+        ("orderbook", "A", ["a1"]),
+        ("orderbook", "B", ["b1"]),
+        ("orderbook", "A", ["a2"]),
+        ("orderbook", "B", ["b2"]),
+    ], {"orderbook": "latest"})
+    assert processed == [["a1", "a2"], ["b1", "b2"]]
+    assert queue.replaced == {"orderbook": 2}
+
+
+def test_unkeyed_message_stops_merging_into_earlier_entries():
+    processed, _ = run([
+        ("orderbook", "A", ["a1"]),
+        ("orderbook", None, ["multi"]),
+        ("orderbook", "A", ["a2"]),
+        ("orderbook", "A", ["a3"]),
+    ], {"orderbook": "latest"})
+    assert processed == [["a1"], ["multi"], ["a2", "a3"]]
+
+
+def test_unkeyed_message_of_other_channel_does_not_stop_merging():
+    processed, _ = run([
+        ("orderbook", "A", ["a1"]),
+        ("trade", None, ["t1"]),
+        ("orderbook", "A", ["a2"]),
+    ], {"orderbook": "latest"})
+    assert processed == [["a1", "a2"], ["t1"]]
+
+
+def test_block_policy_keeps_every_message():
+    processed, _ = run([("trade", "A", [i]) for i in range(5)], {})
+    assert processed == [[i] for i in range(5)]
+
+
+def test_drop_policy_counts_dropped():
+    processed, queue = run([("trade", "A", [i]) for i in range(5)], {"trade": "drop"}, maxsize=3)
+    assert processed == [[0], [1], [2]]
+    assert queue.dropped == {"trade": 2}
+
+
+def test_merge_levels_later_wins():
+    old = [["1.0", "1"], ["2.0", "2"]]
+    new = [["2.0", "0"], ["3.0", "3"]]
+    assert merge_levels(old, new) == [["1.0", "1"], ["2.0", "0"], ["3.0", "3"]]
+    assert merge_levels(None, new) == new
+    assert merge_levels(old, []) == old
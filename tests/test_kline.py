@@ -0,0 +1,131 @@
+# -*— coding:utf-8 -*-
+
+"""
+多周期K线合成测试: K线结束推送、迟到数据丢弃、超时强制结束
+
+Date:   2026/10/18
+"""
+
+import time
+import asyncio
+
+from utils import kline
+from utils.kline import KlineAggregator
+
+MINUTE = 60 * 1000
+T0 = 1700000100000 - 1700000100000 % (5 * MINUTE)  # 5分钟K线开始时间
+
+
+def make_aggregator(source="trade", partial=False):
+    pushed = []
+    aggregator = KlineAggregator("okex", ["5m"], lambda k, closed: pushed.append((k, closed)), source, partial,
+                                 close_delay=3000)
+    return aggregator, pushed
+
+
+def check(aggregator, now, monkeypatch):
+    monkeypatch.setattr(kline.tools, "get_cur_timestamp_ms", lambda: now)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(aggregator.check())
+    finally:
+        loop.close()
+
+
+def test_bar_closes_on_next_interval():
+    aggregator, pushed = make_aggregator()
+    aggregator.on_trade("BTC/USDT", "100", "1", T0 + 1000)
+    aggregator.on_trade("BTC/USDT", "105", "2", T0 + 2 * MINUTE)
+    aggregator.on_trade("BTC/USDT", "95", "1", T0 + 4 * MINUTE)
+    aggregator.on_trade("BTC/USDT", "101", "1", T0 + 3 * MINUTE)
+    assert pushed == []
+    aggregator.on_trade("BTC/USDT", "102", "1", T0 + 5 * MINUTE)
+    assert len(pushed) == 1
+    bar, closed = pushed[0]
+    assert closed
+    assert (bar["open"], bar["high"], bar["low"], bar["close"]) == ("100", "105", "95", "101")
+    assert float(bar["volume"]) == 5
+    assert bar["timestamp"] == T0 and bar["kline_type"] == "kline_5m"
+
+
+def test_late_data_after_close_is_dropped():
+    aggregator, pushed = make_aggregator()
+    aggregator.on_trade("BTC/USDT", "100", "1", T0 + 1000)
+    aggregator.on_trade("BTC/USDT", "102", "1", T0 + 5 * MINUTE)
+    aggregator.on_trade("BTC/USDT", "90", "1", T0 + 2000)  # 属于已结束的K线
+    assert aggregator.late == 1
+    aggregator.on_trade("BTC/USDT", "103", "1", T0 + 10 * MINUTE)
+    assert [(b["timestamp"], closed) for b, closed in pushed] == [(T0, True), (T0 + 5 * MINUTE, True)]
+    assert pushed[1][0]["low"] == "102"
+
+
+def test_late_data_after_forced_close_is_dropped(monkeypatch):
+    aggregator, pushed = make_aggregator()
+    aggregator.on_trade("BTC/USDT", "100", "1", T0 + 1000)
+    check(aggregator, T0 + 5 * MINUTE + 2000, monkeypatch)  # 未超过 close_delay
+    assert pushed == []
+    check(aggregator, T0 + 5 * MINUTE + 3000, monkeypatch)
+    assert [closed for _, closed in pushed] == [True]
+    aggregator.on_trade("BTC/USDT", "99", "1", T0 + 4 * MINUTE)  # 强制结束后迟到的数据不再生成同一周期的K线
+    check(aggregator, T0 + 20 * MINUTE, monkeypatch)
+    assert len(pushed) == 1
+    assert aggregator.late == 1
+
+
+def test_partial_bars_are_not_closed(monkeypatch):
+    aggregator, pushed = make_aggregator(partial=True)
+    aggregator.on_trade("BTC/USDT", "100", "1", T0 + 1000)
+    check(aggregator, T0 + 2000, monkeypatch)
+    check(aggregator, T0 + 3000, monkeypatch)  # 未变化时不重复推送
+    aggregator.on_trade("BTC/USDT", "101", "1", T0 + 4000)
+    check(aggregator, T0 + 5000, monkeypatch)
+    assert [(b["close"], closed) for b, closed in pushed] == [("100", False), ("101", False)]
+
+
+def test_minute_klines_fold_into_interval():
+    aggregator, pushed = make_aggregator(source="kline")
+    aggregator.on_kline("BTC/USDT", "100", "101", "99", "100.5", "1", T0)
+    aggregator.on_kline("BTC/USDT", "100", "103", "99", "102", "2", T0)  # 同一分钟再次推送
+    aggregator.on_kline("BTC/USDT", "102", "104", "98", "103", "3", T0 + MINUTE)
+    aggregator.on_trade("BTC/USDT", "1", "1", T0 + 6 * MINUTE)  # 来源为1分钟K线时忽略成交
+    aggregator.on_kline("BTC/USDT", "103", "103", "103", "103", "1", T0 + 5 * MINUTE)
+    bar, closed = pushed[0]
+    assert closed
+    assert (bar["open"], bar["high"], bar["low"], bar["close"]) == ("100", "104", "98", "103")
+    assert float(bar["volume"]) == 5
+
+
+def test_okex_publishes_hourly_bar(market_config, published, loop):
+    from platforms.okex import OKEx
+    from utils.cache import last_values
+
+    market_config("okex", {"symbols": ["BTC/USDT"], "channels": ["kline"], "kline_intervals": ["5m", "1h"]})
+    market = OKEx()
+    hour = 1546300800000
+
+    def candle(ts, close):
+        ts_str = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(ts / 1000))
+        return {"table": "spot/candle60s", "data": [{"instrument_id": "BTC-USDT",
+                                                      "candle": [ts_str, "100", "110", "90", close, "2"]}]}
+
+    for minute in range(61):
+        loop.run_until_complete(market.deal_message(candle(hour + minute * MINUTE, str(100 + minute))))
+    hourly = published.events("EVENT_KLINE_1H")
+    assert len(hourly) == 1
+    event = hourly[0]
+    assert (event.exchange, event.routing_key) == ("Kline.1h", "okex.BTC/USDT")
+    assert event.data["timestamp"] == hour and event.data["kline_type"] == "kline_1h"
+    assert (event.data["open"], event.data["high"], event.data["low"], event.data["close"]) == ("100", "110", "90", "159")
+    assert float(event.data["volume"]) == 120
+    assert len(published.events("EVENT_KLINE_5MIN")) == 12
+    assert len(published.events("EVENT_KLINE")) == 61
+    assert last_values.get("okex", "kline_1h", "BTC/USDT")["close"] == "159"
+
+
+def test_kline_event_by_interval():
+    assert kline.kline_event({"platform": "okex", "symbol": "BTC/USDT", "kline_type": "kline_15m"}).name == \
+        "EVENT_KLINE_15MIN"
+    event = kline.kline_event({"platform": "okex", "symbol": "BTC/USDT", "kline_type": "kline_30m"})
+    assert (event.name, event.exchange) == ("EVENT_KLINE_30MIN", "Kline.30min")
+    assert kline.kline_event({"platform": "okex", "symbol": "BTC/USDT", "kline_type": "kline_1d"}).name == \
+        "EVENT_KLINE_1D"
@@ -0,0 +1,60 @@
+# -*— coding:utf-8 -*-
+
+"""
+行情日志测试: 按条数/时间采样、关闭频道、队列满时丢弃
+
+Date:   2026/10/18
+"""
+
+import pytest
+
+from utils import market_log
+from utils.market_log import MarketLogger
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """ 记录放入写入队列的日志，不启动后台线程
+    """
+    items = []
+
+    class Writer:
+        put = staticmethod(items.append)
+
+    monkeypatch.setattr(market_log, "_get_writer", lambda: Writer)
+    return items
+
+
+def test_every_and_disabled_channels(written):
+    log = MarketLogger({"orderbook": {"every": 3}, "kline": False})
+    for i in range(7):
+        log.log("orderbook", "BTC/USDT", i)
+    log.log("orderbook", "ETH/USDT", 0)
+    log.log("kline", "BTC/USDT", 0)
+    log.log("trade", "BTC/USDT", 0)
+    assert [(c, s, d) for c, s, d, _ in written] == [
+        ("orderbook", "BTC/USDT", 0), ("orderbook", "BTC/USDT", 3), ("orderbook", "BTC/USDT", 6),
+        ("orderbook", "ETH/USDT", 0), ("trade", "BTC/USDT", 0)]
+    assert log.sampled == 4
+
+
+def test_interval_sampling(written, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(market_log.time, "monotonic", lambda: now[0])
+    log = MarketLogger({"trade": {"interval": 1}})
+    for ts in (100.0, 100.5, 101.0, 101.2):
+        now[0] = ts
+        log.log("trade", "BTC/USDT", ts)
+    assert [d for _, _, d, _ in written] == [100.0, 101.0]
+
+
+def test_logging_off(written):
+    MarketLogger(False).log("trade", "BTC/USDT", 0)
+    assert written == []
+
+
+def test_full_queue_drops():
+    writer = market_log._LogWriter(maxsize=1)
+    writer.put(("trade", "BTC/USDT", 0, None))
+    writer.put(("trade", "BTC/USDT", 1, None))
+    assert writer.dropped == 1
@@ -0,0 +1,118 @@
+# -*— coding:utf-8 -*-
+
+"""
+延迟统计测试: 直方图分位数精度、按 平台/频道/交易对 汇总、Binance 在JSON解析前记录接收时间
+
+Date:   2026/10/18
+"""
+
+import json
+
+from utils import recorder
+from utils.metrics import Histogram, MetricsRegistry, MarketMetrics, registry
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    histogram.record(-5)
+    summary = histogram.summary()
+    assert summary["count"] == 10001 and summary["negative"] == 1 and summary["max"] == 10000
+    for p, expected in ((50, 5000), (99, 9900), (99.9, 9990)):
+        assert expected <= histogram.percentile(p) <= expected * 1.04
+    assert Histogram().summary()["p99"] == 0
+
+
+def test_registry_summary(monkeypatch):
+    reg = MetricsRegistry()
+    reg.series("okex", "orderbook", "BTC/USDT")["internal"].record(100)
+    reg.histogram("okex", "reconnect").record(5)
+    reg.register_gauge("okex", "books", lambda: 3)
+    reg.register_gauge("binance", "books", lambda: 1)
+    summary = reg.summary("okex")
+    assert list(summary) == ["okex"]
+    assert summary["okex"]["orderbook"]["BTC/USDT"]["internal"]["count"] == 1
+    assert summary["okex"]["reconnect"]["count"] == 1
+    assert summary["okex"]["gauges"] == {"books": 3}
+
+
+def test_market_metrics_stages(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("utils.metrics.time.time", lambda: now[0])
+    metrics = MarketMetrics("metrics-test")
+    metrics.received()
+    now[0] = 1000.002
+    metrics.parsed()
+    now[0] = 1000.005
+    metrics.published("trade", "BTC/USDT", 999990)
+    summary = registry.summary("metrics-test")["metrics-test"]
+    assert 1900 <= summary["parse"]["p50"] <= 2100
+    stages = summary["trade"]["BTC/USDT"]
+    assert 4900 <= stages["internal"]["p50"] <= 5200
+    assert 9800 <= stages["network"]["p50"] <= 10400
+    assert 14500 <= stages["total"]["p50"] <= 15500
+
+
+class Message:
+    def __init__(self, data):
+        self.type = recorder.aiohttp.WSMsgType.TEXT
+        self.data = data
+
+
+class Conn:
+    def __init__(self, messages, calls):
+        self.ws = messages
+        self.calls = calls
+
+    async def process(self, data):
+        self.calls.append(("process", data))
+
+
+class Metrics:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def received(self):
+        self.calls.append("received")
+
+    def parsed(self):
+        self.calls.append("parsed")
+
+
+class AsyncIter:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def test_receive_records_before_parse(monkeypatch, loop):
+    calls = []
+    monkeypatch.setattr(recorder, "loads", lambda data: calls.append("loads") or json.loads(data))
+    conn = Conn(AsyncIter([Message('{"stream": "btcusdt@trade"}')]), calls)
+    loop.run_until_complete(recorder.receive_frames(conn, None, Metrics(calls)))
+    assert calls == ["received", "loads", "parsed", ("process", {"stream": "btcusdt@trade"})]
+
+
+def test_binance_connection_uses_market_metrics(market_config, monkeypatch, loop):
+    from platforms.binance import Binance
+
+    market_config("binance", {"symbols": ["BTC/USDT"], "channels": ["trade"]})
+    market = Binance()
+    used = []
+
+    async def receive_frames(conn, rec=None, metrics=None):
+        used.append((conn, rec, metrics))
+
+    monkeypatch.setattr("platforms.binance.receive_frames", receive_frames)
+    conn = market._connections[0]
+    loop.run_until_complete(conn.receive())
+    assert used == [(conn, None, market._metrics)]
@@ -0,0 +1,97 @@
+# -*— coding:utf-8 -*-
+
+"""
+OKEx 现货 / 交割合约订单薄维护测试: 全量+增量数据重建订单薄，推送的前N档与校验和一致
+
+Date:   2026/10/18
+"""
+
+import json
+import zlib
+
+import pytest
+
+from utils.orderbook import Orderbook
+
+TS = "2019-01-01T00:00:00.000Z"
+
+
+def frame(msg):
+    """ 按交易所格式压缩(deflate，无zlib头)
+    """
+    c = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return c.compress(json.dumps(msg).encode()) + c.flush()
+
+
+def checksum_of(asks, bids):
+    """ 按全部档位计算校验和(参照实现)
+    """
+    ob = Orderbook()
+    for price, quantity in asks.items():
+        ob.asks.update(float(price), float(quantity), [price, quantity])
+    for price, quantity in bids.items():
+        ob.bids.update(float(price), float(quantity), [price, quantity])
+    return ob.checksum()
+
+
+def depth(table, action, instrument_id, asks, bids, checksum):
+    return {"table": table, "action": action, "data": [{
+        "instrument_id": instrument_id,
+        "asks": [[p, q, "0", "1"] for p, q in asks.items()],
+        "bids": [[p, q, "0", "1"] for p, q in bids.items()],
+        "timestamp": TS,
+        "checksum": checksum
+    }]}
+
+
+def create_market(market_config, platform, options=None):
+    from platforms.okex import OKEx
+    from platforms.okex_ftu import OKExFuture
+
+    symbol = "BTC/USDT" if platform == "okex" else "BTC-USD-190628"
+    market_config(platform, dict({"symbols": [symbol], "channels": ["orderbook"], "orderbook_length": 3},
+                                 **(options or {})))
+    market = OKEx() if platform == "okex" else OKExFuture()
+    return market, symbol
+
+
+PLATFORMS = [
+    ("okex", "spot/depth", "BTC-USDT", "spot/depth:BTC-USDT"),
+    ("okex_future", "futures/depth", "BTC-USD-190628", "futures/depth:BTC-USD-190628"),
+]
+
+
+@pytest.mark.parametrize("platform,table,instrument_id,channel", PLATFORMS)
+def test_partial_and_update(market_config, published, loop, platform, table, instrument_id, channel):
+    market, symbol = create_market(market_config, platform)
+    assert market._make_channels() == [channel]
+    asks = {"100.1": "1", "100.2": "2", "100.3": "3", "100.4": "4"}
+    bids = {"99.9": "1", "99.8": "2", "99.7": "3", "99.6": "4"}
+    loop.run_until_complete(market.process_binary(frame(
+        depth(table, "partial", instrument_id, asks, bids, checksum_of(asks, bids)))))
+    asks.update({"100.05": "5"})
+    del asks["100.2"]
+    bids.update({"99.8": "7"})
+    update = depth(table, "update", instrument_id, {"100.05": "5", "100.2": "0"}, {"99.8": "7"},
+                   checksum_of(asks, bids))
+    loop.run_until_complete(market.process_binary(frame(update)))
+    assert market.checksum_errors == {}
+    books = [e.data for e in published.events("EVENT_ORDERBOOK")]
+    assert len(books) == 2
+    assert books[-1]["symbol"] == symbol
+    assert books[-1]["asks"] == [["100.05", "5"], ["100.1", "1"], ["100.3", "3"]]
+    assert books[-1]["bids"] == [["99.9", "1"], ["99.8", "7"], ["99.7", "3"]]
+    assert isinstance(market._orderbooks[symbol].bids.get(99.8), float if platform == "okex" else int)
+
+
+def test_spot_trades_and_futures_ignore_other_tables(market_config, published, loop):
+    market, _ = create_market(market_config, "okex", {"channels": ["orderbook", "trade", "kline"]})
+    assert market._make_channels() == ["spot/depth:BTC-USDT", "spot/trade:BTC-USDT", "spot/candle60s:BTC-USDT"]
+    trade = {"table": "spot/trade", "data": [{"instrument_id": "BTC-USDT", "side": "buy", "price": "100",
+                                              "size": "1", "timestamp": TS}]}
+    loop.run_until_complete(market.deal_message(trade))
+    assert [e.data["symbol"] for e in published.events("EVENT_TRADE")] == ["BTC/USDT"]
+
+    future, _ = create_market(market_config, "okex_future")
+    loop.run_until_complete(future.deal_message(dict(trade, table="futures/trade")))
+    assert len(published.events("EVENT_TRADE")) == 1
@@ -0,0 +1,99 @@
+# -*— coding:utf-8 -*-
+
+"""
+有序订单薄 / 紧凑订单薄 测试: 档位清理、OKEx校验和、前N档范围判断
+
+Date:   2026/10/18
+"""
+
+import zlib
+
+from utils.orderbook import Orderbook
+from utils.compact_orderbook import CompactOrderbook
+
+
+def make_book(cls=Orderbook, levels=5, mid=100.0, step=0.1):
+    """ 以 mid 为中心、每边 levels 档的订单薄
+    """
+    ob = CompactOrderbook("0.1", 0) if cls is CompactOrderbook else cls()
+    for i in range(levels):
+        ask = "%.1f" % (mid + step * (i + 1))
+        bid = "%.1f" % (mid - step * (i + 1))
+        ob.asks.update(float(ask), i + 1, [ask, str(i + 1)])
+        ob.bids.update(float(bid), i + 1, [bid, str(i + 1)])
+    return ob
+
+
+def signed_crc32(text):
+    crc = zlib.crc32(text.encode())
+    return crc - 0x100000000 if crc > 0x7fffffff else crc
+
+
+def test_checksum_interleaves_bids_and_asks():
+    ob = Orderbook()
+    ob.bids.update(3366.1, 7, ["3366.1", "7"])
+    ob.bids.update(3366.0, 6, ["3366", "6"])
+    ob.asks.update(3366.8, 9, ["3366.8", "9"])
+    ob.asks.update(3368.0, 8, ["3368", "8"])
+    assert ob.checksum() == signed_crc32("3366.1:7:3366.8:9:3366:6:3368:8")
+
+
+def test_checksum_uneven_sides_and_depth_limit():
+    ob = make_book(levels=30)
+    ob.asks.remove(100.1)
+    bids = ob.bids.raws(25)
+    asks = ob.asks.raws(25)
+    items = []
+    for i in range(25):
+        items.extend(bids[i])
+        items.extend(asks[i])
+    assert ob.checksum() == signed_crc32(":".join(items))
+    ob.bids.update(90.0, 1, ["90.0", "1"])  # 第25档之外的变化不影响校验和
+    assert ob.checksum() == signed_crc32(":".join(items))
+
+
+def test_checksum_is_signed():
+    ob = Orderbook()
+    for i in range(1, 100):
+        ob.asks.update(float(i), 1, [str(i), "1"])
+        if -0x80000000 <= ob.checksum() < 0:
+            return
+    assert False, "no negative checksum found"
+
+
+def test_trim_max_levels_keeps_best_levels():
+    for cls in (Orderbook, CompactOrderbook):
+        ob = make_book(cls, levels=10)
+        assert ob.trim(max_levels=4) == 12
+        assert [r[0] for r in ob.asks.raws()] == ["100.1", "100.2", "100.3", "100.4"]
+        assert [r[0] for r in ob.bids.raws()] == ["99.9", "99.8", "99.7", "99.6"]
+
+
+def test_trim_band_keeps_minimum_levels():
+    for cls in (Orderbook, CompactOrderbook):
+        ob = make_book(cls, levels=10, step=1)
+        assert ob.trim(band=0.025) == 2 * 8  # 中间价100，每边只有2档在2.5%以内
+        assert len(ob.asks) == len(ob.bids) == 2
+        ob = make_book(cls, levels=10, step=1)
+        ob.trim(band=0.025, keep=5)
+        assert len(ob.asks) == len(ob.bids) == 5
+        assert ob.asks.best() == 101.0 and ob.bids.best() == 99.0
+
+
+def test_trim_without_limits_is_noop():
+    ob = make_book(levels=10)
+    checksum = ob.checksum()
+    assert ob.trim() == 0
+    assert ob.trim(max_levels=10) == 0
+    assert ob.checksum() == checksum
+
+
+def test_within_published_depth():
+    for cls in (Orderbook, CompactOrderbook):
+        ob = make_book(cls, levels=5)
+        assert ob.asks.within(100.3, 3)
+        assert ob.asks.within(100.25, 3)  # 插入到前3档之内
+        assert not ob.asks.within(100.4, 3)
+        assert ob.bids.within(99.7, 3)
+        assert not ob.bids.within(99.6, 3)
+        assert ob.asks.within(200.0, 6)  # 档数不足时都在范围内
@@ -0,0 +1,52 @@
+# -*— coding:utf-8 -*-
+
+"""
+批量发布测试: 时间窗口/数量上限触发发布，合并消息保持原事件名称、exchange、routing_key
+
+Date:   2026/10/18
+"""
+
+import asyncio
+
+from quant.event import EventTrade
+
+from utils.publisher import BatchPublisher, create_publisher, Publisher
+
+
+def trade(symbol, price):
+    return EventTrade("okex", symbol, "BUY", price, "1", 1546300800000)
+
+
+def test_batch_keeps_event_name(published, loop):
+    publisher = BatchPublisher(max_delay=20, max_size=10, report_interval=0)
+    publisher.publish(trade("BTC/USDT", "100"))
+    publisher.publish(trade("BTC/USDT", "101"))
+    publisher.publish(trade("ETH/USDT", "10"))
+    assert published == []
+    loop.run_until_complete(asyncio.sleep(0.05))
+
+    by_key = {e.routing_key: e for e in published}
+    assert len(published) == 2
+    batch = by_key["okex.BTC/USDT"]
+    assert (batch.name, batch.exchange) == ("EVENT_TRADE", "Trade")
+    assert [d["price"] for d in batch.data] == ["100", "101"]
+    single = by_key["okex.ETH/USDT"]
+    assert single.name == "EVENT_TRADE"
+    assert single.data["price"] == "10"
+    assert (publisher.batch_count, publisher.event_count, publisher.max_fill) == (2, 3, 2)
+
+
+def test_batch_flushes_when_full(published, loop):
+    publisher = BatchPublisher(max_delay=1000, max_size=3, report_interval=0)
+    for i in range(4):
+        publisher.publish(trade("BTC/USDT", str(i)))
+    assert len(published) == 1
+    assert [d["price"] for d in published[0].data] == ["0", "1", "2"]
+    assert publisher.full_count == 1
+    publisher.flush()
+    assert published[-1].data["price"] == "3"
+
+
+def test_create_publisher_without_batch():
+    publisher = create_publisher({})
+    assert type(publisher) is Publisher
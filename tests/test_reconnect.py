@@ -0,0 +1,83 @@
+# -*— coding:utf-8 -*-
+
+"""
+统一重连调度测试: 指数退避、按优先级依次重连、连接失败继续退避，断开/恢复时推送行情状态事件
+
+Date:   2026/10/18
+"""
+
+from utils import reconnect
+from utils.publisher import Publisher
+from utils.reconnect import ReconnectScheduler, ConnectionHealth, sort_by_priority, STATUS_STALE, STATUS_RECOVERED
+
+
+class FakeWS:
+
+    def __init__(self, closed):
+        self.closed = closed
+
+
+class FakeConn:
+    """ 记录重连顺序，前 failures 次重连失败
+    """
+
+    def __init__(self, name, connected, failures=0):
+        self.name = name
+        self.ws = None
+        self._connected = connected
+        self._failures = failures
+
+    async def _connect(self):
+        self._connected.append(self.name)
+        self.ws = FakeWS(closed=self._failures > 0)
+        self._failures -= 1
+
+
+def test_sort_by_priority():
+    assert sort_by_priority(["ETH/USDT", "BTC/USDT", "EOS/USDT"], ["BTC/USDT"]) == \
+        ["BTC/USDT", "ETH/USDT", "EOS/USDT"]
+    assert sort_by_priority({"ETH/USDT"}) == ["ETH/USDT"]
+
+
+def test_scheduler_backoff_and_priority(monkeypatch, loop):
+    delays = []
+    monkeypatch.setattr(reconnect.random, "uniform", lambda low, high: delays.append((low, high)) or low)
+    monkeypatch.setattr(ReconnectScheduler, "CONNECT_INTERVAL", 0.001)
+    scheduler = ReconnectScheduler()
+    connected, started = [], []
+    low = FakeConn("low", connected, failures=2)
+    high = FakeConn("high", connected)
+    scheduler.reconnect(low, priority=0, base_delay=0.01, max_delay=0.03, on_connect=lambda: started.append("low"))
+    scheduler.reconnect(high, priority=1, base_delay=0.01)
+    scheduler.reconnect(high, priority=1, base_delay=0.01)  # 已在等待中，忽略
+    assert scheduler.pending == 2
+
+    loop.run_until_complete(scheduler._task)
+    assert connected == ["high", "low", "low", "low"]
+    assert started == ["low", "low", "low"]
+    assert delays == [(0.005, 0.01), (0.005, 0.01), (0.01, 0.02), (0.015, 0.03)]
+    assert scheduler.pending == 0 and scheduler._task is None
+
+    scheduler.reset(low)
+    assert low not in scheduler._attempts
+
+
+def test_connection_health_events(monkeypatch, published, loop):
+    scheduled = []
+    monkeypatch.setattr(reconnect, "scheduler", type("Scheduler", (), {
+        "reconnect": lambda self, *args: scheduled.append(args), "reset": lambda self, conn: None})())
+    conn = FakeConn("okex", [])
+    health = ConnectionHealth("okex", "test", conn, Publisher(), {"priority": 2, "base_delay": 3})
+    health.disconnected(["BTC/USDT", "ETH/USDT"], priority=1)
+    health.disconnected(["BTC/USDT"])
+    assert [e.data["status"] for e in published] == [STATUS_STALE, STATUS_STALE]
+    assert scheduled[0][:4] == (conn, 3, 3, 60)
+    assert health.active
+
+    scheduled[0][4]()  # 开始重连
+    health.book_received("BTC/USDT")
+    assert published[-1].data["status"] == STATUS_RECOVERED and published[-1].routing_key == "okex.BTC/USDT"
+    assert health.last_first_book_ms is not None
+    health.discard("ETH/USDT")
+    assert not health.active
+    assert health.stats() == {"reconnects": 1, "stale": 0, "last_first_book_ms": health.last_first_book_ms}
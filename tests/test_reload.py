@@ -0,0 +1,65 @@
+# -*— coding:utf-8 -*-
+
+"""
+配置热加载测试: 配置文件修改后在现有连接上订阅/取消订阅，未受影响交易对的订单薄保持不变，配置无变化或读取失败时不处理
+
+Date:   2026/10/18
+"""
+
+import os
+import json
+
+from utils.reload import ConfigReloader
+
+from test_okex import checksum_of, depth, create_market
+from test_checksum import FakeWS, ASKS, BIDS
+
+
+def write_config(path, symbols, channels=("orderbook",), mtime=None):
+    with open(path, "w") as f:
+        json.dump({"PLATFORMS": {"okex": {"symbols": list(symbols), "channels": list(channels)}}}, f)
+    if mtime:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+class FailingMarket:
+
+    async def reload(self, platform_config):
+        raise ValueError("bad config")
+
+
+def test_reload_subscribes_on_existing_connection(market_config, published, loop, tmp_path):
+    config_file = write_config(tmp_path / "config.json", ["BTC/USDT"], mtime=1546300800)
+    market, symbol = create_market(market_config, "okex")
+    market.ws = FakeWS()
+    loop.run_until_complete(market.deal_message(depth("spot/depth", "partial", "BTC-USDT", ASKS, BIDS,
+                                                      checksum_of(ASKS, BIDS))))
+    reloader = ConfigReloader(config_file, {"okex": market})
+
+    loop.run_until_complete(reloader.check())
+    assert reloader.reloads == 0 and market.ws.sent == []
+
+    write_config(config_file, ["ETH/USDT", "BTC/USDT"], mtime=1546300801)
+    loop.run_until_complete(reloader.check())
+    assert reloader.reloads == 1
+    assert market.ws.sent == [{"op": "subscribe", "args": ["spot/depth:ETH-USDT"]}]
+    assert symbol in market._orderbooks
+
+    write_config(config_file, ["ETH/USDT"])
+    loop.run_until_complete(reloader.reload())
+    assert market.ws.sent[-1] == {"op": "unsubscribe", "args": ["spot/depth:BTC-USDT"]}
+    assert symbol not in market._orderbooks
+    assert reloader.reloads == 2
+
+
+def test_reload_keeps_config_on_error(loop, tmp_path):
+    config_file = write_config(tmp_path / "config.json", ["BTC/USDT"])
+    reloader = ConfigReloader(config_file, {"okex": FailingMarket()})
+    with open(config_file, "w") as f:
+        f.write("{")
+    loop.run_until_complete(reloader.reload())
+    write_config(config_file, ["ETH/USDT"])
+    loop.run_until_complete(reloader.reload())
+    assert reloader.reloads == 0
+    assert reloader._platforms["okex"]["symbols"] == ["BTC/USDT"]
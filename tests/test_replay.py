@@ -0,0 +1,74 @@
+# -*— coding:utf-8 -*-
+
+"""
+原始数据帧录制及回放测试: 录制文件读写一致，回放时不合并推送、Binance diff 模式不请求REST快照
+
+Date:   2026/10/18
+"""
+
+import json
+import gzip
+
+from quant.event import Event
+from quant.utils.websocket import Websocket
+
+import replay
+from utils.recorder import Recorder, read_frames, FRAME_TEXT, FRAME_BINARY
+
+
+def record(path, platform, frames):
+    recorder = Recorder(platform, str(path))
+    for i, frame in enumerate(frames):
+        recorder.write(frame, ts=1546300800 + i)
+    recorder.close()
+    assert recorder.frames == len(frames)
+    return recorder.filename
+
+
+def test_recorder_round_trip_and_truncated_tail(tmp_path):
+    filename = record(tmp_path, "okex", ['{"a": 1}', b"\x00\x01binary"])
+    frames = list(read_frames(filename))
+    assert frames == [(1546300800, FRAME_TEXT, b'{"a": 1}'), (1546300801, FRAME_BINARY, b"\x00\x01binary")]
+
+    with gzip.open(filename, "rb") as f:
+        data = f.read()
+    truncated = str(tmp_path / "truncated.frames.gz")
+    with gzip.open(truncated, "wb") as f:
+        f.write(data[:-3])
+    assert list(read_frames(truncated)) == frames[:1]
+
+
+def _create_market(monkeypatch, market_config, platform, options):
+    monkeypatch.setattr(Websocket, "initialize", Websocket.initialize)
+    monkeypatch.setattr(Event, "publish", Event.publish)
+    market_config(platform, options)
+    return replay.create_market(platform)
+
+
+def test_replay_binance_diff_without_rest(monkeypatch, market_config, published, loop, tmp_path):
+    market = _create_market(monkeypatch, market_config, "binance", {
+        "symbols": ["BTC/USDT"], "channels": ["orderbook"], "orderbook_mode": "diff", "conflation_interval": 500})
+    diffs = [{"stream": "btcusdt@depth@100ms",
+              "data": {"e": "depthUpdate", "E": 1546300800000 + u, "s": "BTCUSDT", "U": u, "u": u,
+                       "b": [["99.%d" % u, "1"]], "a": [["101.%d" % u, "1"]]}} for u in range(101, 104)]
+    filename = record(tmp_path, "binance", [json.dumps(d) for d in diffs])
+
+    latencies, cost = loop.run_until_complete(replay.replay(market, [filename]))
+    assert len(latencies) == 3
+    books = published.events("EVENT_ORDERBOOK")
+    assert len(books) == 3  # 快照同步(应用缓存的第一条增量数据)时推送一次，之后每条增量数据推送一次
+    assert books[-1].data["bids"] == [["99.103", "1"], ["99.102", "1"], ["99.101", "1"]]
+
+
+def test_replay_deribit_publishes_every_notification(monkeypatch, market_config, published, loop, tmp_path):
+    market = _create_market(monkeypatch, market_config, "deribit", {
+        "wss": "wss://www.deribit.com/ws/api/v1/", "symbols": ["BTC-PERPETUAL"]})
+    notifications = [{"notifications": [{"message": "order_book_event", "result": {
+        "instrument": "BTC-PERPETUAL", "tstamp": 1546300800000 + i,
+        "bids": [{"price": 3800 - i, "quantity": 1}], "asks": [{"price": 3801 + i, "quantity": 1}]}}]}
+        for i in range(3)]
+    filename = record(tmp_path, "deribit", [json.dumps(n) for n in notifications])
+
+    loop.run_until_complete(replay.replay(market, [filename]))
+    books = published.events("EVENT_ORDERBOOK")
+    assert [b.data["timestamp"] for b in books] == [1546300800000, 1546300800001, 1546300800002]
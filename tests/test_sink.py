@@ -0,0 +1,66 @@
+# -*— coding:utf-8 -*-
+
+"""
+本地事件接收端测试: 未连接时丢弃事件并在后台连接，连接后事件以 JSON 行写入，压测模拟服务的接收端按事件统计
+
+Date:   2026/10/18
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+from utils import sink
+from utils.sink import EventSink, create_sink
+from utils.event import EventMarketStatus
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+import exchange_simulator  # noqa: E402
+
+
+def test_create_sink_shares_address(monkeypatch):
+    monkeypatch.setattr(sink, "_sinks", {})
+    assert create_sink({}) is None
+    first = create_sink({"sink": {"port": 9901}})
+    assert create_sink({"sink": {"host": "127.0.0.1", "port": 9901}}) is first
+    assert create_sink({"sink": {"port": 9902}}) is not first
+
+
+def test_event_sink_writes_json_lines(loop):
+    receiver = exchange_simulator.Sink()
+    server = loop.run_until_complete(asyncio.start_server(receiver.handle, "127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+    event_sink = EventSink("127.0.0.1", port)
+    event = EventMarketStatus(platform="okex", symbol="BTC/USDT", status="stale", timestamp=1546300800000)
+
+    event_sink.send(event)  # 未连接，丢弃并开始连接
+    assert event_sink.dropped == 1 and event_sink.sent == 0
+    loop.run_until_complete(event_sink._task)
+    assert event_sink.stats()["connected"]
+
+    for _ in range(3):
+        event_sink.send(event)
+    loop.run_until_complete(asyncio.sleep(0.05))
+    assert event_sink.sent == 3
+    assert receiver.names == {"EVENT_MARKET_STATUS": 3}
+
+    event_sink._writer.close()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+
+
+def test_simulator_sink_latency_samples():
+    receiver = exchange_simulator.Sink()
+    receiver.on_event({"name": "EVENT_TRADE", "data": [{"timestamp": 1000}, {"timestamp": 1500}]}, 2000)
+    receiver.on_event({"name": "EVENT_ORDERBOOK", "data": {"timestamp": "1000"}}, 2000)
+    assert receiver.trades == 2 and receiver.events == 3
+    assert receiver.reset_latencies() == {"trade": [1000, 500]}
+    assert receiver.latencies == {}
+
+
+def test_protocol_is_abstract():
+    with pytest.raises(TypeError):
+        exchange_simulator.Protocol(exchange_simulator.Market())
@@ -0,0 +1,54 @@
+# -*— coding:utf-8 -*-
+
+"""
+列式行情存储测试: 成交、K线、订单薄写入后按日期读取一致，K线只写入已结束的一根
+
+Date:   2026/10/18
+"""
+
+import pytest
+
+from quant.event import EventTrade, EventKline, EventOrderbook
+
+np = pytest.importorskip("numpy")
+
+from utils.store import TickStore, load  # noqa: E402
+
+DAY = 1546300800000  # 2019-01-01 UTC
+
+
+def test_round_trip(tmp_path):
+    store = TickStore(str(tmp_path), depth=3, report_interval=0)
+    store.append(EventTrade("okex", "BTC/USDT", "BUY", "3800.5", "0.1", DAY + 1))
+    store.append(EventTrade("okex", "BTC/USDT", "SELL", "3800.4", "0.2", DAY + 2))
+    store.append(EventTrade("okex", "BTC/USDT", "BUY", "3900", "1", DAY + 86400000))  # 下一天
+    store.append(EventOrderbook("okex", "BTC/USDT", [["3801", "1"], ["3802", "2"]],
+                                [["3799", "3"], ["3798", "4"], ["3797", "5"], ["3796", "6"]], DAY + 3))
+    for ts, close in ((DAY, "1"), (DAY, "2"), (DAY + 60000, "3")):
+        store.append(EventKline("okex", "BTC/USDT", "1", "2", "0.5", close, "10", ts, "kline"))
+    store.close()
+
+    trades = load(str(tmp_path), "okex", "BTC/USDT", "trade", "20190101")
+    assert trades["timestamp"].tolist() == [DAY + 1, DAY + 2]
+    assert trades["price"].tolist() == [3800.5, 3800.4]
+    assert trades["side"].tolist() == [1, -1]
+    assert len(load(str(tmp_path), "okex", "BTC/USDT", "trade", "20190102")) == 1
+
+    books = load(str(tmp_path), "okex", "BTC/USDT", "orderbook3", "20190101")
+    assert books["bid_price"][0].tolist() == [3799, 3798, 3797]
+    assert books["ask_quantity"][0][:2].tolist() == [1, 2] and np.isnan(books["ask_price"][0][2])
+
+    klines = load(str(tmp_path), "okex", "BTC/USDT", "kline", "20190101")
+    assert klines["timestamp"].tolist() == [DAY, DAY + 60000]  # 关闭时写入未结束的K线
+    assert klines["close"].tolist() == [2, 3]
+    assert len(load(str(tmp_path), "okex", "ETH/USDT", "trade", "20190101")) == 0
+
+
+def test_truncated_record_ignored(tmp_path):
+    store = TickStore(str(tmp_path), report_interval=0)
+    store.append(EventTrade("okex", "BTC/USDT", "BUY", "1", "1", DAY))
+    store.close()
+    path = tmp_path / "okex" / "20190101" / "BTC_USDT.trade.dat"
+    with open(str(path), "ab") as f:
+        f.write(b"\x00\x01\x02")
+    assert len(load(str(tmp_path), "okex", "BTC/USDT", "trade", "20190101")) == 1
@@ -0,0 +1,93 @@
+# -*— coding:utf-8 -*-
+
+"""
+多进程行情服务测试: 交易对分片、各工作进程配置拆分、工作进程退出后按退避时间重启
+
+Date:   2026/10/18
+"""
+
+import json
+
+import supervisor
+from supervisor import split_symbols, make_worker_configs, Supervisor
+
+
+def test_split_symbols_round_robin():
+    assert split_symbols(["D", "A", "C", "B", "A"], 2) == [["A", "C"], ["B", "D"]]
+    assert split_symbols(["A", "B"], 5) == [["A"], ["B"]]
+    assert split_symbols(["A", "B"], 0) == [["A", "B"]]
+
+
+def test_make_worker_configs():
+    config_data = {
+        "LOG": {"name": "market.log"},
+        "SUPERVISOR": {"heartbeat_interval": 5},
+        "CONSOLIDATED": {"symbols": ["BTC/USDT"]},
+        "PLATFORMS": {
+            "okex": {"symbols": ["BTC/USDT", "ETH/USDT", "EOS/USDT"], "shards": 2,
+                     "cache_server": {"host": "127.0.0.1", "port": 9001}},
+            "deribit": {"symbols": ["BTC-PERPETUAL"], "cache_server": {"path": "/tmp/deribit.sock"}}
+        }
+    }
+    workers = dict(make_worker_configs(config_data))
+    assert sorted(workers) == ["deribit", "okex-0", "okex-1"]
+    okex0, okex1 = workers["okex-0"], workers["okex-1"]
+    assert okex0["PLATFORMS"]["okex"]["symbols"] == ["BTC/USDT", "ETH/USDT"]
+    assert okex1["PLATFORMS"]["okex"]["symbols"] == ["EOS/USDT"]
+    assert [w["PLATFORMS"]["okex"]["cache_server"]["port"] for w in (okex0, okex1)] == [9001, 9002]
+    assert okex1["LOG"]["name"] == "market-okex-1.log"
+    assert "SUPERVISOR" not in okex0 and "CONSOLIDATED" not in okex0
+    assert list(workers["deribit"]["PLATFORMS"]) == ["deribit"]
+    assert workers["deribit"]["PLATFORMS"]["deribit"]["cache_server"] == {"path": "/tmp/deribit.sock"}
+    assert config_data["PLATFORMS"]["okex"]["cache_server"]["port"] == 9001
+
+
+class FakeProcess:
+    pid = 1000
+    exitcode = 1
+
+    def __init__(self, alive=True):
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+def test_restart_with_backoff(tmp_path, monkeypatch):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"PLATFORMS": {"okex": {"symbols": ["BTC/USDT"]}}}))
+    monkeypatch.setattr(supervisor.tempfile, "mkdtemp", lambda prefix=None: str(tmp_path))
+    sup = Supervisor(str(config_file))
+    assert (tmp_path / "okex.json").exists()
+    started = []
+
+    def start_worker(worker):
+        worker.process = FakeProcess()
+        worker.started_at = now[0]
+        started.append(now[0])
+
+    now = [1000.0]
+    monkeypatch.setattr(supervisor.time, "time", lambda: now[0])
+    monkeypatch.setattr(sup, "_start_worker", start_worker)
+
+    sup._check_workers()
+    worker = sup._workers[0]
+    assert started == [1000.0]
+
+    worker.process.alive = False
+    sup._check_workers()
+    assert worker.next_start == 1001.0
+    now[0] = 1001.0
+    sup._check_workers()
+    assert started == [1000.0, 1001.0] and worker.restarts == 1
+
+    now[0] = 1001.0 + sup._heartbeat_timeout + 1  # 心跳超时
+    sup._check_workers()
+    assert worker.process.alive is False
+    assert worker.next_start == now[0] + 2